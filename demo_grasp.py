@@ -21,7 +21,7 @@ from datetime import datetime
 sys.path.insert(0, "src")
 
 from brasileirao.construction import construct_schedule
-from brasileirao.grasp import DEFAULT_ALPHA_POOL, grasp
+from brasileirao.grasp import DEFAULT_ALPHA_POOL, HistorySink, grasp
 from brasileirao.io import load_dates, load_teams
 from brasileirao.objective import compute_prv, evaluate
 from brasileirao.real_baseline import load_real_schedule_2023
@@ -29,6 +29,7 @@ from brasileirao.real_baseline import load_real_schedule_2023
 TEAMS_PATH = "data/raw/teams.csv"
 DATES_PATH = "data/raw/datas_20-08-2023_a_09-06-2024.csv"
 REAL_PATH = "data/raw/tabela_real_brasileirao_2023.csv"
+HIST_PATH = "results/grasp_history.csv"
 
 MAX_ITER = 50
 MAX_ITER_NO_IMPROVE = 20
@@ -106,16 +107,22 @@ def main() -> None:
 
     # ── Etapa 4 — Loop GRASP ─────────────────────────────────────
     _sep("Etapa 4 -- Loop GRASP")
-    result = grasp(
-        teams,
-        dates,
-        max_iter=MAX_ITER,
-        max_iter_no_improve=MAX_ITER_NO_IMPROVE,
-        alpha_pool=ALPHA_POOL,
-        seed=SEED,
-        prv_days=PRV_DAYS,
-        min_team_rest_days=MIN_TEAM_REST_DAYS,
-    )
+    # O historico vai para o CSV a cada iteracao.
+    os.makedirs("results", exist_ok=True)
+    if os.path.exists(HIST_PATH):
+        os.remove(HIST_PATH)
+    with HistorySink(HIST_PATH) as sink:
+        result = grasp(
+            teams,
+            dates,
+            max_iter=MAX_ITER,
+            max_iter_no_improve=MAX_ITER_NO_IMPROVE,
+            alpha_pool=ALPHA_POOL,
+            seed=SEED,
+            prv_days=PRV_DAYS,
+            min_team_rest_days=MIN_TEAM_REST_DAYS,
+            history_sink=sink,
+        )
 
     header = (
         f"  {'Iter':>4} | {'Seed':>5} | {'a':>4} | "
@@ -263,7 +270,6 @@ def main() -> None:
 
     # ── Etapa 7 — Exportacao ─────────────────────────────────────
     _sep("Etapa 7 -- Exportacao")
-    os.makedirs("results", exist_ok=True)
 
     sched_path = "results/schedule_grasp.csv"
     with open(sched_path, "w", newline="", encoding="utf-8") as f:
@@ -273,13 +279,7 @@ def main() -> None:
             writer.writerow([sm.round, sm.day, sm.home, sm.away, sm.stadium, sm.home_state, sm.away_state])
     print(f"  Schedule salvo em: {sched_path}")
 
-    hist_path = "results/grasp_history.csv"
-    with open(hist_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["iter", "seed", "alpha", "total_prv", "total_cost", "is_feasible", "is_new_best"])
-        for h in result.history:
-            writer.writerow([h.iter_number, h.seed, h.alpha, h.total_prv, h.total_cost, h.is_feasible, h.is_new_best])
-    print(f"  Historico salvo em: {hist_path}")
+    print(f"  Historico salvo em: {HIST_PATH} (gravado durante o loop)")
 
     comp_path = "results/comparison_summary.csv"
     with open(comp_path, "w", newline="", encoding="utf-8") as f:
@@ -0,0 +1,177 @@
+"""
+Benchmark de escala da construção: ligas de 16, 20, 24, 32 e 40 times.
+
+Para cada tamanho, com times sintéticos e datas diárias suficientes:
+  - build_matches_with_homes   (confrontos + mandos, backend "convolution")
+  - construct_schedule         (inclui atribuição de datas)
+  - evaluate_counts            (com n_teams da liga)
+
+A coluna "recontagem" repete construct_schedule com a otimização de PRV
+anterior (`_optimize_full_recount`: reconta o PRV da rodada inteira a cada
+troca), como base de comparação do delta por estádio.
+
+No fim, a atribuição de datas com os times reais (data/raw/teams.csv, que
+tem estádio compartilhado), com e sem o delta por estádio, e a comparação
+por round_span entre date_strategy="greedy" (distribuição + trocas de
+pares) e "assignment" (atribuição de custo mínimo por rodada): tempo e PRV
+médios.
+
+Uso:
+    python scripts/bench_construction.py [n_seeds] [tamanhos...]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Iterator
+
+sys.path.insert(0, "src")
+
+from brasileirao import construction
+from brasileirao.construction import (
+    _check_rest,
+    _round_prv_count,
+    assign_dates_to_matches,
+    build_matches_with_homes,
+    construct_schedule,
+)
+from brasileirao.domain import Match, Team, TeamMap
+from brasileirao.io import load_teams
+from brasileirao.objective import count_prv, evaluate_counts
+from brasileirao.schedule_index import turno_length
+
+STATES = ["SP", "RJ", "MG", "PR", "RS", "BA", "CE", "PE", "SC", "GO", "MT", "PA"]
+
+
+def _league(n: int) -> TeamMap:
+    return {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i:02d}", state=STATES[i % len(STATES)])
+        for i in range(n)
+    }
+
+
+def _dates(n_teams: int, round_gap: int = 7) -> list[date]:
+    n_rounds = 2 * turno_length(n_teams)
+    start = date(2023, 8, 20)
+    return [start + timedelta(days=i) for i in range(n_rounds * round_gap)]
+
+
+def _optimize_full_recount(
+    atribuicao: list[tuple[Match, date]],
+    prev_stadium_dates: dict[str, list[date]],
+    stadium_of: dict[str, str],
+    prv_days: int,
+    last_play: dict[str, date],
+    min_rest: int,
+) -> list[tuple[Match, date]]:
+    """`_optimize_local_prv` antes do delta: reconta a rodada a cada troca."""
+    improved = True
+    while improved:
+        improved = False
+        best_prv = _round_prv_count(atribuicao, prev_stadium_dates, stadium_of, prv_days)
+        for i in range(len(atribuicao)):
+            for j in range(i + 1, len(atribuicao)):
+                if atribuicao[i][1] == atribuicao[j][1]:
+                    continue
+                mi, di = atribuicao[i]
+                mj, dj = atribuicao[j]
+                if not _check_rest(mi, dj, last_play, min_rest):
+                    continue
+                if not _check_rest(mj, di, last_play, min_rest):
+                    continue
+                atribuicao[i] = (mi, dj)
+                atribuicao[j] = (mj, di)
+                new_prv = _round_prv_count(
+                    atribuicao, prev_stadium_dates, stadium_of, prv_days
+                )
+                if new_prv < best_prv:
+                    best_prv = new_prv
+                    improved = True
+                else:
+                    atribuicao[i] = (mi, di)
+                    atribuicao[j] = (mj, dj)
+    return atribuicao
+
+
+@contextmanager
+def _full_recount() -> Iterator[None]:
+    """Troca a otimização de PRV da construção pela recontagem completa."""
+    original = construction._optimize_local_prv
+    construction._optimize_local_prv = _optimize_full_recount
+    try:
+        yield
+    finally:
+        construction._optimize_local_prv = original
+
+
+def main() -> None:
+    n_seeds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    sizes = [int(x) for x in sys.argv[2:]] or [16, 20, 24, 32, 40]
+
+    print(f"{n_seeds} seeds por tamanho (tempos médios)")
+    print(f"{'times':>5} {'rodadas':>7} {'jogos':>6} {'confrontos':>11} "
+          f"{'schedule':>10} {'recontagem':>11} {'avaliação':>10}  chave lex (seed 0)")
+    for n in sizes:
+        teams = _league(n)
+        dates = _dates(n)
+
+        start = time.perf_counter()
+        for seed in range(n_seeds):
+            build_matches_with_homes(teams, seed=seed)
+        t_matches = (time.perf_counter() - start) / n_seeds
+
+        start = time.perf_counter()
+        schedules = [construct_schedule(teams, dates, seed=seed) for seed in range(n_seeds)]
+        t_schedule = (time.perf_counter() - start) / n_seeds
+
+        with _full_recount():
+            start = time.perf_counter()
+            baseline = [construct_schedule(teams, dates, seed=seed) for seed in range(n_seeds)]
+            t_baseline = (time.perf_counter() - start) / n_seeds
+        assert baseline == schedules
+
+        start = time.perf_counter()
+        counts = [evaluate_counts(s, n_teams=n) for s in schedules]
+        t_eval = (time.perf_counter() - start) / n_seeds
+
+        print(f"{n:>5} {2 * turno_length(n):>7} {len(schedules[0]):>6} "
+              f"{t_matches * 1e3:>8.1f} ms {t_schedule * 1e3:>7.1f} ms "
+              f"{t_baseline * 1e3:>8.1f} ms {t_eval * 1e3:>7.1f} ms  {counts[0].lexicographic_key()}")
+
+    teams = load_teams("data/raw/teams.csv")
+    dates = _dates(len(teams))
+    built = [build_matches_with_homes(teams, seed=seed) for seed in range(n_seeds)]
+    start = time.perf_counter()
+    delta = [assign_dates_to_matches(m, dates, teams) for m in built]
+    t_dates = (time.perf_counter() - start) / n_seeds
+    with _full_recount():
+        start = time.perf_counter()
+        full = [assign_dates_to_matches(m, dates, teams) for m in built]
+        t_full = (time.perf_counter() - start) / n_seeds
+    assert full == delta
+    print(f"times reais: atribuição de datas {t_dates * 1e3:.1f} ms "
+          f"(recontagem completa {t_full * 1e3:.1f} ms, {t_full / t_dates:.1f}x)")
+
+    print(f"{'span':>5} {'greedy':>10} {'PRV':>6} {'assignment':>11} {'PRV':>6}")
+    for span in (3, 4, 5, 6, 7):
+        row = []
+        for strategy in ("greedy", "assignment"):
+            start = time.perf_counter()
+            schedules = [
+                assign_dates_to_matches(
+                    m, dates, teams, round_span=span, date_strategy=strategy
+                )
+                for m in built
+            ]
+            elapsed = (time.perf_counter() - start) / n_seeds
+            prv = sum(count_prv(s) for s in schedules) / n_seeds
+            row.append((elapsed, prv))
+        (t_greedy, prv_greedy), (t_assign, prv_assign) = row
+        print(f"{span:>5} {t_greedy * 1e3:>7.1f} ms {prv_greedy:>6.1f} "
+              f"{t_assign * 1e3:>8.1f} ms {prv_assign:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark de avaliação: backend Python (dicts + loops) vs backend NumPy.
+
+Mede, sobre schedules construídos a partir dos dados reais:
+  - evaluate(schedule)                       (backend padrão)
+  - evaluate(schedule, backend="numpy")      (inclui conversão p/ ScheduleMatrix)
+  - evaluate_counts(schedule[, backend])     (só contagens, sem detalhes)
+  - matrix_counts(matrix)                    (só contagens, matriz pronta)
+  - evaluate_many(população)                 (K schedules numa chamada)
+
+Uso:
+    python scripts/bench_evaluate.py [n_schedules] [repeticoes]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, "src")
+
+from brasileirao.construction import construct_schedule
+from brasileirao.domain import ScheduleMatrix
+from brasileirao.io import load_dates, load_teams
+from brasileirao.objective import evaluate, evaluate_counts, evaluate_many
+from brasileirao.vectorized import matrix_counts
+
+
+def _time_per_call(fn, items, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (repeats * len(items))
+
+
+def main() -> None:
+    n_schedules = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    teams = load_teams("data/raw/teams.csv")
+    raw_dates = load_dates("data/raw/datas_20-08-2023_a_09-06-2024.csv")
+    dates = [datetime.strptime(d, "%d/%m/%Y").date() for d in raw_dates]
+    schedules = [construct_schedule(teams, dates, seed=s) for s in range(n_schedules)]
+    matrices = [ScheduleMatrix.from_schedule(s) for s in schedules]
+
+    for s in schedules:
+        py = evaluate(s)
+        vec = evaluate(s, backend="numpy")
+        assert py.violations_by_type == vec.violations_by_type
+        assert py.lexicographic_key() == vec.lexicographic_key()
+
+    t_python = _time_per_call(evaluate, schedules, repeats)
+    t_numpy = _time_per_call(lambda s: evaluate(s, backend="numpy"), schedules, repeats)
+    t_counts_py = _time_per_call(evaluate_counts, schedules, repeats)
+    t_counts_np = _time_per_call(
+        lambda s: evaluate_counts(s, backend="numpy"), schedules, repeats
+    )
+    t_counts = _time_per_call(matrix_counts, matrices, repeats)
+
+    print(f"{n_schedules} schedules x {repeats} repetições")
+    print(f"  evaluate (python)        : {t_python * 1e3:8.3f} ms/schedule")
+    print(f"  evaluate (numpy)         : {t_numpy * 1e3:8.3f} ms/schedule"
+          f"  ({t_python / t_numpy:5.1f}x)")
+    print(f"  evaluate_counts (python) : {t_counts_py * 1e3:8.3f} ms/schedule"
+          f"  ({t_python / t_counts_py:5.1f}x)")
+    print(f"  evaluate_counts (numpy)  : {t_counts_np * 1e3:8.3f} ms/schedule"
+          f"  ({t_python / t_counts_np:5.1f}x)")
+    print(f"  matrix_counts (matriz)   : {t_counts * 1e3:8.3f} ms/schedule"
+          f"  ({t_python / t_counts:5.1f}x)")
+
+    # População: os mesmos schedules replicados até ~200 linhas.
+    population = (schedules * (200 // n_schedules + 1))[:200]
+    population_m = (matrices * (200 // n_schedules + 1))[:200]
+    t_loop = _time_per_call(
+        lambda pop: [evaluate_counts(s) for s in pop], [population], repeats
+    ) / len(population)
+    t_many = _time_per_call(evaluate_many, [population], repeats) / len(population)
+    t_many_m = _time_per_call(evaluate_many, [population_m], repeats) / len(population)
+    print(f"população de {len(population)} schedules")
+    print(f"  loop evaluate_counts     : {t_loop * 1e3:8.3f} ms/schedule")
+    print(f"  evaluate_many (Schedule) : {t_many * 1e3:8.3f} ms/schedule"
+          f"  ({t_loop / t_many:5.1f}x)")
+    print(f"  evaluate_many (matrizes) : {t_many_m * 1e3:8.3f} ms/schedule"
+          f"  ({t_loop / t_many_m:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import List, Sequence
+
+
+def min_cost_assignment(cost: Sequence[Sequence[int]]) -> List[int]:
+    """Atribuição de custo mínimo (método húngaro com potenciais).
+
+    `cost[i][j]` é o custo de atribuir a linha i à coluna j; exige
+    nº de linhas <= nº de colunas. Retorna a coluna de cada linha, com
+    colunas distintas. O(n² · m) para n linhas e m colunas.
+
+    Capacidades entram por expansão: uma coluna com capacidade c vira c
+    colunas iguais.
+    """
+    n = len(cost)
+    if n == 0:
+        return []
+    m = len(cost[0])
+    if n > m:
+        raise ValueError(f"Mais linhas ({n}) que colunas ({m}).")
+
+    inf = float("inf")
+    # Índices 1-based; coluna 0 é a sentinela do caminho aumentante.
+    u = [0] * (n + 1)
+    v = [0] * (m + 1)
+    row_of = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        row_of[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            row = cost[i0 - 1]
+            ui0 = u[i0]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                cur = row[j - 1] - ui0 - v[j]
+                if cur < minv[j]:
+                    minv[j] = cur
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[row_of[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+
+    col_of = [0] * n
+    for j in range(1, m + 1):
+        if row_of[j]:
+            col_of[row_of[j] - 1] = j - 1
+    return col_of
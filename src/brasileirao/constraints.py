@@ -1,202 +1,280 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Callable, Dict, List, Tuple
+from typing import Callable, Dict, FrozenSet, List, Tuple, Union
 
-from .domain import ConstraintViolation, Schedule, ScheduledMatch
+from .domain import (
+    ConstraintViolation,
+    PRVOccurrence,
+    ScheduledMatch,
+    ScheduleLike,
+)
+from .schedule_index import (
+    TURNO_FIRST,  # noqa: F401  (reexportado; usado por delta e vectorized)
+    ScheduleIndex,
+    as_index,
+    required_indexes,
+    requires,
+)
 
-TURNO_FIRST = 1
-TURNO_LAST = 19
-RETURNO_LAST = 38
+RETURNO_LAST = 38  # liga de 20 times; ver ScheduleIndex.returno_last
+
+# Entrada das checagens: o schedule, ou o índice compartilhado de evaluate.
+CheckInput = Union[ScheduleLike, ScheduleIndex]
+
+BACKENDS = ("python", "numpy")
 
 
 def _inverse_side(side: str) -> str:
     return "away" if side == "home" else "home"
 
 
-def check_a_max_one_game_per_round(schedule: Schedule) -> List[ConstraintViolation]:
-    violations: List[ConstraintViolation] = []
-    by_round: Dict[int, List[ScheduledMatch]] = defaultdict(list)
-    for m in schedule:
-        by_round[m.round].append(m)
-
-    for r, matches in by_round.items():
+# ---------------------------------------------------------------------------
+# Construtores de violações (compartilhados pelos backends python e numpy)
+# ---------------------------------------------------------------------------
+
+def _violation_a(team: str, r: int) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="a",
+        description=f"Time {team} aparece mais de uma vez na rodada {r}",
+        round=r,
+        team=team,
+    )
+
+
+def _violation_b_pair(a: str, b: str, cnt: int) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="b",
+        description=f"Par {a} vs {b} aparece {cnt} vezes (esperado 2)",
+    )
+
+
+def _violation_b_direction(h: str, a: str, cnt: int) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="b",
+        description=f"Confronto {h} (casa) vs {a} aparece {cnt} vezes (esperado no máximo 1)",
+    )
+
+
+def _violation_c(team: str, s1: str, s2: str) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="c",
+        description=f"Time {team}: mando '{s1}' em R1 e '{s2}' em R2 (deveria alternar)",
+        round=2,
+        team=team,
+    )
+
+
+def _violation_d(
+    team: str, r_end: int, s_end: str, r_start: int, s_start: str
+) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="d",
+        description=(
+            f"Time {team}: mando em R{r_end} ('{s_end}') não é espelho "
+            f"de R{r_start} ('{s_start}')"
+        ),
+        round=r_end,
+        team=team,
+    )
+
+
+def _violation_e(
+    home: str,
+    home_state: str,
+    away: str,
+    away_state: str,
+    r: int = RETURNO_LAST,
+) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="e",
+        description=(
+            f"R{r}: {home} ({home_state}) x "
+            f"{away} ({away_state}) — mesmo estado"
+        ),
+        round=r,
+    )
+
+
+def _violation_f(team: str, h: int, a: int) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="f",
+        description=(
+            f"Time {team} no turno: {h} casa, {a} fora "
+            f"(|diff| = {abs(h - a)} > 1)"
+        ),
+        team=team,
+    )
+
+
+def _violation_g(
+    team: str, run_len: int, run_side: str, run_start: int
+) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="g",
+        description=(
+            f"Time {team}: {run_len} jogos consecutivos como "
+            f"'{run_side}' a partir de R{run_start}"
+        ),
+        round=run_start,
+        team=team,
+    )
+
+
+def _violation_h(occ: PRVOccurrence) -> ConstraintViolation:
+    return ConstraintViolation(
+        constraint_id="h",
+        description=(
+            f"PRV em {occ.stadium}: {occ.match_a.day} → {occ.match_b.day} "
+            f"({occ.days_between} dias)"
+        ),
+        round=occ.match_b.round,
+        stadium=occ.stadium,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Checagens (a)–(h)
+# ---------------------------------------------------------------------------
+
+def _repeated_in_round(index: ScheduleIndex) -> List[Tuple[str, int]]:
+    repeated: List[Tuple[str, int]] = []
+    for r, matches in index.by_round.items():
         seen: set[str] = set()
         for m in matches:
             for team in (m.home, m.away):
                 if team in seen:
-                    violations.append(
-                        ConstraintViolation(
-                            constraint_id="a",
-                            description=f"Time {team} aparece mais de uma vez na rodada {r}",
-                            round=r,
-                            team=team,
-                        )
-                    )
+                    repeated.append((team, r))
                 seen.add(team)
-    return violations
+    return repeated
 
 
-def check_b_double_round_robin(schedule: Schedule) -> List[ConstraintViolation]:
-    """Cada par (A,B) aparece 2× no total; cada direção (home,away) no máx 1×."""
-    pair_count: Dict[frozenset, int] = defaultdict(int)
-    direction_count: Dict[Tuple[str, str], int] = defaultdict(int)
-    for m in schedule:
-        pair_count[frozenset([m.home, m.away])] += 1
-        direction_count[(m.home, m.away)] += 1
+@requires("by_round")
+def check_a_max_one_game_per_round(schedule: CheckInput) -> List[ConstraintViolation]:
+    index = as_index(schedule, "by_round")
+    return [_violation_a(team, r) for team, r in _repeated_in_round(index)]
 
-    violations: List[ConstraintViolation] = []
-    for pair, cnt in pair_count.items():
-        if cnt != 2:
-            a, b = tuple(pair)
-            violations.append(
-                ConstraintViolation(
-                    constraint_id="b",
-                    description=f"Par {a} vs {b} aparece {cnt} vezes (esperado 2)",
-                )
-            )
-    for (h, a), cnt in direction_count.items():
-        if cnt > 1:
-            violations.append(
-                ConstraintViolation(
-                    constraint_id="b",
-                    description=f"Confronto {h} (casa) vs {a} aparece {cnt} vezes (esperado no máximo 1)",
-                )
-            )
+
+def _b_offenders(
+    index: ScheduleIndex,
+) -> Tuple[List[Tuple[str, str, int]], List[Tuple[str, str, int]]]:
+    pairs = [(*tuple(pair), cnt) for pair, cnt in index.pair_count.items() if cnt != 2]
+    directions = [
+        (h, a, cnt) for (h, a), cnt in index.direction_count.items() if cnt > 1
+    ]
+    return pairs, directions  # type: ignore[return-value]
+
+
+@requires("pair_count", "direction_count")
+def check_b_double_round_robin(schedule: CheckInput) -> List[ConstraintViolation]:
+    """Cada par (A,B) aparece 2× no total; cada direção (home,away) no máx 1×."""
+    pairs, directions = _b_offenders(as_index(schedule, "pair_count", "direction_count"))
+    violations = [_violation_b_pair(a, b, cnt) for a, b, cnt in pairs]
+    violations.extend(_violation_b_direction(h, a, cnt) for h, a, cnt in directions)
     return violations
 
 
-def _sides_in_round(schedule: Schedule, target_round: int) -> Dict[str, str]:
-    sides: Dict[str, str] = {}
-    for m in schedule:
-        if m.round == target_round:
-            sides[m.home] = "home"
-            sides[m.away] = "away"
-    return sides
+def _sides_in_round(schedule: CheckInput, target_round: int) -> Dict[str, str]:
+    return as_index(schedule, "sides_by_round").sides(target_round)
 
 
-def check_c_first_two_rounds_alternation(schedule: Schedule) -> List[ConstraintViolation]:
-    side_r1 = _sides_in_round(schedule, 1)
-    side_r2 = _sides_in_round(schedule, 2)
+def _c_offenders(index: ScheduleIndex) -> List[Tuple[str, str, str]]:
+    side_r1 = index.sides(1)
+    side_r2 = index.sides(2)
+    return [
+        (team, s1, s1)
+        for team, s1 in side_r1.items()
+        if side_r2.get(team) == s1
+    ]
 
-    violations: List[ConstraintViolation] = []
-    for team, s1 in side_r1.items():
-        s2 = side_r2.get(team)
-        if s2 is not None and s1 == s2:
-            violations.append(
-                ConstraintViolation(
-                    constraint_id="c",
-                    description=f"Time {team}: mando '{s1}' em R1 e '{s2}' em R2 (deveria alternar)",
-                    round=2,
-                    team=team,
-                )
-            )
-    return violations
 
+@requires("sides_by_round")
+def check_c_first_two_rounds_alternation(
+    schedule: CheckInput, *, n_teams: int | None = None
+) -> List[ConstraintViolation]:
+    index = as_index(schedule, "sides_by_round", n_teams=n_teams)
+    return [_violation_c(*offender) for offender in _c_offenders(index)]
 
-def check_d_last_two_rounds_mirror(schedule: Schedule) -> List[ConstraintViolation]:
-    side_r1 = _sides_in_round(schedule, 1)
-    side_r2 = _sides_in_round(schedule, 2)
-    side_r18 = _sides_in_round(schedule, 18)
-    side_r19 = _sides_in_round(schedule, 19)
 
-    violations: List[ConstraintViolation] = []
+def _d_offenders(index: ScheduleIndex) -> List[Tuple[str, int, str, int, str]]:
+    """Espelho R1↔R(T-1) e R2↔RT, com T = último round do turno (R18/R19)."""
+    r_last = index.turno_last
+    side_r1 = index.sides(1)
+    side_r2 = index.sides(2)
+    side_pen = index.sides(r_last - 1)
+    side_last = index.sides(r_last)
+
+    offenders: List[Tuple[str, int, str, int, str]] = []
     for team, s1 in side_r1.items():
-        s18 = side_r18.get(team)
-        if s18 is not None and s18 != _inverse_side(s1):
-            violations.append(
-                ConstraintViolation(
-                    constraint_id="d",
-                    description=f"Time {team}: mando em R18 ('{s18}') não é espelho de R1 ('{s1}')",
-                    round=18,
-                    team=team,
-                )
-            )
+        s_pen = side_pen.get(team)
+        if s_pen is not None and s_pen != _inverse_side(s1):
+            offenders.append((team, r_last - 1, s_pen, 1, s1))
     for team, s2 in side_r2.items():
-        s19 = side_r19.get(team)
-        if s19 is not None and s19 != _inverse_side(s2):
-            violations.append(
-                ConstraintViolation(
-                    constraint_id="d",
-                    description=f"Time {team}: mando em R19 ('{s19}') não é espelho de R2 ('{s2}')",
-                    round=19,
-                    team=team,
-                )
-            )
-    return violations
+        s_last = side_last.get(team)
+        if s_last is not None and s_last != _inverse_side(s2):
+            offenders.append((team, r_last, s_last, 2, s2))
+    return offenders
 
 
-def check_e_last_round_no_same_state(schedule: Schedule) -> List[ConstraintViolation]:
-    violations: List[ConstraintViolation] = []
-    for m in schedule:
-        if m.round == RETURNO_LAST and m.home_state == m.away_state:
-            violations.append(
-                ConstraintViolation(
-                    constraint_id="e",
-                    description=(
-                        f"R{RETURNO_LAST}: {m.home} ({m.home_state}) x "
-                        f"{m.away} ({m.away_state}) — mesmo estado"
-                    ),
-                    round=RETURNO_LAST,
-                )
-            )
-    return violations
+@requires("sides_by_round")
+def check_d_last_two_rounds_mirror(
+    schedule: CheckInput, *, n_teams: int | None = None
+) -> List[ConstraintViolation]:
+    """Chamada direta: `n_teams` define R(T-1)/RT (None = 20 times)."""
+    index = as_index(schedule, "sides_by_round", n_teams=n_teams)
+    return [_violation_d(*offender) for offender in _d_offenders(index)]
 
 
-def check_f_home_away_balance_per_turno(schedule: Schedule) -> List[ConstraintViolation]:
-    home_count: Dict[str, int] = defaultdict(int)
-    away_count: Dict[str, int] = defaultdict(int)
-    for m in schedule:
-        if TURNO_FIRST <= m.round <= TURNO_LAST:
-            home_count[m.home] += 1
-            away_count[m.away] += 1
+def _e_offenders(index: ScheduleIndex) -> List[ScheduledMatch]:
+    return [
+        m for m in index.by_round.get(index.returno_last, ())
+        if m.home_state == m.away_state
+    ]
 
-    violations: List[ConstraintViolation] = []
+
+@requires("by_round")
+def check_e_last_round_no_same_state(
+    schedule: CheckInput, *, n_teams: int | None = None
+) -> List[ConstraintViolation]:
+    """Chamada direta: `n_teams` define a última rodada (None = R38)."""
+    index = as_index(schedule, "by_round", n_teams=n_teams)
+    return [
+        _violation_e(m.home, m.home_state, m.away, m.away_state, index.returno_last)
+        for m in _e_offenders(index)
+    ]
+
+
+def _f_offenders(index: ScheduleIndex) -> List[Tuple[str, int, int]]:
+    home_count, away_count = index.turno_balance
+    offenders: List[Tuple[str, int, int]] = []
     for team in set(home_count) | set(away_count):
-        h = home_count[team]
-        a = away_count[team]
+        h = home_count.get(team, 0)
+        a = away_count.get(team, 0)
         if abs(h - a) > 1:
-            violations.append(
-                ConstraintViolation(
-                    constraint_id="f",
-                    description=(
-                        f"Time {team} no turno: {h} casa, {a} fora "
-                        f"(|diff| = {abs(h - a)} > 1)"
-                    ),
-                    team=team,
-                )
-            )
-    return violations
+            offenders.append((team, h, a))
+    return offenders
 
 
-def check_g_max_consecutive_home_or_away(
-    schedule: Schedule, max_consecutive: int = 2
+@requires("turno_balance")
+def check_f_home_away_balance_per_turno(
+    schedule: CheckInput, *, n_teams: int | None = None
 ) -> List[ConstraintViolation]:
-    by_team: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
-    for m in schedule:
-        by_team[m.home].append((m.round, "home"))
-        by_team[m.away].append((m.round, "away"))
+    """Chamada direta: `n_teams` define as rodadas do turno (None = R1–R19)."""
+    index = as_index(schedule, "turno_balance", n_teams=n_teams)
+    return [_violation_f(*offender) for offender in _f_offenders(index)]
 
-    violations: List[ConstraintViolation] = []
-    for team, entries in by_team.items():
-        entries.sort()
+
+def _g_runs(
+    index: ScheduleIndex, max_consecutive: int = 2
+) -> List[Tuple[str, int, str, int]]:
+    runs: List[Tuple[str, int, str, int]] = []
+    for team, entries in index.by_team.items():
         run_side: str | None = None
         run_start: int | None = None
         run_len = 0
 
         def flush() -> None:
             if run_len > max_consecutive and run_side is not None and run_start is not None:
-                violations.append(
-                    ConstraintViolation(
-                        constraint_id="g",
-                        description=(
-                            f"Time {team}: {run_len} jogos consecutivos como "
-                            f"'{run_side}' a partir de R{run_start}"
-                        ),
-                        round=run_start,
-                        team=team,
-                    )
-                )
+                runs.append((team, run_len, run_side, run_start))
 
         for r, side in entries:
             if side == run_side:
@@ -207,30 +285,28 @@ def check_g_max_consecutive_home_or_away(
                 run_start = r
                 run_len = 1
         flush()
-    return violations
+    return runs
 
 
-def check_h_prv(schedule: Schedule, prv_days: int = 5) -> List[ConstraintViolation]:
+@requires("by_team")
+def check_g_max_consecutive_home_or_away(
+    schedule: CheckInput, max_consecutive: int = 2
+) -> List[ConstraintViolation]:
+    return [
+        _violation_g(*run)
+        for run in _g_runs(as_index(schedule, "by_team"), max_consecutive=max_consecutive)
+    ]
+
+
+@requires("by_stadium")
+def check_h_prv(schedule: CheckInput, prv_days: int = 5) -> List[ConstraintViolation]:
     from .objective import compute_prv  # local: evita ciclo de import
 
     result = compute_prv(schedule, prv_days=prv_days)
-    violations: List[ConstraintViolation] = []
-    for occ in result.occurrences:
-        violations.append(
-            ConstraintViolation(
-                constraint_id="h",
-                description=(
-                    f"PRV em {occ.stadium}: {occ.match_a.day} → {occ.match_b.day} "
-                    f"({occ.days_between} dias)"
-                ),
-                round=occ.match_b.round,
-                stadium=occ.stadium,
-            )
-        )
-    return violations
+    return [_violation_h(occ) for occ in result.occurrences]
 
 
-CONSTRAINT_CHECKS: List[Tuple[str, Callable[[Schedule], List[ConstraintViolation]]]] = [
+CONSTRAINT_CHECKS: List[Tuple[str, Callable[[CheckInput], List[ConstraintViolation]]]] = [
     ("a", check_a_max_one_game_per_round),
     ("b", check_b_double_round_robin),
     ("c", check_c_first_two_rounds_alternation),
@@ -241,10 +317,78 @@ CONSTRAINT_CHECKS: List[Tuple[str, Callable[[Schedule], List[ConstraintViolation
     ("h", check_h_prv),
 ]
 
+_BUILTIN_CHECKS: Dict[str, Callable] = dict(CONSTRAINT_CHECKS)
 
-def check_all(schedule: Schedule) -> List[ConstraintViolation]:
-    """Executa todas as checagens do registry e concatena resultados."""
-    violations: List[ConstraintViolation] = []
+
+def is_builtin_check(constraint_id: str, check: Callable) -> bool:
+    """True se `check` é a checagem padrão registrada para `constraint_id`."""
+    return _BUILTIN_CHECKS.get(constraint_id) is check
+
+
+def registry_indexes() -> FrozenSet[str]:
+    """União dos índices declarados (@requires) pelas checagens do registry."""
+    names: set[str] = set()
     for _, check in CONSTRAINT_CHECKS:
-        violations.extend(check(schedule))
+        names |= required_indexes(check) or set()
+    return frozenset(names)
+
+
+def check_input(check: Callable, schedule: ScheduleLike, index: ScheduleIndex) -> CheckInput:
+    """O que passar para `check`: o índice compartilhado, se ela declarou
+    índices via @requires; senão o próprio schedule (checagens legadas)."""
+    return index if required_indexes(check) is not None else schedule
+
+
+# Contagem sem montar ConstraintViolation/descrições, para (a)–(g).
+# (h) é contada direto pelo total de PRV (ver objective.count_prv).
+BUILTIN_COUNTS: Dict[str, Callable[[ScheduleIndex], int]] = {
+    "a": lambda s: len(_repeated_in_round(s)),
+    "b": lambda s: sum(map(len, _b_offenders(s))),
+    "c": lambda s: len(_c_offenders(s)),
+    "d": lambda s: len(_d_offenders(s)),
+    "e": lambda s: len(_e_offenders(s)),
+    "f": lambda s: len(_f_offenders(s)),
+    "g": lambda s: len(_g_runs(s)),
+}
+
+
+def check_all(
+    schedule: ScheduleLike,
+    *,
+    backend: str = "python",
+    n_teams: int | None = None,
+) -> List[ConstraintViolation]:
+    """Executa todas as checagens do registry e concatena resultados.
+
+    No backend Python, os índices declarados pelas checagens (@requires)
+    são montados uma única vez, numa passada, e compartilhados.
+
+    `n_teams` define as rodadas de (d), (e) e (f) (ver `schedule_index.turno_length`);
+    None = liga de 20 times.
+
+    `backend="numpy"` usa as versões vetorizadas de `vectorized.py` para as
+    checagens padrão (a)–(h); checagens extras do registry, ou schedules que
+    não cabem em ScheduleMatrix, seguem pelo caminho Python. A ordem das
+    violações dentro de cada restrição pode diferir entre backends.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend deve ser um de {BACKENDS}; recebido {backend!r}")
+
+    vectorized_violations: Dict[str, List[ConstraintViolation]] = {}
+    if backend == "numpy":
+        from .vectorized import matrix_violations, to_matrix  # local: evita ciclo
+
+        matrix = to_matrix(schedule)
+        if matrix is not None:
+            vectorized_violations = matrix_violations(matrix, n_teams=n_teams)
+
+    index: ScheduleIndex | None = None
+    violations: List[ConstraintViolation] = []
+    for cid, check in CONSTRAINT_CHECKS:
+        if cid in vectorized_violations and is_builtin_check(cid, check):
+            violations.extend(vectorized_violations[cid])
+            continue
+        if index is None:
+            index = ScheduleIndex(schedule, registry_indexes(), n_teams=n_teams)
+        violations.extend(check(check_input(check, index.schedule, index)))
     return violations
@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import random
+from bisect import bisect_left, bisect_right, insort
 from datetime import date
+from functools import lru_cache
+from itertools import product
 from math import ceil
 from typing import Iterator
 
-from .domain import Match, Schedule, ScheduledMatch, TeamMap
-from .round_robin import circle_method
+import numpy as np
+
+from .assignment import min_cost_assignment
+from .domain import Match, Schedule, ScheduledMatch, TeamMap, format_day
+from .round_robin import FACTORIZATIONS, circle_method, starter_method
+from .schedule_index import turno_length
 
 MatchesByRound = dict[int, list[Match]]
 
@@ -15,9 +22,21 @@ CONSTRUCTION_WEIGHTS = {
     "g": 300.0,
 }
 
+# Amostradores da RCL da Etapa B. Para a mesma seed todos produzem o mesmo
+# schedule; "enumerate" é a referência que materializa os candidatos.
+CONSTRUCTION_BACKENDS = ("enumerate", "convolution", "numpy")
+
+# Atribuição de datas por rodada: "greedy" (distribuição balanceada +
+# trocas de pares) ou "assignment" (atribuição de custo mínimo, exata).
+DATE_STRATEGIES = ("greedy", "assignment")
+
+# "enumerate" e "numpy" varrem 2^pares máscaras por matching; acima disso
+# (ligas com mais de 24 times) só "convolution", polinomial, é aceito.
+_MAX_ENUMERATED_PAIRS = 12
+
 
 class ConstructionFailedError(Exception):
-    """Levantada se a construção esgota matchings sem completar 19 rodadas."""
+    """Levantada se a construção esgota matchings sem completar o turno."""
 
 
 # ---------------------------------------------------------------------------
@@ -116,19 +135,19 @@ def _orient_inverting_sides(
     return out
 
 
-def _two_color_pair_union(
+def _pair_union_components(
     r1_pairs: list[tuple[str, str]],
     r2_pairs: list[tuple[str, str]],
     teams: list[str],
-    rng: random.Random,
-) -> dict[str, str]:
-    """2-colore o grafo formado pela união das arestas de R1 e R2.
+) -> list[list[tuple[str, int]]]:
+    """Componentes conexos do grafo formado pela união das arestas de R1 e R2.
 
     Esse grafo é sempre bipartido: cada vértice tem grau 2 (uma aresta de
-    cada matching) e os ciclos formados alternam arestas de R1/R2, então têm
-    tamanho par. A 2-coloração define `sides_r1`, e como cada aresta de R2
-    liga vértices de cores opostas, R2 fica automaticamente "perfectly cut"
-    em relação a `sides_r1` — i.e., (c) sai estrita."""
+    cada matching; menos com BYE) e os ciclos formados alternam arestas de
+    R1/R2, então têm tamanho par. Cada componente é uma lista de
+    `(time, paridade)`, com paridade 0 para a cor do primeiro time (em
+    ordem de `teams`) e 1 para a oposta. Não depende do RNG: a
+    `ConstructionContext` guarda o resultado por par de âncoras."""
     adj: dict[str, list[str]] = {t: [] for t in teams}
     for a, b in r1_pairs:
         adj[a].append(b)
@@ -137,20 +156,41 @@ def _two_color_pair_union(
         adj[a].append(b)
         adj[b].append(a)
 
-    sides: dict[str, str] = {}
+    parity: dict[str, int] = {}
+    components: list[list[tuple[str, int]]] = []
     for start in teams:
-        if start in sides:
+        if start in parity:
             continue
-        sides[start] = "H" if rng.random() < 0.5 else "A"
+        parity[start] = 0
+        component = [(start, 0)]
         stack = [start]
         while stack:
             cur = stack.pop()
-            cur_side = sides[cur]
-            other = "A" if cur_side == "H" else "H"
+            other = 1 - parity[cur]
             for neigh in adj[cur]:
-                if neigh not in sides:
-                    sides[neigh] = other
+                if neigh not in parity:
+                    parity[neigh] = other
+                    component.append((neigh, other))
                     stack.append(neigh)
+        components.append(component)
+    return components
+
+
+def _color_components(
+    components: list[list[tuple[str, int]]],
+    rng: random.Random,
+) -> dict[str, str]:
+    """2-coloração de R1 ∪ R2: sorteia a cor do primeiro time de cada
+    componente (um `rng.random()` por componente, na ordem de `teams`).
+
+    A coloração define `sides_r1`, e como cada aresta de R2 liga vértices
+    de cores opostas, R2 fica automaticamente "perfectly cut" em relação a
+    `sides_r1` — i.e., (c) sai estrita."""
+    sides: dict[str, str] = {}
+    for component in components:
+        start_home = rng.random() < 0.5
+        for team, parity in component:
+            sides[team] = "H" if start_home != bool(parity) else "A"
     return sides
 
 
@@ -179,39 +219,116 @@ def _chain_g_violations(
     return g
 
 
+def _side_cost(
+    t: int,
+    side: int,               # 1=H, 2=A
+    target_sides: list[int],
+    last_side: list[int],
+    streak: list[int],
+    max_cons: int,
+) -> tuple[int, int, int]:
+    """Custo (10·d + 1000·g) de `t` jogar com `side` e o estado resultante
+    (last, streak) do time."""
+    cost = 10 if target_sides[t] != side else 0
+    if last_side[t] == side:
+        s = streak[t] + 1
+        if s > max_cons:
+            cost += 1000
+    else:
+        s = 1
+    return cost, side, s
+
+
+def _best_orientation_for_round(
+    pairs: list[tuple[str, str]],
+    team_to_idx: dict[str, int],
+    target_sides: list[int],
+    in_last: list[int],
+    in_streak: list[int],
+    max_cons: int,
+) -> tuple[list[tuple[str, str]], list[int], list[int], list[int], int]:
+    """Orientação de menor custo (10·d_resid + 1000·g) para uma rodada.
+
+    Retorna (oriented, sides_int, new_last, new_streak, cost). Cada time
+    aparece em exatamente um par da rodada, então o resíduo de (d) e as
+    violações de (g) se separam por par: o ótimo global é a escolha ótima de
+    cada par, em O(pares) em vez das 2^pares máscaras. Empate num par fica
+    com `(b, a)` (bit desligado), reproduzindo a menor máscara ótima que a
+    enumeração `for mask in range(1 << npairs)` com `<` estrito escolheria.
+    """
+    n = len(in_last)
+    new_last = list(in_last)
+    new_streak = list(in_streak)
+    sides_int = [0] * n
+    oriented: list[tuple[str, str]] = []
+    total = 0
+    for a, b in pairs:
+        ai = team_to_idx[a]
+        bi = team_to_idx[b]
+        # bit ligado: a manda.
+        ca_h = _side_cost(ai, 1, target_sides, in_last, in_streak, max_cons)
+        cb_a = _side_cost(bi, 2, target_sides, in_last, in_streak, max_cons)
+        # bit desligado: b manda.
+        cb_h = _side_cost(bi, 1, target_sides, in_last, in_streak, max_cons)
+        ca_a = _side_cost(ai, 2, target_sides, in_last, in_streak, max_cons)
+        keep = ca_h[0] + cb_a[0]
+        flip = cb_h[0] + ca_a[0]
+        if keep < flip:
+            oriented.append((a, b))
+            (_, new_last[ai], new_streak[ai]) = ca_h
+            (_, new_last[bi], new_streak[bi]) = cb_a
+            total += keep
+        else:
+            oriented.append((b, a))
+            (_, new_last[bi], new_streak[bi]) = cb_h
+            (_, new_last[ai], new_streak[ai]) = ca_a
+            total += flip
+        sides_int[team_to_idx[oriented[-1][0]]] = 1
+        sides_int[team_to_idx[oriented[-1][1]]] = 2
+    return oriented, sides_int, new_last, new_streak, total
+
+
+_TARGET_SIDE = {"A": 1, "H": 2}
+
+
 def _pick_r18_r19(
-    remaining: list[list[tuple[str, str]]],
+    context: ConstructionContext,
+    remaining: list[int],
     sides_r1: dict[str, str],
     sides_r2: dict[str, str],
-    teams_map: TeamMap,
     last_side: list[int],
     streak: list[int],
     max_cons: int,
     rng: random.Random,
 ) -> tuple[list[tuple[str, str]], list[tuple[str, str]]]:
-    """Atribui os 2 matchings remanescentes a R18 e R19. Considera (e)
+    """Atribui os 2 matchings remanescentes a R18 e R19 — as duas últimas
+    rodadas do turno, R(T-1) e RT em ligas de outro tamanho. Considera (e)
     (R19 limpo se possível), (d) (inverter R1/R2 maximizando residual mínimo)
     e o impacto em (g) da cadeia R17→R18→R19.
 
     Estratégia:
       1. (e) determina quais ordens são permitidas (R19 deve ser limpo
          quando possível; senão escolhe o de menor # clássicos).
-      2. Para cada ordem permitida, enumera 2^10 orientações para R18 e
-         escolhe a que minimiza (d_resid_R18 + 1000·g_R17→R18). Em seguida
-         enumera 2^10 orientações para R19 e escolhe a que minimiza
-         (d_resid_R19 + 1000·g_R18→R19) — dado o estado pós-R18.
+      2. Para cada ordem permitida, escolhe a orientação de R18 que
+         minimiza (10·d_resid_R18 + 1000·g_R17→R18) e, dado o estado
+         pós-R18, a de R19 que minimiza (10·d_resid_R19 + 1000·g_R18→R19)
+         — ver `_best_orientation_for_round`.
       3. Compara as ordens pelo custo total e escolhe a melhor.
+
+    `remaining` são os índices dos 2 matchings em `context.matchings`.
     """
-    teams = list(teams_map.keys())
-    team_to_idx = {t: i for i, t in enumerate(teams)}
-    n = len(teams)
+    teams = context.teams
+    team_to_idx = context.team_to_idx
 
-    target_r18_int = [1 if sides_r1[t] == "A" else 2 for t in teams]
-    target_r19_int = [1 if sides_r2[t] == "A" else 2 for t in teams]
+    # Alvo = lado oposto ao de R1/R2; 0 (sem alvo) para quem folgou (BYE).
+    target_r18_int = [_TARGET_SIDE.get(sides_r1.get(t), 0) for t in teams]
+    target_r19_int = [_TARGET_SIDE.get(sides_r2.get(t), 0) for t in teams]
 
-    m_a, m_b = remaining
-    clean_a = no_classico_estadual(m_a, teams_map)
-    clean_b = no_classico_estadual(m_b, teams_map)
+    id_a, id_b = remaining
+    m_a = list(context.matchings[id_a])
+    m_b = list(context.matchings[id_b])
+    clean_a = context.clean[id_a]
+    clean_b = context.clean[id_b]
 
     if clean_a and not clean_b:
         orderings = [(m_b, m_a)]
@@ -219,8 +336,8 @@ def _pick_r18_r19(
         orderings = [(m_a, m_b)]
     else:
         if not clean_a and not clean_b:
-            cls_a = count_classicos(m_a, teams_map)
-            cls_b = count_classicos(m_b, teams_map)
+            cls_a = context.classicos[id_a]
+            cls_b = context.classicos[id_b]
             if cls_a < cls_b:
                 orderings = [(m_b, m_a)]
             elif cls_b < cls_a:
@@ -230,76 +347,17 @@ def _pick_r18_r19(
         else:
             orderings = [(m_a, m_b), (m_b, m_a)]
 
-    def _best_orientation_for_round(
-        pairs: list[tuple[str, str]],
-        target_sides: list[int],
-        in_last: list[int],
-        in_streak: list[int],
-    ) -> tuple[list[tuple[str, str]], list[int], list[int], list[int], int]:
-        """Retorna (oriented, sides_int, new_last, new_streak, cost)."""
-        npairs = len(pairs)
-        pairs_idx = [(team_to_idx[a], team_to_idx[b]) for a, b in pairs]
-        best_cost = None
-        best_mask = 0
-        for mask in range(1 << npairs):
-            d_resid = 0
-            g_v = 0
-            tmp_last = list(in_last)
-            tmp_streak = list(in_streak)
-            for k in range(npairs):
-                ai, bi = pairs_idx[k]
-                if (mask >> k) & 1:
-                    home_i, away_i = ai, bi
-                else:
-                    home_i, away_i = bi, ai
-                if target_sides[home_i] != 1:
-                    d_resid += 1
-                if target_sides[away_i] != 2:
-                    d_resid += 1
-                if tmp_last[home_i] == 1:
-                    tmp_streak[home_i] += 1
-                    if tmp_streak[home_i] > max_cons:
-                        g_v += 1
-                else:
-                    tmp_last[home_i] = 1
-                    tmp_streak[home_i] = 1
-                if tmp_last[away_i] == 2:
-                    tmp_streak[away_i] += 1
-                    if tmp_streak[away_i] > max_cons:
-                        g_v += 1
-                else:
-                    tmp_last[away_i] = 2
-                    tmp_streak[away_i] = 1
-            cost = 10 * d_resid + 1000 * g_v
-            if best_cost is None or cost < best_cost:
-                best_cost = cost
-                best_mask = mask
-                best_last = tmp_last
-                best_streak = tmp_streak
-
-        oriented = []
-        sides_int = [0] * n
-        for k in range(npairs):
-            a, b = pairs[k]
-            if (best_mask >> k) & 1:
-                oriented.append((a, b))
-                sides_int[team_to_idx[a]] = 1
-                sides_int[team_to_idx[b]] = 2
-            else:
-                oriented.append((b, a))
-                sides_int[team_to_idx[b]] = 1
-                sides_int[team_to_idx[a]] = 2
-        return oriented, sides_int, best_last, best_streak, best_cost  # type: ignore[return-value]
-
     candidates = []
     for r18_pairs, r19_pairs in orderings:
         r18_oriented, _, after_r18_last, after_r18_streak, c18 = (
             _best_orientation_for_round(
-                r18_pairs, target_r18_int, last_side, streak,
+                r18_pairs, team_to_idx, target_r18_int, last_side, streak,
+                max_cons,
             )
         )
         r19_oriented, _, _, _, c19 = _best_orientation_for_round(
-            r19_pairs, target_r19_int, after_r18_last, after_r18_streak,
+            r19_pairs, team_to_idx, target_r19_int, after_r18_last,
+            after_r18_streak, max_cons,
         )
         candidates.append((c18 + c19, r18_oriented, r19_oriented))
 
@@ -376,6 +434,360 @@ def _pick_best_compat(
     return chosen
 
 
+# ---------------------------------------------------------------------------
+# RCL da Etapa B
+# ---------------------------------------------------------------------------
+
+# Por par k do matching: (g se a manda, g se b manda, Δf se a manda,
+# Δf se b manda). Bit k ligado na máscara = a manda.
+PairTerms = tuple[list[int], list[int], list[int], list[int]]
+
+
+def _pair_terms(
+    m_pairs: list[tuple[int, int]],
+    last_side: list[int],
+    streak: list[int],
+    max_cons: int,
+    unfeasible_home: list[int],
+    unfeasible_away: list[int],
+) -> PairTerms:
+    npairs = len(m_pairs)
+    g_a_home = [0] * npairs
+    g_b_home = [0] * npairs
+    df_a_home = [0] * npairs
+    df_b_home = [0] * npairs
+    for k in range(npairs):
+        a, b = m_pairs[k]
+        ga = 0
+        if last_side[a] == 1 and streak[a] + 1 > max_cons:
+            ga += 1
+        if last_side[b] == 2 and streak[b] + 1 > max_cons:
+            ga += 1
+        gb = 0
+        if last_side[b] == 1 and streak[b] + 1 > max_cons:
+            gb += 1
+        if last_side[a] == 2 and streak[a] + 1 > max_cons:
+            gb += 1
+        g_a_home[k] = ga
+        g_b_home[k] = gb
+        df_a_home[k] = unfeasible_home[a] - unfeasible_away[a]
+        df_b_home[k] = unfeasible_home[b] - unfeasible_away[b]
+    return g_a_home, g_b_home, df_a_home, df_b_home
+
+
+def _rcl_pick_enumerate(
+    terms: list[PairTerms],
+    f_bases: list[int],
+    alpha: float,
+    weight_f: float,
+    weight_g: float,
+    rng: random.Random,
+) -> tuple[int, int]:
+    """RCL por enumeração: materializa (matching, máscara) para todas as
+    2^pares máscaras de cada matching e sorteia um com `rng.choice`.
+
+    `f_bases[m]` é o f_v do matching m antes dos termos por par (times
+    fora de casa e, com nº ímpar de times, o que folga).
+    """
+    all_candidates: list[tuple[int, int, int, float]] = []
+    any_g_zero = False
+    for m_idx, (g_a_home, g_b_home, df_a_home, df_b_home) in enumerate(terms):
+        npairs = len(g_a_home)
+        for mask in range(1 << npairs):
+            g_v = 0
+            f_v = f_bases[m_idx]
+            for k in range(npairs):
+                if (mask >> k) & 1:
+                    g_v += g_a_home[k]
+                    f_v += df_a_home[k]
+                else:
+                    g_v += g_b_home[k]
+                    f_v += df_b_home[k]
+            cost = weight_f * f_v + weight_g * g_v
+            all_candidates.append((m_idx, mask, g_v, cost))
+            if g_v == 0:
+                any_g_zero = True
+
+    if any_g_zero:
+        pool = [c for c in all_candidates if c[2] == 0]
+    else:
+        pool = all_candidates
+
+    c_min = min(c[3] for c in pool)
+    c_max = max(c[3] for c in pool)
+    threshold = c_min + alpha * (c_max - c_min)
+    rcl = [c for c in pool if c[3] <= threshold]
+    m_idx, mask, _, _ = rng.choice(rcl)
+    return m_idx, mask
+
+
+def _prefix_distributions(
+    options: list[tuple[tuple[int, int], tuple[int, int]]],
+) -> list[dict[tuple[int, int], int]]:
+    """`out[k]` = nº de orientações dos pares 0..k-1 por (Σ Δf, Σ g).
+
+    `options[k]` = ((Δf, g) com bit desligado, (Δf, g) com bit ligado). Cada
+    passo é a convolução da distribuição anterior com as 2 opções do par.
+    """
+    dist: dict[tuple[int, int], int] = {(0, 0): 1}
+    out = [dist]
+    for opts in options:
+        nxt: dict[tuple[int, int], int] = {}
+        for (f, g), cnt in dist.items():
+            for df, dg in opts:
+                key = (f + df, g + dg)
+                nxt[key] = nxt.get(key, 0) + cnt
+        dist = nxt
+        out.append(dist)
+    return out
+
+
+def _rcl_pick_convolution(
+    terms: list[PairTerms],
+    f_bases: list[int],
+    alpha: float,
+    weight_f: float,
+    weight_g: float,
+    rng: random.Random,
+) -> tuple[int, int]:
+    """Mesma escolha de `_rcl_pick_enumerate`, sem materializar candidatos.
+
+    f e g somam termos independentes por par, então a distribuição de
+    (f, g) sobre as 2^pares máscaras de um matching é a convolução das
+    opções de cada par. Dela saem o filtro de (g), c_min/c_max, o limiar e
+    o tamanho da RCL. O índice é sorteado com `rng.choice(range(|RCL|))` —
+    mesmo consumo do RNG que `rng.choice(rcl)` — e a máscara é
+    reconstruída bit a bit, do mais significativo ao menos, contando as
+    completações que caem na RCL: a ordem da RCL enumerada é (matching,
+    máscara crescente).
+    """
+    prefixes = []
+    for g_a_home, g_b_home, df_a_home, df_b_home in terms:
+        options = [
+            ((df_b_home[k], g_b_home[k]), (df_a_home[k], g_a_home[k]))
+            for k in range(len(g_a_home))
+        ]
+        prefixes.append((options, _prefix_distributions(options)))
+
+    any_g_zero = any(
+        g == 0 for _, prefix in prefixes for (_, g) in prefix[-1]
+    )
+
+    # f guarda f_v absoluto (f_base do matching incluído).
+    def cost(f: int, g: int) -> float:
+        return weight_f * f + weight_g * g
+
+    pool_costs = [
+        cost(f_base + f, g)
+        for f_base, (_, prefix) in zip(f_bases, prefixes)
+        for (f, g) in prefix[-1]
+        if not any_g_zero or g == 0
+    ]
+    c_min = min(pool_costs)
+    c_max = max(pool_costs)
+    threshold = c_min + alpha * (c_max - c_min)
+
+    def in_rcl(f: int, g: int) -> bool:
+        return (not any_g_zero or g == 0) and cost(f, g) <= threshold
+
+    def count(dist: dict[tuple[int, int], int], f0: int, g0: int) -> int:
+        return sum(
+            cnt for (f, g), cnt in dist.items() if in_rcl(f0 + f, g0 + g)
+        )
+
+    sizes = [
+        count(prefix[-1], f_base, 0)
+        for f_base, (_, prefix) in zip(f_bases, prefixes)
+    ]
+    j = rng.choice(range(sum(sizes)))
+
+    m_idx = 0
+    while j >= sizes[m_idx]:
+        j -= sizes[m_idx]
+        m_idx += 1
+
+    options, prefix = prefixes[m_idx]
+    mask = 0
+    f_acc = f_bases[m_idx]
+    g_acc = 0
+    for k in range(len(options) - 1, -1, -1):
+        for bit in (0, 1):
+            df, dg = options[k][bit]
+            c = count(prefix[k], f_acc + df, g_acc + dg)
+            if j < c:
+                break
+            j -= c
+        mask |= bit << k
+        f_acc += df
+        g_acc += dg
+    return m_idx, mask
+
+
+@lru_cache(maxsize=None)
+def _mask_bits(npairs: int) -> np.ndarray:
+    """Matriz (2^npairs, npairs) com `bits[mask, k] = (mask >> k) & 1`."""
+    masks = np.arange(1 << npairs)[:, None]
+    return ((masks >> np.arange(npairs)) & 1).astype(np.int64)
+
+
+def _rcl_pick_numpy(
+    terms: list[PairTerms],
+    f_bases: list[int],
+    alpha: float,
+    weight_f: float,
+    weight_g: float,
+    rng: random.Random,
+) -> tuple[int, int]:
+    """`_rcl_pick_enumerate` com os custos de todas as máscaras de todos os
+    matchings calculados como produtos de matrizes (M × 2^pares)."""
+    g_a, g_b, df_a, df_b = (np.array(t, dtype=np.int64) for t in zip(*terms))
+    npairs = g_a.shape[1]
+    bits = _mask_bits(npairs)
+    flip = 1 - bits
+    g_v = g_a @ bits.T + g_b @ flip.T
+    f_v = np.array(f_bases, dtype=np.int64)[:, None] + df_a @ bits.T + df_b @ flip.T
+    cost = weight_f * f_v + weight_g * g_v
+
+    in_pool = g_v == 0
+    if not in_pool.any():
+        in_pool[:] = True
+    c_min = float(cost[in_pool].min())
+    c_max = float(cost[in_pool].max())
+    threshold = c_min + alpha * (c_max - c_min)
+    # Ordem de np.flatnonzero = (matching, máscara crescente), como na lista.
+    rcl = np.flatnonzero(in_pool & (cost <= threshold))
+    flat = int(rcl[rng.choice(range(len(rcl)))])
+    m_idx, mask = divmod(flat, 1 << npairs)
+    return m_idx, mask
+
+
+_RCL_PICKERS = {
+    "enumerate": _rcl_pick_enumerate,
+    "convolution": _rcl_pick_convolution,
+    "numpy": _rcl_pick_numpy,
+}
+
+
+# ---------------------------------------------------------------------------
+# Contexto da instância
+# ---------------------------------------------------------------------------
+
+class ConstructionContext:
+    """Tabelas da instância que não dependem de seed nem de alpha.
+
+    Montada uma vez por execução (ex.: por `grasp()`) e passada a cada
+    `construct_schedule(..., context=ctx)`, que então só faz as decisões
+    aleatórias. Guarda:
+
+      - times, índices inteiros, estádio e estado por time;
+      - os matchings da fatoração `factorization` (por nome e por
+        índice), seus clássicos estaduais e, com nº ímpar de times, quem
+        folga em cada um;
+      - os componentes da 2-coloração de R1 ∪ R2 por par de âncoras
+        (calculados no primeiro uso de cada par e guardados);
+      - com `dates`, a janela de datas de cada rodada.
+
+    `factorization` (ver FACTORIZATIONS) escolhe os matchings: "circle"
+    (`circle_method`, padrão) ou "starter" (`starter_method` com
+    `factorization_seed`). Com 20 times o circle method é a fatoração
+    perfeita GK_20, sem cadeias de Kempe parciais; "starter" dá uma
+    fatoração em que a vizinhança kempe_chain da busca local tem
+    movimentos.
+    """
+
+    def __init__(
+        self,
+        teams_map: TeamMap,
+        dates: list[date] | None = None,
+        *,
+        round_gap: int = 7,
+        round_span: int = 3,
+        factorization: str = "circle",
+        factorization_seed: int = 0,
+    ) -> None:
+        if factorization not in FACTORIZATIONS:
+            raise ValueError(
+                f"factorization deve ser um de {FACTORIZATIONS}; recebido {factorization!r}"
+            )
+        self.teams_map = teams_map
+        self.teams: tuple[str, ...] = tuple(teams_map)
+        self.n_teams = len(self.teams)
+        self.n_rounds = turno_length(self.n_teams)
+        self.team_to_idx = {t: i for i, t in enumerate(self.teams)}
+        self.stadium_of = {t: team.stadium for t, team in teams_map.items()}
+        self.state_of = {t: team.state for t, team in teams_map.items()}
+
+        self.factorization = factorization
+        rounds = (
+            circle_method(list(self.teams)) if factorization == "circle"
+            else starter_method(list(self.teams), seed=factorization_seed)
+        )
+        self.matchings: tuple[tuple[tuple[str, str], ...], ...] = tuple(
+            tuple(m) for m in rounds
+        )
+        self.matchings_idx: tuple[tuple[tuple[int, int], ...], ...] = tuple(
+            tuple((self.team_to_idx[a], self.team_to_idx[b]) for a, b in m)
+            for m in self.matchings
+        )
+        self.classicos: tuple[int, ...] = tuple(
+            count_classicos(list(m), teams_map) for m in self.matchings
+        )
+        self.clean: tuple[bool, ...] = tuple(c == 0 for c in self.classicos)
+        self.byes: tuple[tuple[int, ...], ...] = tuple(
+            tuple(
+                t for t in range(self.n_teams)
+                if t not in {i for pair in m for i in pair}
+            )
+            for m in self.matchings_idx
+        )
+        self._anchor_components: dict[tuple[int, int], list[list[tuple[str, int]]]] = {}
+
+        self.dates = tuple(dates) if dates is not None else None
+        self.round_gap = round_gap
+        self.round_span = round_span
+        self.windows: tuple[list[date], ...] | None = None
+        if dates is not None:
+            self.windows = tuple(
+                list(dates[(r - 1) * round_gap : (r - 1) * round_gap + round_span])
+                for r in range(1, 2 * self.n_rounds + 1)
+            )
+
+    def anchor_components(self, r1: int, r2: int) -> list[list[tuple[str, int]]]:
+        """Componentes de R1 ∪ R2 para os matchings `r1`, `r2` (índices)."""
+        key = (r1, r2)
+        components = self._anchor_components.get(key)
+        if components is None:
+            components = _pair_union_components(
+                list(self.matchings[r1]), list(self.matchings[r2]), list(self.teams)
+            )
+            self._anchor_components[key] = components
+        return components
+
+    def check(
+        self,
+        teams_map: TeamMap,
+        dates: list[date] | None = None,
+        *,
+        round_gap: int | None = None,
+        round_span: int | None = None,
+    ) -> None:
+        """ValueError se o contexto foi montado para outra instância."""
+        if teams_map is not self.teams_map and (
+            tuple(teams_map) != self.teams or teams_map != self.teams_map
+        ):
+            raise ValueError("ConstructionContext montado para outro conjunto de times.")
+        if dates is None or self.dates is None:
+            return
+        if (
+            tuple(dates) != self.dates
+            or round_gap != self.round_gap
+            or round_span != self.round_span
+        ):
+            raise ValueError(
+                "ConstructionContext montado para outras datas/round_gap/round_span."
+            )
+
+
 # ---------------------------------------------------------------------------
 # API principal
 # ---------------------------------------------------------------------------
@@ -386,6 +798,8 @@ def build_matches_with_homes(
     alpha: float = 0.3,
     seed: int = 42,
     max_consecutive: int = 2,
+    backend: str = "convolution",
+    context: ConstructionContext | None = None,
 ) -> MatchesByRound:
     """Constrói os confrontos do duplo round-robin com mando definido.
 
@@ -400,22 +814,50 @@ def build_matches_with_homes(
     Otimiza via RCL gulosa-aleatória:
       (f) balanço casa/fora no turno
       (g) máximo `max_consecutive` jogos consecutivos em casa/fora
+
+    O tamanho da liga vem de `len(teams_map)`: com n times o turno tem
+    T = `turno_length(n)` rodadas (n - 1, ou n com um BYE por rodada se n
+    é ímpar) e as rodadas acima são, em geral, R1/R2, R(T-1)/RT e R2T.
+
+    `backend` escolhe o amostrador da RCL (ver CONSTRUCTION_BACKENDS); a
+    saída é a mesma para a mesma seed.
+
+    `context` reaproveita as tabelas da instância entre chamadas (ver
+    `ConstructionContext`); sem ele, um contexto é montado aqui. A saída
+    não depende de o contexto ser novo ou reaproveitado.
     """
+    if backend not in CONSTRUCTION_BACKENDS:
+        raise ValueError(
+            f"backend deve ser um de {CONSTRUCTION_BACKENDS}; recebido {backend!r}"
+        )
     rng = random.Random(seed)
     teams = list(teams_map.keys())
     n = len(teams)
-    if n != 20:
+    n_rounds = turno_length(n)
+    if n_rounds < 4:
         raise ConstructionFailedError(
-            f"Esperado 20 times; recebido {n}."
+            f"Esperado ao menos 5 times (R1, R2 e as duas últimas rodadas "
+            f"do turno distintas); recebido {n}."
+        )
+    if backend != "convolution" and n // 2 > _MAX_ENUMERATED_PAIRS:
+        raise ValueError(
+            f"backend {backend!r} enumera 2^{n // 2} orientações por matching; "
+            "use backend='convolution' para ligas com mais de "
+            f"{2 * _MAX_ENUMERATED_PAIRS} times."
         )
 
-    matchings = circle_method(teams)
-    if len(matchings) != 19:
+    if context is None:
+        context = ConstructionContext(teams_map)
+    else:
+        context.check(teams_map)
+    if len(context.matchings) != n_rounds:
         raise ConstructionFailedError(
-            f"circle_method retornou {len(matchings)} matchings; esperado 19."
+            f"A fatoração tem {len(context.matchings)} matchings; "
+            f"esperado {n_rounds}."
         )
 
-    remaining: list[list[tuple[str, str]]] = [list(m) for m in matchings]
+    # Matchings ainda não usados, por índice em `context.matchings`.
+    remaining: list[int] = list(range(n_rounds))
 
     # -- Etapa A: âncoras R1 e R2 ------------------------------------------
     # Pega dois matchings distintos e usa 2-coloring do grafo R1 ∪ R2
@@ -424,12 +866,12 @@ def build_matches_with_homes(
     # de manobra em (f)/(g) — atribuir matchings a essas rodadas com
     # antecedência limita drasticamente o pool de orientações disponíveis
     # nas últimas rodadas da RCL e empurra o solver para violações.
-    r1_idx = rng.randrange(len(remaining))
-    r1_pairs = remaining.pop(r1_idx)
-    r2_idx = rng.randrange(len(remaining))
-    r2_pairs = remaining.pop(r2_idx)
+    r1_id = remaining.pop(rng.randrange(len(remaining)))
+    r2_id = remaining.pop(rng.randrange(len(remaining)))
+    r1_pairs = context.matchings[r1_id]
+    r2_pairs = context.matchings[r2_id]
 
-    sides_r1 = _two_color_pair_union(r1_pairs, r2_pairs, teams, rng)
+    sides_r1 = _color_components(context.anchor_components(r1_id, r2_id), rng)
     r1_oriented = [
         (a, b) if sides_r1[a] == "H" else (b, a) for a, b in r1_pairs
     ]
@@ -438,12 +880,15 @@ def build_matches_with_homes(
     r2_oriented = [
         (a, b) if sides_r1[a] == "A" else (b, a) for a, b in r2_pairs
     ]
+    # Com BYE, quem folgou em R1 é colorido mas não tem lado em R1.
+    sides_r1_played = _sides_from_oriented(r1_oriented)
     sides_r2 = _sides_from_oriented(r2_oriented)
 
     # -- Estado e índices ---------------------------------------------------
-    team_to_idx = {t: i for i, t in enumerate(teams)}
+    team_to_idx = context.team_to_idx
 
     homes = [0] * n
+    played = [0] * n
     last_side = [0] * n  # 0=indef, 1=H, 2=A
     streak = [0] * n
 
@@ -452,6 +897,8 @@ def build_matches_with_homes(
             ih = team_to_idx[h]
             ia = team_to_idx[a]
             homes[ih] += 1
+            played[ih] += 1
+            played[ia] += 1
             if last_side[ih] == 1:
                 streak[ih] += 1
             else:
@@ -474,95 +921,69 @@ def build_matches_with_homes(
     # Reserva um matching limpo (sem clássico estadual) entre os
     # remanescentes para garantir que R19 possa atender (e). Se houver
     # múltiplos limpos, escolhe o de maior compat com a inversão de R2.
-    clean_in_remaining = [
-        m for m in remaining if no_classico_estadual(m, teams_map)
-    ]
-    r19_reserved: list[tuple[str, str]] | None = None
+    clean_in_remaining = [m_id for m_id in remaining if context.clean[m_id]]
+    r19_reserved: int | None = None
     if clean_in_remaining:
-        def _r19_compat(m: list[tuple[str, str]]) -> int:
-            return sum(1 for a, b in m if sides_r2[a] != sides_r2[b])
-        best_compat = max(_r19_compat(m) for m in clean_in_remaining)
-        best_clean = [m for m in clean_in_remaining if _r19_compat(m) == best_compat]
+        def _r19_compat(m_id: int) -> int:
+            return sum(
+                1 for a, b in context.matchings[m_id]
+                if sides_r2.get(a) != sides_r2.get(b)
+            )
+        best_compat = max(_r19_compat(m_id) for m_id in clean_in_remaining)
+        best_clean = [
+            m_id for m_id in clean_in_remaining if _r19_compat(m_id) == best_compat
+        ]
         r19_reserved = rng.choice(best_clean)
         remaining.remove(r19_reserved)
 
-    remaining_idx = [
-        [(team_to_idx[a], team_to_idx[b]) for a, b in m] for m in remaining
-    ]
-
     weight_f = CONSTRUCTION_WEIGHTS["f"]
     weight_g = CONSTRUCTION_WEIGHTS["g"]
 
-    # -- Etapa B: RCL para R3..R17 -----------------------------------------
-    for r in range(3, 18):
-        rem_unk = 19 - r  # rodadas R(r+1)..R19 ainda indefinidas
+    # (f): com G jogos no turno, |casa - fora| <= 1 exige casa em [lo, hi]
+    # (G = 19: 9 ou 10; G par, com BYE: exatamente G/2).
+    games = n - 1
+    home_lo = games // 2
+    home_hi = (games + 1) // 2
 
+    # -- Etapa B: RCL para R3..R(T-2) ---------------------------------------
+    for r in range(3, n_rounds - 1):
         unfeasible_away = [0] * n
         unfeasible_home = [0] * n
+        unfeasible_bye = [0] * n
         f_base = 0
         for t in range(n):
             base = homes[t]
-            ua = 1 if (base > 10 or base + rem_unk < 9) else 0
-            uh = 1 if (base + 1 > 10 or base + 1 + rem_unk < 9) else 0
+            # Jogos de t depois desta rodada (19 - r sem BYE).
+            rem_unk = games - played[t] - 1
+            ua = 1 if (base > home_hi or base + rem_unk < home_lo) else 0
+            uh = 1 if (base + 1 > home_hi or base + 1 + rem_unk < home_lo) else 0
             unfeasible_away[t] = ua
             unfeasible_home[t] = uh
+            unfeasible_bye[t] = (
+                1 if (base > home_hi or base + rem_unk + 1 < home_lo) else 0
+            )
             f_base += ua
 
-        all_candidates: list[tuple[int, int, int, float]] = []
-        any_g_zero = False
-
-        for m_idx, m_pairs in enumerate(remaining_idx):
-            npairs = len(m_pairs)
-            g_a_home = [0] * npairs
-            g_b_home = [0] * npairs
-            df_a_home = [0] * npairs
-            df_b_home = [0] * npairs
-            for k in range(npairs):
-                a, b = m_pairs[k]
-                ga = 0
-                if last_side[a] == 1 and streak[a] + 1 > max_consecutive:
-                    ga += 1
-                if last_side[b] == 2 and streak[b] + 1 > max_consecutive:
-                    ga += 1
-                gb = 0
-                if last_side[b] == 1 and streak[b] + 1 > max_consecutive:
-                    gb += 1
-                if last_side[a] == 2 and streak[a] + 1 > max_consecutive:
-                    gb += 1
-                g_a_home[k] = ga
-                g_b_home[k] = gb
-                df_a_home[k] = unfeasible_home[a] - unfeasible_away[a]
-                df_b_home[k] = unfeasible_home[b] - unfeasible_away[b]
-
-            for mask in range(1 << npairs):
-                g_v = 0
-                f_v = f_base
-                for k in range(npairs):
-                    if (mask >> k) & 1:
-                        g_v += g_a_home[k]
-                        f_v += df_a_home[k]
-                    else:
-                        g_v += g_b_home[k]
-                        f_v += df_b_home[k]
-                cost = weight_f * f_v + weight_g * g_v
-                all_candidates.append((m_idx, mask, g_v, cost))
-                if g_v == 0:
-                    any_g_zero = True
-
-        if any_g_zero:
-            pool = [c for c in all_candidates if c[2] == 0]
-        else:
-            pool = all_candidates
-
-        c_min = min(c[3] for c in pool)
-        c_max = max(c[3] for c in pool)
-        threshold = c_min + alpha * (c_max - c_min)
-        rcl = [c for c in pool if c[3] <= threshold]
-        chosen = rng.choice(rcl)
-        m_idx_chosen, mask_chosen, _, _ = chosen
+        # Quem folga no matching (n ímpar) entra com o status sem jogar.
+        f_bases = [f_base] * len(remaining)
+        if n % 2:
+            for m_idx, m_id in enumerate(remaining):
+                for t in context.byes[m_id]:
+                    f_bases[m_idx] += unfeasible_bye[t] - unfeasible_away[t]
+
+        terms = [
+            _pair_terms(
+                context.matchings_idx[m_id], last_side, streak, max_consecutive,
+                unfeasible_home, unfeasible_away,
+            )
+            for m_id in remaining
+        ]
+        pick = _RCL_PICKERS[backend]
+        m_idx_chosen, mask_chosen = pick(
+            terms, f_bases, alpha, weight_f, weight_g, rng,
+        )
 
-        m_pairs_str = remaining.pop(m_idx_chosen)
-        remaining_idx.pop(m_idx_chosen)
+        m_pairs_str = context.matchings[remaining.pop(m_idx_chosen)]
 
         chosen_oriented_str: list[tuple[str, str]] = []
         for k, (a_str, b_str) in enumerate(m_pairs_str):
@@ -578,14 +999,15 @@ def build_matches_with_homes(
         remaining.append(r19_reserved)
     if len(remaining) != 2:
         raise ConstructionFailedError(
-            f"Esperado 2 matchings após R3..R17; sobrou {len(remaining)}."
+            f"Esperado 2 matchings após R3..R{n_rounds - 2}; "
+            f"sobrou {len(remaining)}."
         )
 
     r18_oriented, r19_oriented = _pick_r18_r19(
+        context,
         remaining,
-        sides_r1,
+        sides_r1_played,
         sides_r2,
-        teams_map,
         last_side,
         streak,
         max_consecutive,
@@ -593,12 +1015,12 @@ def build_matches_with_homes(
     )
     _apply_oriented(r18_oriented)
     _apply_oriented(r19_oriented)
-    matches_by_round[18] = [Match(h, a) for h, a in r18_oriented]
-    matches_by_round[19] = [Match(h, a) for h, a in r19_oriented]
+    matches_by_round[n_rounds - 1] = [Match(h, a) for h, a in r18_oriented]
+    matches_by_round[n_rounds] = [Match(h, a) for h, a in r19_oriented]
 
     # -- Returno: espelho com mando invertido ------------------------------
-    for r in range(1, 20):
-        matches_by_round[r + 19] = [
+    for r in range(1, n_rounds + 1):
+        matches_by_round[r + n_rounds] = [
             Match(m.away, m.home) for m in matches_by_round[r]
         ]
 
@@ -679,12 +1101,15 @@ def _try_flexible_distribution(
 def _round_prv_count(
     atribuicao: list[tuple[Match, date]],
     prev_stadium_dates: dict[str, list[date]],
-    teams_map: TeamMap,
+    stadium_of: dict[str, str],
     prv_days: int,
 ) -> int:
+    """PRV dos estádios da rodada, recontando todo o histórico deles.
+
+    Referência de `_stadium_prv_local`; a otimização usa só o delta."""
     stadium_all_dates: dict[str, list[date]] = {}
     for match, d in atribuicao:
-        stadium = teams_map[match.home].stadium
+        stadium = stadium_of[match.home]
         if stadium not in stadium_all_dates:
             stadium_all_dates[stadium] = list(
                 prev_stadium_dates.get(stadium, [])
@@ -700,44 +1125,298 @@ def _round_prv_count(
     return count
 
 
+def _close_pairs(sorted_dates: list[date], prv_days: int) -> int:
+    return sum(
+        1 for i in range(len(sorted_dates) - 1)
+        if (sorted_dates[i + 1] - sorted_dates[i]).days < prv_days
+    )
+
+
+def _stadium_prv_local(
+    prev_sorted: list[date],
+    current: list[date],
+    prv_days: int,
+) -> int:
+    """Quanto as datas `current` da rodada mudam o PRV de um estádio.
+
+    `prev_sorted` é o histórico do estádio, ordenado. Inserir `current`
+    só mexe nos pares adjacentes ao redor das posições de inserção: basta
+    recontar a fatia do histórico entre os vizinhos (via bisect) de
+    min(current) e max(current). O PRV do estádio com a rodada é
+    `_close_pairs(prev_sorted) + _stadium_prv_local(...)`.
+    """
+    if not current:
+        return 0
+    lo = max(bisect_left(prev_sorted, min(current)) - 1, 0)
+    hi = bisect_right(prev_sorted, max(current)) + 1
+    window = prev_sorted[lo:hi]
+    return _close_pairs(sorted(window + current), prv_days) - _close_pairs(
+        window, prv_days
+    )
+
+
 def _optimize_local_prv(
     atribuicao: list[tuple[Match, date]],
     prev_stadium_dates: dict[str, list[date]],
-    teams_map: TeamMap,
+    stadium_of: dict[str, str],
     prv_days: int,
     last_play: dict[str, date],
     min_rest: int,
 ) -> list[tuple[Match, date]]:
+    """Troca datas entre pares de jogos da rodada enquanto o PRV cai.
+
+    Cada troca (i, j) só muda as datas de dois estádios; o PRV da troca é
+    avaliado como delta de `_stadium_prv_local` desses dois (histórico
+    ordenado em `prev_stadium_dates`). Aceita as mesmas trocas que a
+    recontagem completa (`_round_prv_count`).
+    """
+    stadiums = [stadium_of[match.home] for match, _ in atribuicao]
+    current: dict[str, list[date]] = {}
+    for stadium, (_, d) in zip(stadiums, atribuicao):
+        current.setdefault(stadium, []).append(d)
+    empty: list[date] = []
+    local = {
+        stadium: _stadium_prv_local(
+            prev_stadium_dates.get(stadium, empty), ds, prv_days
+        )
+        for stadium, ds in current.items()
+    }
+
+    def _moved(stadium: str, old: date, new: date) -> list[date]:
+        ds = list(current[stadium])
+        ds[ds.index(old)] = new
+        return ds
+
     improved = True
     while improved:
         improved = False
-        best_prv = _round_prv_count(
-            atribuicao, prev_stadium_dates, teams_map, prv_days
-        )
         for i in range(len(atribuicao)):
             for j in range(i + 1, len(atribuicao)):
                 if atribuicao[i][1] == atribuicao[j][1]:
                     continue
+                si = stadiums[i]
+                sj = stadiums[j]
+                if si == sj:
+                    # Mesmo estádio: o conjunto de datas não muda.
+                    continue
                 mi, di = atribuicao[i]
                 mj, dj = atribuicao[j]
                 if not _check_rest(mi, dj, last_play, min_rest):
                     continue
                 if not _check_rest(mj, di, last_play, min_rest):
                     continue
-                atribuicao[i] = (mi, dj)
-                atribuicao[j] = (mj, di)
-                new_prv = _round_prv_count(
-                    atribuicao, prev_stadium_dates, teams_map, prv_days
+                new_i = _moved(si, di, dj)
+                new_j = _moved(sj, dj, di)
+                local_i = _stadium_prv_local(
+                    prev_stadium_dates.get(si, empty), new_i, prv_days
+                )
+                local_j = _stadium_prv_local(
+                    prev_stadium_dates.get(sj, empty), new_j, prv_days
                 )
-                if new_prv < best_prv:
-                    best_prv = new_prv
+                if local_i + local_j < local[si] + local[sj]:
+                    atribuicao[i] = (mi, dj)
+                    atribuicao[j] = (mj, di)
+                    current[si] = new_i
+                    current[sj] = new_j
+                    local[si] = local_i
+                    local[sj] = local_j
                     improved = True
-                else:
-                    atribuicao[i] = (mi, di)
-                    atribuicao[j] = (mj, dj)
     return atribuicao
 
 
+# Custo de uma data que viola o descanso; maior que qualquer PRV da rodada.
+_FORBIDDEN = 10**6
+
+# Máximo de húngaros por rodada na busca sobre estádios compartilhados.
+# Esgotado, fica a melhor atribuição encontrada, refinada pelas trocas de
+# `_optimize_local_prv`.
+_MAX_JOINT_SOLVES = 64
+
+
+def _assign_round_min_cost(
+    matches: list[Match],
+    window: list[date],
+    prev_stadium_dates: dict[str, list[date]],
+    stadium_of: dict[str, str],
+    prv_days: int,
+    last_play: dict[str, date],
+    min_rest: int,
+) -> list[tuple[Match, date]] | None:
+    """Atribuição da rodada com o menor PRV (contra o histórico), exata.
+
+    Tenta primeiro a capacidade balanceada (`ceil(jogos/datas)` por data,
+    como `_try_balanced_distribution`) e, se não houver atribuição que
+    respeite o descanso, capacidade livre. None se nenhuma servir.
+
+    Se a busca sobre estádios compartilhados esgotar `_MAX_JOINT_SOLVES`,
+    a melhor atribuição achada (ou, sem nenhuma, a distribuição gulosa) é
+    refinada por `_optimize_local_prv` e deixa de ser garantidamente ótima.
+    """
+    n_dates = len(window)
+    if not all(
+        any(_check_rest(m, d, last_play, min_rest) for d in window) for m in matches
+    ):
+        return None
+    for cap in dict.fromkeys((ceil(len(matches) / n_dates), len(matches))):
+        cols, exhausted = _solve_round_assignment(
+            matches, window, prev_stadium_dates, stadium_of, prv_days,
+            last_play, min_rest, cap,
+        )
+        if cols is None and not exhausted:
+            continue
+        if cols is not None:
+            atribuicao = [(m, window[k]) for m, k in zip(matches, cols)]
+        else:
+            atribuicao = _try_balanced_distribution(
+                matches, window, last_play, min_rest
+            ) or _try_flexible_distribution(matches, window, last_play, min_rest)
+            if atribuicao is None:
+                return None
+        if exhausted:
+            atribuicao = _optimize_local_prv(
+                atribuicao, prev_stadium_dates, stadium_of, prv_days,
+                last_play, min_rest,
+            )
+        return atribuicao
+    return None
+
+
+def _solve_round_assignment(
+    matches: list[Match],
+    window: list[date],
+    prev_stadium_dates: dict[str, list[date]],
+    stadium_of: dict[str, str],
+    prv_days: int,
+    last_play: dict[str, date],
+    min_rest: int,
+    cap: int,
+) -> tuple[list[int] | None, bool]:
+    """Índice da data de cada jogo, com até `cap` jogos por data, e se a
+    busca esgotou `_MAX_JOINT_SOLVES` (resultado não garantidamente ótimo).
+
+    Com um jogo por estádio, o PRV é separável: custo do jogo i na data k
+    = `_stadium_prv_local(histórico, [k])`, e o método húngaro com cada
+    data expandida em `cap` colunas resolve a rodada. Dois jogos no mesmo
+    estádio interagem; se a interação é a mesma em todas as combinações
+    viáveis de datas do grupo, ela não muda a escolha e o grupo segue
+    separável. Senão, as combinações do grupo entram numa busca em
+    profundidade (em ordem de custo) e o resto é resolvido pelo húngaro
+    com as capacidades que sobram.
+    """
+    empty: list[date] = []
+    n_dates = len(window)
+    feasible = [
+        [_check_rest(m, d, last_play, min_rest) for d in window] for m in matches
+    ]
+    single = [
+        [
+            _stadium_prv_local(
+                prev_stadium_dates.get(stadium_of[m.home], empty), [d], prv_days
+            )
+            for d in window
+        ]
+        for m in matches
+    ]
+    groups: dict[str, list[int]] = {}
+    for i, m in enumerate(matches):
+        groups.setdefault(stadium_of[m.home], []).append(i)
+
+    # Grupos não separáveis: (membros, [(custo, datas)] em ordem de custo).
+    joint: list[tuple[list[int], list[tuple[int, tuple[int, ...]]]]] = []
+    for stadium, members in groups.items():
+        if len(members) < 2:
+            continue
+        prev = prev_stadium_dates.get(stadium, empty)
+        options: list[tuple[int, tuple[int, ...]]] = []
+        interactions = set()
+        for ks in product(range(n_dates), repeat=len(members)):
+            if not all(feasible[i][k] for i, k in zip(members, ks)):
+                continue
+            if any(ks.count(k) > cap for k in set(ks)):
+                continue
+            group_cost = _stadium_prv_local(prev, [window[k] for k in ks], prv_days)
+            options.append((group_cost, ks))
+            interactions.add(
+                group_cost - sum(single[i][k] for i, k in zip(members, ks))
+            )
+        if not options:
+            return None, False
+        if len(interactions) > 1:
+            options.sort(key=lambda o: o[0])
+            joint.append((members, options))
+
+    fixed = {i for members, _ in joint for i in members}
+    rows = [i for i in range(len(matches)) if i not in fixed]
+
+    def _solve_rows(capacity: list[int]) -> tuple[int, list[int]] | None:
+        columns = [k for k in range(n_dates) for _ in range(capacity[k])]
+        if len(columns) < len(rows):
+            return None
+        cost = [
+            [single[i][k] if feasible[i][k] else _FORBIDDEN for k in columns]
+            for i in rows
+        ]
+        chosen = [columns[c] for c in min_cost_assignment(cost)]
+        if any(not feasible[i][k] for i, k in zip(rows, chosen)):
+            return None
+        return sum(single[i][k] for i, k in zip(rows, chosen)), chosen
+
+    base = _solve_rows([cap] * n_dates)
+    if base is None:
+        return None, False
+    if not joint:
+        result = [0] * len(matches)
+        for i, k in zip(rows, base[1]):
+            result[i] = k
+        return result, False
+
+    # Busca em profundidade nos grupos: limite inferior = custo parcial +
+    # menor custo de cada grupo restante + húngaro sem os grupos (tirar
+    # capacidade só aumenta o custo do resto).
+    min_rest_cost = [0] * (len(joint) + 1)
+    for g in range(len(joint) - 1, -1, -1):
+        min_rest_cost[g] = min_rest_cost[g + 1] + joint[g][1][0][0]
+    best: tuple[int, list[int]] | None = None
+    capacity = [cap] * n_dates
+    chosen_ks: list[tuple[int, ...]] = []
+    budget = [_MAX_JOINT_SOLVES]
+
+    def _search(g: int, partial: int) -> None:
+        nonlocal best
+        if budget[0] <= 0:
+            return
+        if g == len(joint):
+            budget[0] -= 1
+            solved = _solve_rows(capacity)
+            if solved is None:
+                return
+            total = partial + solved[0]
+            if best is None or total < best[0]:
+                result = [0] * len(matches)
+                for (members, _), ks in zip(joint, chosen_ks):
+                    for i, k in zip(members, ks):
+                        result[i] = k
+                for i, k in zip(rows, solved[1]):
+                    result[i] = k
+                best = (total, result)
+            return
+        for group_cost, ks in joint[g][1]:
+            bound = partial + group_cost + min_rest_cost[g + 1] + base[0]
+            if best is not None and bound >= best[0]:
+                break
+            for k in ks:
+                capacity[k] -= 1
+            if min(capacity) >= 0:
+                chosen_ks.append(ks)
+                _search(g + 1, partial + group_cost)
+                chosen_ks.pop()
+            for k in ks:
+                capacity[k] += 1
+
+    _search(0, 0)
+    return (best[1] if best is not None else None), budget[0] <= 0
+
+
 def assign_dates_to_matches(
     matches_by_round: MatchesByRound,
     dates: list[date],
@@ -747,27 +1426,63 @@ def assign_dates_to_matches(
     round_span: int = 3,
     prv_days: int = 5,
     min_team_rest_days: int = 3,
+    context: ConstructionContext | None = None,
+    date_strategy: str = "greedy",
 ) -> Schedule:
     """Atribui uma data a cada jogo de cada rodada, respeitando descanso mínimo
-    de time e minimizando PRVs."""
+    de time e minimizando PRVs.
+
+    `date_strategy` (ver DATE_STRATEGIES): "greedy" distribui de forma
+    balanceada e melhora com trocas de pares; "assignment" resolve cada
+    rodada como atribuição de custo mínimo (PRV mínimo da rodada contra o
+    histórico, exato).
+
+    Com `context` (montado com as mesmas `dates`, `round_gap` e
+    `round_span`), usa as janelas e estádios pré-calculados."""
+    if context is not None:
+        context.check(teams_map, dates, round_gap=round_gap, round_span=round_span)
+        stadium_of = context.stadium_of
+        state_of = context.state_of
+    else:
+        stadium_of = {t: team.stadium for t, team in teams_map.items()}
+        state_of = {t: team.state for t, team in teams_map.items()}
+    if date_strategy not in DATE_STRATEGIES:
+        raise ValueError(
+            f"date_strategy deve ser um de {DATE_STRATEGIES}; recebido {date_strategy!r}"
+        )
+    windows = context.windows if context is not None else None
+
     schedule: Schedule = []
     last_play: dict[str, date] = {}
     prev_stadium_dates: dict[str, list[date]] = {}
 
-    for r in range(1, 39):
-        base_idx = (r - 1) * round_gap
-        window = dates[base_idx : base_idx + round_span]
+    for r in sorted(matches_by_round):
+        if windows is not None and 1 <= r <= len(windows):
+            window = windows[r - 1]
+        else:
+            base_idx = (r - 1) * round_gap
+            window = dates[base_idx : base_idx + round_span]
+        if not window:
+            raise DateAssignmentFailedError(
+                f"Sem datas para a rodada {r}: {len(dates)} datas cobrem "
+                f"{(len(dates) - 1) // round_gap + 1} rodadas com round_gap={round_gap}."
+            )
 
         matches = matches_by_round[r]
 
-        atribuicao = _try_balanced_distribution(
-            matches, window, last_play, min_team_rest_days
-        )
-
-        if atribuicao is None:
-            atribuicao = _try_flexible_distribution(
+        if date_strategy == "assignment":
+            atribuicao = _assign_round_min_cost(
+                matches, window, prev_stadium_dates, stadium_of, prv_days,
+                last_play, min_team_rest_days,
+            )
+        else:
+            atribuicao = _try_balanced_distribution(
                 matches, window, last_play, min_team_rest_days
             )
+            if atribuicao is None:
+                atribuicao = _try_flexible_distribution(
+                    matches, window, last_play, min_team_rest_days
+                )
 
         if atribuicao is None:
             raise DateAssignmentFailedError(
@@ -775,31 +1490,60 @@ def assign_dates_to_matches(
                 "respeitando descanso."
             )
 
-        atribuicao = _optimize_local_prv(
-            atribuicao, prev_stadium_dates, teams_map, prv_days,
-            last_play, min_team_rest_days,
-        )
+        if date_strategy == "greedy":
+            atribuicao = _optimize_local_prv(
+                atribuicao, prev_stadium_dates, stadium_of, prv_days,
+                last_play, min_team_rest_days,
+            )
 
         for match, d in atribuicao:
             sm = ScheduledMatch(
                 round=r,
-                day=d.strftime("%d/%m/%Y"),
+                day=format_day(d.toordinal()),
                 home=match.home,
                 away=match.away,
-                stadium=teams_map[match.home].stadium,
-                home_state=teams_map[match.home].state,
-                away_state=teams_map[match.away].state,
+                stadium=stadium_of[match.home],
+                home_state=state_of[match.home],
+                away_state=state_of[match.away],
             )
             schedule.append(sm)
             last_play[match.home] = d
             last_play[match.away] = d
-            prev_stadium_dates.setdefault(
-                teams_map[match.home].stadium, []
-            ).append(d)
+            insort(prev_stadium_dates.setdefault(sm.stadium, []), d)
 
     return schedule
 
 
+def provisional_schedule(
+    matches_by_round: MatchesByRound,
+    context: ConstructionContext,
+) -> Schedule:
+    """Schedule com cada jogo na primeira data da janela da sua rodada.
+
+    Serve só para as checagens estruturais (a)–(g), que não olham datas:
+    dá a chave (hard, soft) de uma estrutura antes de atribuir datas. O
+    PRV desse schedule não significa nada. `context` precisa ter `dates`.
+    """
+    if context.windows is None:
+        raise ValueError("provisional_schedule exige um ConstructionContext com dates.")
+    schedule: Schedule = []
+    for r in sorted(matches_by_round):
+        day = format_day(context.windows[r - 1][0].toordinal())
+        for match in matches_by_round[r]:
+            schedule.append(
+                ScheduledMatch(
+                    round=r,
+                    day=day,
+                    home=match.home,
+                    away=match.away,
+                    stadium=context.stadium_of[match.home],
+                    home_state=context.state_of[match.home],
+                    away_state=context.state_of[match.away],
+                )
+            )
+    return schedule
+
+
 def construct_schedule(
     teams_map: TeamMap,
     dates: list[date],
@@ -811,10 +1555,17 @@ def construct_schedule(
     prv_days: int = 5,
     min_team_rest_days: int = 3,
     max_consecutive: int = 2,
+    backend: str = "convolution",
+    context: ConstructionContext | None = None,
+    date_strategy: str = "greedy",
 ) -> Schedule:
-    """Pipeline completo: build_matches_with_homes → assign_dates_to_matches."""
+    """Pipeline completo: build_matches_with_homes → assign_dates_to_matches.
+
+    Para várias seeds na mesma instância, monte um `ConstructionContext`
+    com `dates` uma vez e passe-o em `context`."""
     matches_by_round = build_matches_with_homes(
-        teams_map, alpha=alpha, seed=seed, max_consecutive=max_consecutive
+        teams_map, alpha=alpha, seed=seed, max_consecutive=max_consecutive,
+        backend=backend, context=context,
     )
     return assign_dates_to_matches(
         matches_by_round,
@@ -824,4 +1575,6 @@ def construct_schedule(
         round_span=round_span,
         prv_days=prv_days,
         min_team_rest_days=min_team_rest_days,
+        context=context,
+        date_strategy=date_strategy,
     )
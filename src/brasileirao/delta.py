@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Sequence
+
+from .constraints import TURNO_FIRST
+from .domain import ScheduledMatch, ScheduleLike, as_schedule
+from .fingerprint import match_key
+from .objective import DEFAULT_WEIGHTS, HARD_CONSTRAINTS
+from .schedule_index import turno_length
+
+# Um movimento é uma lista de substituições (slot, nova partida), onde slot é
+# a posição da partida no Schedule que semeou o avaliador.
+Move = Sequence[tuple[int, ScheduledMatch]]
+
+CONSTRAINT_IDS: tuple[str, ...] = ("a", "b", "c", "d", "e", "f", "g", "h")
+
+
+class DeltaEvaluator:
+    """Avaliação incremental de (a)–(h) sobre um Schedule mutável.
+
+    Mantém o mesmo resultado de `evaluate()` para o registry padrão, mas
+    aplica/desfaz movimentos em tempo proporcional aos times e estádios
+    tocados:
+
+      - (a) contagem por (rodada, time);
+      - (b) contagem por par e por direção;
+      - (c)/(d) mapas de lado das rodadas R1/R2/R(T-1)/RT (R18/R19);
+      - (e) partidas da última rodada (R38) com mesmo estado;
+      - (f) jogos em casa/fora por time no turno;
+      - (g) sequência ordenada (rodada, lado) por time;
+      - (h) lista ordenada de datas (ordinais) por estádio.
+
+    Mantém também o fingerprint Zobrist do schedule (`fingerprint`),
+    atualizado por XOR a cada partida removida/inserida.
+
+    Restrições extras registradas em CONSTRAINT_CHECKS não são cobertas.
+    `n_teams` tem a mesma semântica de `evaluate`.
+    """
+
+    def __init__(
+        self,
+        schedule: ScheduleLike,
+        weights: dict[str, float] | None = None,
+        prv_days: int = 5,
+        max_consecutive: int = 2,
+        *,
+        n_teams: int | None = None,
+    ) -> None:
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.prv_days = prv_days
+        self.max_consecutive = max_consecutive
+        self.turno_last = turno_length(n_teams)
+        self.returno_last = 2 * self.turno_last
+        self._anchor_rounds = (1, 2, self.turno_last - 1, self.turno_last)
+
+        self._slots: list[ScheduledMatch] = list(as_schedule(schedule))
+        self._counts: dict[str, int] = {cid: 0 for cid in CONSTRAINT_IDS}
+
+        self._round_team: dict[tuple[int, str], int] = defaultdict(int)
+        self._pair_count: dict[frozenset, int] = defaultdict(int)
+        self._direction_count: dict[tuple[str, str], int] = defaultdict(int)
+        self._anchor_sides: dict[tuple[int, str], dict[int, str]] = {}
+        self._turno_home: dict[str, int] = defaultdict(int)
+        self._turno_away: dict[str, int] = defaultdict(int)
+        self._team_entries: dict[str, list[tuple[int, str]]] = defaultdict(list)
+        self._stadium_days: dict[str, list[int]] = defaultdict(list)
+        self._prv_by_stadium: dict[str, int] = defaultdict(int)
+        self._team_contrib: dict[str, tuple[int, int, int, int]] = {}
+        self._fingerprint = 0
+
+        for slot, match in enumerate(self._slots):
+            self._add(slot, match)
+        for team in list(self._team_entries):
+            self._refresh_team(team)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    @property
+    def schedule(self) -> list[ScheduledMatch]:
+        return list(self._slots)
+
+    def match(self, slot: int) -> ScheduledMatch:
+        return self._slots[slot]
+
+    @property
+    def fingerprint(self) -> int:
+        """Igual a `schedule_fingerprint(self.schedule)`."""
+        return self._fingerprint
+
+    @property
+    def violations_by_type(self) -> dict[str, int]:
+        return dict(self._counts)
+
+    @property
+    def total_prv(self) -> int:
+        return self._counts["h"]
+
+    @property
+    def total_cost(self) -> float:
+        w = self.weights
+        return w["prv"] * self._counts["h"] + sum(
+            w.get(cid, 0.0) * count for cid, count in self._counts.items()
+        )
+
+    def lexicographic_key(self) -> tuple[int, int, int]:
+        hard = 0
+        soft = 0
+        for cid, count in self._counts.items():
+            if cid in HARD_CONSTRAINTS:
+                hard += count
+            elif cid != "h":
+                soft += count
+        return (hard, soft, self._counts["h"])
+
+    # ------------------------------------------------------------------
+    # Movimentos
+    # ------------------------------------------------------------------
+
+    def apply(self, move: Move) -> list[tuple[int, ScheduledMatch]]:
+        """Aplica o movimento e retorna o movimento inverso (para `undo`)."""
+        inverse = [(slot, self._slots[slot]) for slot, _ in move]
+        # (c)/(d)/(f)/(g) só mudam se rodada ou mando mudam: trocas de
+        # data puras não recalculam as contribuições por time.
+        touched: set[str] = set()
+        for slot, new in move:
+            old = self._slots[slot]
+            self._remove(slot, old)
+            if (old.round, old.home, old.away) != (new.round, new.home, new.away):
+                touched.update((old.home, old.away, new.home, new.away))
+        for slot, new in move:
+            self._slots[slot] = new
+            self._add(slot, new)
+        for team in touched:
+            self._refresh_team(team)
+        return inverse
+
+    def undo(self, inverse: Sequence[tuple[int, ScheduledMatch]]) -> None:
+        self.apply(inverse)
+
+    def delta(self, move: Move) -> tuple[tuple[int, int, int], float]:
+        """Variação (lex_key, total_cost) do movimento, sem aplicá-lo."""
+        key_before = self.lexicographic_key()
+        cost_before = self.total_cost
+        inverse = self.apply(move)
+        key_after = self.lexicographic_key()
+        cost_after = self.total_cost
+        self.apply(inverse)
+        return (
+            tuple(after - before for after, before in zip(key_after, key_before)),  # type: ignore[return-value]
+            cost_after - cost_before,
+        )
+
+    # ------------------------------------------------------------------
+    # Estruturas por partida: (a), (b), (e), (h) e estado bruto de (c)/(d)/(f)/(g)
+    # ------------------------------------------------------------------
+
+    def _add(self, slot: int, m: ScheduledMatch) -> None:
+        counts = self._counts
+        self._fingerprint ^= match_key(m)
+        for team in (m.home, m.away):
+            key = (m.round, team)
+            if self._round_team[key] >= 1:
+                counts["a"] += 1
+            self._round_team[key] += 1
+
+        pair = frozenset((m.home, m.away))
+        before = self._pair_count[pair]
+        self._pair_count[pair] = before + 1
+        counts["b"] += _pair_violation(before + 1) - _pair_violation(before)
+        direction = (m.home, m.away)
+        self._direction_count[direction] += 1
+        if self._direction_count[direction] == 2:
+            counts["b"] += 1
+
+        if m.round == self.returno_last and m.home_state == m.away_state:
+            counts["e"] += 1
+
+        if m.round in self._anchor_rounds:
+            self._anchor_sides.setdefault((m.round, m.home), {})[slot] = "home"
+            self._anchor_sides.setdefault((m.round, m.away), {})[slot] = "away"
+        if TURNO_FIRST <= m.round <= self.turno_last:
+            self._turno_home[m.home] += 1
+            self._turno_away[m.away] += 1
+        insort(self._team_entries[m.home], (m.round, "home"))
+        insort(self._team_entries[m.away], (m.round, "away"))
+
+        self._insert_day(m.stadium, m.ordinal)
+
+    def _remove(self, slot: int, m: ScheduledMatch) -> None:
+        counts = self._counts
+        self._fingerprint ^= match_key(m)
+        for team in (m.home, m.away):
+            key = (m.round, team)
+            self._round_team[key] -= 1
+            if self._round_team[key] >= 1:
+                counts["a"] -= 1
+
+        pair = frozenset((m.home, m.away))
+        before = self._pair_count[pair]
+        self._pair_count[pair] = before - 1
+        counts["b"] += _pair_violation(before - 1) - _pair_violation(before)
+        direction = (m.home, m.away)
+        if self._direction_count[direction] == 2:
+            counts["b"] -= 1
+        self._direction_count[direction] -= 1
+
+        if m.round == self.returno_last and m.home_state == m.away_state:
+            counts["e"] -= 1
+
+        if m.round in self._anchor_rounds:
+            for team in (m.home, m.away):
+                sides = self._anchor_sides.get((m.round, team))
+                if sides is not None:
+                    sides.pop(slot, None)
+                    if not sides:
+                        del self._anchor_sides[(m.round, team)]
+        if TURNO_FIRST <= m.round <= self.turno_last:
+            self._turno_home[m.home] -= 1
+            self._turno_away[m.away] -= 1
+        _remove_sorted(self._team_entries[m.home], (m.round, "home"))
+        _remove_sorted(self._team_entries[m.away], (m.round, "away"))
+
+        self._delete_day(m.stadium, m.ordinal)
+
+    def _insert_day(self, stadium: str, day: int) -> None:
+        days = self._stadium_days[stadium]
+        i = bisect_left(days, day)
+        change = 0
+        prev_day = days[i - 1] if i > 0 else None
+        next_day = days[i] if i < len(days) else None
+        if prev_day is not None and next_day is not None:
+            change -= self._is_prv(prev_day, next_day)
+        if prev_day is not None:
+            change += self._is_prv(prev_day, day)
+        if next_day is not None:
+            change += self._is_prv(day, next_day)
+        days.insert(i, day)
+        self._bump_prv(stadium, change)
+
+    def _delete_day(self, stadium: str, day: int) -> None:
+        days = self._stadium_days[stadium]
+        i = bisect_left(days, day)
+        change = 0
+        prev_day = days[i - 1] if i > 0 else None
+        next_day = days[i + 1] if i + 1 < len(days) else None
+        if prev_day is not None:
+            change -= self._is_prv(prev_day, day)
+        if next_day is not None:
+            change -= self._is_prv(day, next_day)
+        if prev_day is not None and next_day is not None:
+            change += self._is_prv(prev_day, next_day)
+        del days[i]
+        self._bump_prv(stadium, change)
+
+    def _is_prv(self, earlier: int, later: int) -> int:
+        return 1 if later - earlier < self.prv_days else 0
+
+    def _bump_prv(self, stadium: str, change: int) -> None:
+        if change:
+            self._prv_by_stadium[stadium] += change
+            self._counts["h"] += change
+
+    # ------------------------------------------------------------------
+    # Contribuições por time: (c), (d), (f), (g)
+    # ------------------------------------------------------------------
+
+    def _side(self, round_: int, team: str) -> str | None:
+        sides = self._anchor_sides.get((round_, team))
+        if not sides:
+            return None
+        # Mesma semântica de _sides_in_round: a última partida da lista vence.
+        return sides[max(sides)]
+
+    def _refresh_team(self, team: str) -> None:
+        s1 = self._side(1, team)
+        s2 = self._side(2, team)
+        c = 0
+        d = 0
+        if s1 is not None:
+            if s2 == s1:
+                c = 1
+            if self._side(self.turno_last - 1, team) == s1:
+                d += 1
+        if s2 is not None and self._side(self.turno_last, team) == s2:
+            d += 1
+
+        f = 1 if abs(self._turno_home[team] - self._turno_away[team]) > 1 else 0
+
+        g = 0
+        run_side: str | None = None
+        run_len = 0
+        for _, side in self._team_entries[team]:
+            if side == run_side:
+                run_len += 1
+            else:
+                if run_len > self.max_consecutive:
+                    g += 1
+                run_side = side
+                run_len = 1
+        if run_len > self.max_consecutive:
+            g += 1
+
+        new = (c, d, f, g)
+        old = self._team_contrib.get(team, (0, 0, 0, 0))
+        if new != old:
+            for cid, o, n in zip("cdfg", old, new):
+                self._counts[cid] += n - o
+            self._team_contrib[team] = new
+
+
+def _pair_violation(count: int) -> int:
+    return 1 if count not in (0, 2) else 0
+
+
+def _remove_sorted(items: list, value: object) -> None:
+    del items[bisect_left(items, value)]
@@ -1,6 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict, Optional, Tuple
+from datetime import date, datetime
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 @dataclass(frozen=True)
 class Team:
@@ -16,16 +19,200 @@ class Match:
 @dataclass(frozen=True)
 class ScheduledMatch:
     round: int
-    day: str          # data como string (ex: "2023-08-20") ou o formato que vier do CSV
+    day: str          # data como string dd/mm/aaaa (formato do CSV)
     home: str
     away: str
     stadium: str
     home_state: str
     away_state: str
 
+    @property
+    def ordinal(self) -> int:
+        """`day` como `date.toordinal()`, via interning (ver `day_ordinal`)."""
+        return day_ordinal(self.day)
+
 Schedule = List[ScheduledMatch]
 TeamMap = Dict[str, Team]
 
+_DAY_FMT = "%d/%m/%Y"
+
+# Interning de datas: cada string dd/mm/aaaa e cada ordinal são convertidos
+# uma única vez por processo. Um campeonato tem poucas centenas de datas
+# distintas, então as tabelas não precisam de limite.
+_DAY_ORDINALS: Dict[str, int] = {}
+_ORDINAL_DAYS: Dict[int, str] = {}
+
+
+def day_ordinal(day: str) -> int:
+    """Ordinal (`date.toordinal()`) de uma data dd/mm/aaaa."""
+    ordinal = _DAY_ORDINALS.get(day)
+    if ordinal is None:
+        ordinal = datetime.strptime(day, _DAY_FMT).toordinal()
+        _DAY_ORDINALS[day] = ordinal
+    return ordinal
+
+
+def format_day(ordinal: int) -> str:
+    """Inverso de `day_ordinal`: string dd/mm/aaaa canônica do ordinal."""
+    day = _ORDINAL_DAYS.get(ordinal)
+    if day is None:
+        day = date.fromordinal(ordinal).strftime(_DAY_FMT)
+        _ORDINAL_DAYS[ordinal] = day
+        _DAY_ORDINALS[day] = ordinal
+    return day
+
+
+@dataclass(frozen=True, eq=False)
+class ScheduleMatrix:
+    """Representação compacta de um Schedule em arrays NumPy.
+
+    Linhas são times (ids inteiros, na ordem de `teams`) e colunas são
+    rodadas (coluna r-1 = rodada r). Células sem jogo (BYE) têm
+    opponent=-1, home=0, day=0 e order=-1.
+
+      - opponent: id do adversário (int16)
+      - home:     +1 mandante, -1 visitante (int8)
+      - day:      data como ordinal de `date.toordinal()` (int32)
+      - order:    posição da partida no Schedule de origem, preenchida nas
+                  duas células do jogo (int32); garante round-trip exato
+    """
+
+    teams: Tuple[str, ...]
+    stadiums: Tuple[str, ...]
+    states: Tuple[str, ...]
+    opponent: np.ndarray
+    home: np.ndarray
+    day: np.ndarray
+    order: np.ndarray
+
+    @property
+    def n_teams(self) -> int:
+        return len(self.teams)
+
+    @property
+    def n_rounds(self) -> int:
+        return int(self.opponent.shape[1])
+
+    @classmethod
+    def from_schedule(
+        cls,
+        schedule: Schedule,
+        teams: Optional[Sequence[str]] = None,
+    ) -> "ScheduleMatrix":
+        """Converte um Schedule. Levanta ValueError se ele não couber na
+        matriz: time jogando 2x na mesma rodada, estádio/estado de um time
+        inconsistente entre partidas, rodada < 1 ou data fora de dd/mm/aaaa."""
+        names: List[str] = list(teams) if teams is not None else []
+        team_id = {t: i for i, t in enumerate(names)}
+        if teams is None:
+            for m in schedule:
+                for t in (m.home, m.away):
+                    if t not in team_id:
+                        team_id[t] = len(names)
+                        names.append(t)
+
+        n = len(names)
+        n_rounds = max((m.round for m in schedule), default=0)
+        stadiums: List[Optional[str]] = [None] * n
+        states: List[Optional[str]] = [None] * n
+
+        def _fix(values: List[Optional[str]], i: int, value: str, what: str) -> None:
+            if values[i] is None:
+                values[i] = value
+            elif values[i] != value:
+                raise ValueError(
+                    f"Time {names[i]} com {what} inconsistente: "
+                    f"'{values[i]}' e '{value}'"
+                )
+
+        # Validação em Python; as células são escritas de uma vez no fim.
+        hs: List[int] = []
+        aws: List[int] = []
+        cs: List[int] = []
+        ordinals: List[int] = []
+        occupied: set[Tuple[int, int]] = set()
+        for m in schedule:
+            if m.round < 1:
+                raise ValueError(f"Rodada invalida: {m.round}")
+            try:
+                h = team_id[m.home]
+                a = team_id[m.away]
+            except KeyError as exc:
+                raise ValueError(f"Time {exc.args[0]} fora de `teams`") from None
+            c = m.round - 1
+            if h == a or (h, c) in occupied or (a, c) in occupied:
+                raise ValueError(
+                    f"Rodada {m.round}: {m.home} ou {m.away} joga mais de uma vez"
+                )
+            occupied.add((h, c))
+            occupied.add((a, c))
+            ordinal = day_ordinal(m.day)
+            if format_day(ordinal) != m.day:
+                raise ValueError(f"Data fora do formato dd/mm/aaaa: {m.day}")
+            _fix(stadiums, h, m.stadium, "estadio")
+            _fix(states, h, m.home_state, "estado")
+            _fix(states, a, m.away_state, "estado")
+            hs.append(h)
+            aws.append(a)
+            cs.append(c)
+            ordinals.append(ordinal)
+
+        opponent = np.full((n, n_rounds), -1, dtype=np.int16)
+        home = np.zeros((n, n_rounds), dtype=np.int8)
+        day = np.zeros((n, n_rounds), dtype=np.int32)
+        order = np.full((n, n_rounds), -1, dtype=np.int32)
+        h_idx = np.asarray(hs, dtype=np.intp)
+        a_idx = np.asarray(aws, dtype=np.intp)
+        c_idx = np.asarray(cs, dtype=np.intp)
+        opponent[h_idx, c_idx] = a_idx
+        opponent[a_idx, c_idx] = h_idx
+        home[h_idx, c_idx] = 1
+        home[a_idx, c_idx] = -1
+        day[h_idx, c_idx] = day[a_idx, c_idx] = ordinals
+        order[h_idx, c_idx] = order[a_idx, c_idx] = np.arange(len(hs))
+
+        return cls(
+            teams=tuple(names),
+            stadiums=tuple(s or "" for s in stadiums),
+            states=tuple(s or "" for s in states),
+            opponent=opponent,
+            home=home,
+            day=day,
+            order=order,
+        )
+
+    def to_schedule(self) -> Schedule:
+        """Reconstrói o Schedule na ordem original das partidas."""
+        hs, cs = np.nonzero(self.home == 1)
+        positions = self.order[hs, cs]
+        schedule: Schedule = []
+        for k in np.argsort(positions, kind="stable"):
+            h = int(hs[k])
+            c = int(cs[k])
+            a = int(self.opponent[h, c])
+            schedule.append(
+                ScheduledMatch(
+                    round=c + 1,
+                    day=format_day(int(self.day[h, c])),
+                    home=self.teams[h],
+                    away=self.teams[a],
+                    stadium=self.stadiums[h],
+                    home_state=self.states[h],
+                    away_state=self.states[a],
+                )
+            )
+        return schedule
+
+
+ScheduleLike = Union[Schedule, ScheduleMatrix]
+
+
+def as_schedule(schedule: ScheduleLike) -> Schedule:
+    """Normaliza as duas representações aceitas para List[ScheduledMatch]."""
+    if isinstance(schedule, ScheduleMatrix):
+        return schedule.to_schedule()
+    return schedule
+
 
 @dataclass(frozen=True)
 class PRVOccurrence:
@@ -59,6 +246,9 @@ class EvaluationResult:
     hard_constraint_violations: List[ConstraintViolation]
     soft_constraint_violations: List[ConstraintViolation]
     violations_by_type: Dict[str, int]
+    # True quando evaluate(..., cutoff=...) parou antes de calcular tudo:
+    # contagens parciais e chave/custo são limites inferiores.
+    pruned: bool = False
 
     @property
     def is_feasible(self) -> bool:
@@ -75,7 +265,7 @@ class EvaluationResult:
         )
         return (hard_count, soft_estruturais, self.total_prv)
 
-    def is_better_than(self, other: "EvaluationResult") -> bool:
+    def is_better_than(self, other: "Evaluation") -> bool:
         """True sse self eh estritamente melhor que other lexicograficamente."""
         return self.lexicographic_key() < other.lexicographic_key()
 
@@ -90,6 +280,44 @@ class EvaluationResult:
             f"  soft:        {len(self.soft_constraint_violations)}",
             "  violations_by_type:",
         ]
+        if self.pruned:
+            lines.insert(1, "  pruned:      True (contagens parciais)")
         for cid, count in self.violations_by_type.items():
             lines.append(f"    {cid}: {count}")
         return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class EvaluationCounts:
+    """Avaliação resumida: só as contagens, sem violações nem ocorrências.
+
+    Produzida por `evaluate_counts()`; tem a mesma chave lexicografica,
+    custo e factibilidade que o EvaluationResult do mesmo schedule."""
+
+    total_cost: float
+    total_prv: int
+    violations_by_type: Dict[str, int]
+    hard_constraints: Tuple[str, ...] = ("a", "b")
+    pruned: bool = False  # mesma semântica de EvaluationResult.pruned
+
+    @property
+    def is_feasible(self) -> bool:
+        return not any(self.violations_by_type.get(c, 0) for c in self.hard_constraints)
+
+    def lexicographic_key(self) -> Tuple[int, int, int]:
+        """Mesma chave de EvaluationResult.lexicographic_key()."""
+        hard_count = 0
+        soft_estruturais = 0
+        for cid, count in self.violations_by_type.items():
+            if cid in self.hard_constraints:
+                hard_count += count
+            elif cid != "h":
+                soft_estruturais += count
+        return (hard_count, soft_estruturais, self.total_prv)
+
+    def is_better_than(self, other: "Evaluation") -> bool:
+        """True sse self é estritamente melhor que other lexicograficamente."""
+        return self.lexicographic_key() < other.lexicographic_key()
+
+
+Evaluation = Union[EvaluationResult, EvaluationCounts]
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Generic, Iterable, Optional, Tuple, TypeVar
+
+from .domain import ScheduledMatch
+
+_ZOBRIST: dict[Tuple[int, str, str, str], int] = {}
+
+
+def match_key(match: ScheduledMatch) -> int:
+    """Chave Zobrist de 64 bits da partida (rodada, mandante, visitante, data).
+
+    Derivada de blake2b e não de um RNG: é a mesma em qualquer processo ou
+    execução, então fingerprints podem ser comparados entre workers e
+    checkpoints. Memorizada por processo.
+    """
+    key = (match.round, match.home, match.away, match.day)
+    z = _ZOBRIST.get(key)
+    if z is None:
+        digest = blake2b(repr(key).encode(), digest_size=8).digest()
+        z = int.from_bytes(digest, "little")
+        _ZOBRIST[key] = z
+    return z
+
+
+def schedule_fingerprint(schedule: Iterable[ScheduledMatch]) -> int:
+    """XOR das chaves de todas as partidas; independe da ordem da lista.
+
+    Atualização incremental: `fp ^ match_key(antiga) ^ match_key(nova)`
+    (ver `update_fingerprint`). Duas cópias idênticas da mesma partida se
+    cancelam — só acontece em schedules que já violam (a)/(b).
+    """
+    fp = 0
+    for m in schedule:
+        fp ^= match_key(m)
+    return fp
+
+
+def update_fingerprint(
+    fingerprint: int,
+    removed: Iterable[ScheduledMatch],
+    added: Iterable[ScheduledMatch],
+) -> int:
+    """Fingerprint após trocar as partidas `removed` pelas `added`."""
+    for m in removed:
+        fingerprint ^= match_key(m)
+    for m in added:
+        fingerprint ^= match_key(m)
+    return fingerprint
+
+
+_V = TypeVar("_V")
+
+
+class EvaluationCache(Generic[_V]):
+    """Cache LRU limitado de avaliações, indexado pelo fingerprint.
+
+    Os parâmetros da avaliação (pesos, prv_days, times) não fazem parte da
+    chave: use um cache por configuração (ex.: um por execução do GRASP).
+    `maxsize=0` desliga o cache (toda consulta é miss).
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        if maxsize < 0:
+            raise ValueError(f"maxsize deve ser >= 0; recebido {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[int, _V] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return fingerprint in self._data
+
+    def get(self, fingerprint: int) -> Optional[_V]:
+        value = self._data.get(fingerprint)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(fingerprint)
+        self.hits += 1
+        return value
+
+    def put(self, fingerprint: int, value: _V) -> None:
+        if self.maxsize == 0:
+            return
+        self._data[fingerprint] = value
+        self._data.move_to_end(fingerprint)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
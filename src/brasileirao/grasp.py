@@ -1,18 +1,48 @@
 from __future__ import annotations
 
+import csv
+import json
 import logging
+import os
+import pickle
 import random
-from dataclasses import dataclass, field
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
 from datetime import date
+from typing import Any, Callable, Generator, Iterator, Optional, TextIO
 
-from .construction import construct_schedule
-from .domain import EvaluationResult, Schedule, TeamMap
-from .objective import evaluate
+from .construction import (
+    ConstructionContext,
+    MatchesByRound,
+    assign_dates_to_matches,
+    build_matches_with_homes,
+    provisional_schedule,
+)
+from .domain import EvaluationCounts, EvaluationResult, Schedule, ScheduleMatrix, TeamMap
+from .fingerprint import EvaluationCache, schedule_fingerprint
+from .local_search import (
+    DEFAULT_NEIGHBORHOODS,
+    SEARCH_MODES,
+    LocalSearch,
+    LocalSearchStats,
+    check_neighborhoods,
+)
+from .objective import LexKey, evaluate, evaluate_counts, truncate_counts
+from .round_robin import FACTORIZATIONS
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_ALPHA_POOL: list[float] = [0.1, 0.2, 0.3, 0.4]
 
+# O que fica em GRASPResult.history: nada, só os novos melhores ou tudo.
+HISTORY_MODES = ("none", "improvements", "full")
+
+# Busca local aplicada a cada schedule construído.
+LOCAL_SEARCHES = ("none", "vnd")
+
 
 @dataclass(frozen=True)
 class GRASPIteration:
@@ -26,6 +56,10 @@ class GRASPIteration:
     is_feasible: bool
     is_new_best: bool
     lex_key: tuple[int, int, int]
+    pruned: bool = False  # avaliacao cortada pelo incumbente (prune=True)
+    fingerprint: int = 0  # Zobrist do schedule construido
+    is_duplicate: bool = False  # schedule identico a uma iteracao anterior
+    date_iter: int = 0  # atribuicao de datas dentro da estrutura (0 = padrao)
 
 
 @dataclass
@@ -37,12 +71,621 @@ class GRASPResult:
     best_iter: int
     best_seed: int
     best_alpha: float
-    total_iterations: int
-    stopped_by: str  # "max_iter" | "max_iter_no_improve"
+    total_iterations: int  # estruturas construidas (iteracoes externas)
+    stopped_by: str  # "max_iter" | "max_iter_no_improve" | "time_limit" | "target_reached"
     history: list[GRASPIteration] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    best_date_iter: int = 0
+    # Segundos desde o inicio ate cada novo melhor: (iter_number, date_iter,
+    # elapsed_s). Tempo de relogio: fica fora da comparacao de igualdade.
+    improvement_times: list[tuple[int, int, float]] = field(
+        default_factory=list, compare=False
+    )
+    elapsed_s: float = field(default=0.0, compare=False)
+    # Iteracoes que reconstruiram um schedule ja visto nesta execucao
+    # (contado mesmo quando o historico nao e guardado).
+    duplicate_iterations: int = 0
+    # Movimentos tentados/melhoras por vizinhanca (local_search="vnd").
+    local_search_stats: LocalSearchStats = field(default_factory=LocalSearchStats)
 
 
-def grasp(
+@dataclass(frozen=True)
+class GRASPProgress:
+    """O que `grasp_iter` produz a cada schedule avaliado: o registro da
+    iteracao e o incumbente logo depois dela."""
+
+    iteration: GRASPIteration
+    best_schedule: Schedule
+    best_lex_key: LexKey
+    best_iter: int
+    best_date_iter: int
+    structures: int  # estruturas processadas ate aqui
+    elapsed_s: float = field(compare=False)
+
+
+class HistorySink:
+    """Grava registros de iteracao em disco conforme chegam.
+
+    Formato por `fmt` ("csv" ou "jsonl") ou pela extensao do arquivo. O
+    arquivo e aberto em modo append (o cabecalho CSV so e escrito em
+    arquivo vazio) e cada linha e descarregada ao ser escrita. `rows`
+    conta os registros do arquivo, inclusive os que ja estavam nele. No
+    CSV, `lex_key` vira tres colunas (`hard`, `soft`, `prv`).
+    """
+
+    FORMATS = ("csv", "jsonl")
+
+    def __init__(self, path: str, fmt: str | None = None) -> None:
+        if fmt is None:
+            fmt = "jsonl" if path.endswith(".jsonl") else "csv"
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Formato desconhecido: {fmt!r}; use um de {self.FORMATS}")
+        self.path = path
+        self.fmt = fmt
+        self._header = 1 if fmt == "csv" else 0
+        self.rows = max(len(self._line_ends()) - self._header, 0)
+        self._fh: TextIO = open(path, "a", newline="", encoding="utf-8")
+        self._csv = None
+        if fmt == "csv":
+            self._csv = csv.writer(self._fh)
+            if self._fh.tell() == 0:
+                self._csv.writerow(_csv_header())
+
+    def _line_ends(self) -> list[int]:
+        """Posicao (em bytes) do fim de cada linha completa do arquivo."""
+        if not os.path.exists(self.path):
+            return []
+        ends: list[int] = []
+        offset = 0
+        with open(self.path, "rb") as fh:
+            for line in fh:
+                offset += len(line)
+                if line.endswith(b"\n"):
+                    ends.append(offset)
+        return ends
+
+    def truncate(self, rows: int) -> None:
+        """Mantem so os `rows` primeiros registros do arquivo (e o
+        cabecalho). Usado no resume para descartar o que foi gravado
+        depois do checkpoint."""
+        if rows > self.rows:
+            raise ValueError(
+                f"{self.path} tem {self.rows} registros; o checkpoint espera {rows}."
+            )
+        keep = rows + self._header
+        self._fh.flush()
+        self._fh.truncate(self._line_ends()[keep - 1] if keep else 0)
+        self.rows = rows
+
+    def write(self, record: GRASPIteration) -> None:
+        if self._csv is not None:
+            self._csv.writerow(_csv_row(record))
+        else:
+            self._fh.write(json.dumps(asdict(record)) + "\n")
+        self._fh.flush()
+        self.rows += 1
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def __enter__(self) -> "HistorySink":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _csv_header() -> list[str]:
+    header: list[str] = []
+    for f in fields(GRASPIteration):
+        header += ["hard", "soft", "prv"] if f.name == "lex_key" else [f.name]
+    return header
+
+
+def _csv_row(record: GRASPIteration) -> list[object]:
+    row: list[object] = []
+    for f in fields(GRASPIteration):
+        value = getattr(record, f.name)
+        row += list(value) if f.name == "lex_key" else [value]
+    return row
+
+
+# ---------------------------------------------------------------------------
+# Construção de uma estrutura (no processo pai ou num worker)
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class _RunParams:
+    """Parâmetros da construção/avaliação; vão para os workers."""
+
+    teams_map: TeamMap
+    dates: list[date]
+    round_gap: int
+    round_span: int
+    prv_days: int
+    min_team_rest_days: int
+    max_consecutive: int
+    weights: dict[str, float] | None
+    prune: bool
+    date_strategy: str
+    date_iters_per_structure: int
+    local_search: str = "none"
+    local_search_mode: str = "first"
+    local_search_neighborhoods: tuple[str, ...] = DEFAULT_NEIGHBORHOODS
+    factorization: str = "circle"
+    factorization_seed: int = 0
+
+
+class _Builder:
+    """Constrói estruturas e atribuições de datas de uma execução."""
+
+    def __init__(self, params: _RunParams) -> None:
+        self.params = params
+        self.n_teams = len(params.teams_map)
+        self.context = ConstructionContext(
+            params.teams_map, params.dates,
+            round_gap=params.round_gap, round_span=params.round_span,
+            factorization=params.factorization,
+            factorization_seed=params.factorization_seed,
+        )
+
+    def structure(self, seed_iter: int, alpha: float) -> MatchesByRound:
+        return build_matches_with_homes(
+            self.params.teams_map,
+            alpha=alpha,
+            seed=seed_iter,
+            max_consecutive=self.params.max_consecutive,
+            context=self.context,
+        )
+
+    def dated(
+        self, matches_by_round: MatchesByRound, j: int, rng_dates: random.Random
+    ) -> Schedule:
+        """Atribuição `j` da estrutura; j >= 1 embaralha os jogos de cada
+        rodada com `rng_dates` (chamadas em ordem de j)."""
+        ordem: MatchesByRound = matches_by_round
+        if j > 0:
+            ordem = {}
+            for r, matches in matches_by_round.items():
+                shuffled = list(matches)
+                rng_dates.shuffle(shuffled)
+                ordem[r] = shuffled
+        p = self.params
+        return assign_dates_to_matches(
+            ordem,
+            p.dates,
+            p.teams_map,
+            round_gap=p.round_gap,
+            round_span=p.round_span,
+            prv_days=p.prv_days,
+            min_team_rest_days=p.min_team_rest_days,
+            context=self.context,
+            date_strategy=p.date_strategy,
+        )
+
+    def improve(self, schedule: Schedule) -> tuple[Schedule, LocalSearchStats | None]:
+        """Aplica a busca local configurada (identidade com "none")."""
+        p = self.params
+        if p.local_search == "none":
+            return schedule, None
+        search = LocalSearch(
+            schedule,
+            weights=p.weights,
+            prv_days=p.prv_days,
+            min_team_rest_days=p.min_team_rest_days,
+            n_teams=self.n_teams,
+        )
+        search.vnd(p.local_search_neighborhoods, p.local_search_mode)
+        return search.schedule, search.stats
+
+    def counts(self, schedule: Schedule, cutoff: LexKey | None = None) -> EvaluationCounts:
+        return evaluate_counts(
+            schedule, weights=self.params.weights, prv_days=self.params.prv_days,
+            cutoff=cutoff, n_teams=self.n_teams,
+        )
+
+
+def _dates_rng(seed_iter: int) -> random.Random:
+    # Stream proprio das datas: nao mexe no RNG de alpha nem no da
+    # construcao, e cada estrutura tem o seu (independe da ordem).
+    return random.Random(f"datas/{seed_iter}")
+
+
+# Uma atribuição de datas vista pelo loop: fingerprint, avaliação sob um
+# cutoff e o schedule (materializado só se virar incumbente). Com busca
+# local, o fingerprint é o do schedule construído e a avaliação e o
+# schedule são os do resultado da busca.
+_Dated = tuple[int, Callable[[Optional[LexKey]], EvaluationCounts], Callable[[], Schedule]]
+
+
+class _LocalStructure:
+    """Estrutura construída sob demanda no próprio processo (workers=1):
+    só faz o trabalho que o loop pede (poda e laço interno economizam)."""
+
+    def __init__(self, builder: _Builder, seed_iter: int, alpha: float) -> None:
+        self.builder = builder
+        self.matches = builder.structure(seed_iter, alpha)
+        self.rng_dates = _dates_rng(seed_iter)
+        self.search_stats: dict[int, LocalSearchStats] = {}
+
+    def provisional(self, cutoff: LexKey | None) -> EvaluationCounts:
+        return self.builder.counts(
+            provisional_schedule(self.matches, self.builder.context), cutoff
+        )
+
+    def dated(self, j: int) -> _Dated:
+        schedule = self.builder.dated(self.matches, j, self.rng_dates)
+        improved: list[Schedule] = []
+
+        def result() -> Schedule:
+            # A busca local só roda se o loop pedir a avaliação (não roda
+            # em acerto de cache).
+            if not improved:
+                best, stats = self.builder.improve(schedule)
+                improved.append(best)
+                if stats is not None:
+                    self.search_stats[j] = stats
+            return improved[0]
+
+        return (
+            schedule_fingerprint(schedule),
+            lambda cutoff: self.builder.counts(result(), cutoff),
+            result,
+        )
+
+    def search_stats_of(self, j: int) -> LocalSearchStats | None:
+        return self.search_stats.get(j)
+
+
+@dataclass
+class _StructureOutcome:
+    """Trabalho de uma estrutura feito num worker, sem conhecer o
+    incumbente: avaliações completas e schedules compactos."""
+
+    provisional: EvaluationCounts | None
+    dated: list[tuple[int, EvaluationCounts, ScheduleMatrix]]
+    search_stats: list[LocalSearchStats | None] = field(default_factory=list)
+
+
+class _RemoteStructure:
+    """Resultado de um worker visto pelo loop; a poda pelo incumbente é
+    refeita a partir das contagens completas (`truncate_counts`)."""
+
+    def __init__(self, outcome: _StructureOutcome, weights: dict[str, float] | None) -> None:
+        self.outcome = outcome
+        self.weights = weights
+
+    def provisional(self, cutoff: LexKey | None) -> EvaluationCounts:
+        assert self.outcome.provisional is not None
+        return truncate_counts(self.outcome.provisional, cutoff, self.weights)
+
+    def dated(self, j: int) -> _Dated:
+        fingerprint, counts, matrix = self.outcome.dated[j]
+        return (
+            fingerprint,
+            lambda cutoff: truncate_counts(counts, cutoff, self.weights),
+            matrix.to_schedule,
+        )
+
+    def search_stats_of(self, j: int) -> LocalSearchStats | None:
+        stats = self.outcome.search_stats
+        return stats[j] if j < len(stats) else None
+
+
+_WORKER_BUILDER: _Builder | None = None
+
+
+def _worker_init(params: _RunParams) -> None:
+    global _WORKER_BUILDER
+    _WORKER_BUILDER = _Builder(params)
+
+
+def _worker_structure(task: tuple[int, float]) -> _StructureOutcome:
+    """Constrói e avalia uma estrutura inteira num worker (todas as
+    `date_iters_per_structure` datas; o pai descarta as que o laço
+    interno não teria feito)."""
+    builder = _WORKER_BUILDER
+    assert builder is not None
+    seed_iter, alpha = task
+    matches = builder.structure(seed_iter, alpha)
+    provisional = None
+    if builder.params.prune:
+        provisional = builder.counts(provisional_schedule(matches, builder.context))
+    rng_dates = _dates_rng(seed_iter)
+    dated = []
+    search_stats = []
+    for j in range(builder.params.date_iters_per_structure):
+        schedule = builder.dated(matches, j, rng_dates)
+        fingerprint = schedule_fingerprint(schedule)
+        schedule, stats = builder.improve(schedule)
+        dated.append((
+            fingerprint,
+            builder.counts(schedule),
+            ScheduleMatrix.from_schedule(schedule, teams=builder.context.teams),
+        ))
+        search_stats.append(stats)
+    return _StructureOutcome(provisional=provisional, dated=dated, search_stats=search_stats)
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint
+# ---------------------------------------------------------------------------
+
+_CHECKPOINT_VERSION = 4
+
+
+def _write_checkpoint(path: str, payload: dict[str, Any]) -> None:
+    """Grava `payload` de forma atômica: arquivo temporário no mesmo
+    diretório, fsync e `os.replace` (um checkpoint antigo só some quando
+    o novo está completo)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _read_checkpoint(path: str, config: dict[str, Any]) -> dict[str, Any]:
+    with open(path, "rb") as fh:
+        payload = pickle.load(fh)
+    if payload.get("version") != _CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint {path} de versão desconhecida.")
+    if payload["config"] != config:
+        changed = sorted(
+            k for k in config if payload["config"].get(k) != config[k]
+        )
+        raise ValueError(
+            f"Checkpoint {path} é de outra configuração (difere em {changed})."
+        )
+    return payload
+
+
+class _Checkpointer:
+    """Salva o estado do loop a cada `every` estruturas e no fim.
+
+    Só é chamado depois que os registros da estrutura foram entregues (e
+    gravados no sink): o checkpoint guarda quantas linhas o sink tinha,
+    e um resume descarta as que vieram depois."""
+
+    def __init__(
+        self, path: str, every: int, config: dict[str, Any], rng_alpha_state: object,
+        sink: HistorySink | None = None,
+    ) -> None:
+        self.path = path
+        self.every = every
+        self.config = config
+        self.rng_alpha_state = rng_alpha_state
+        self.sink = sink
+
+    def save(self, run: "_GRASPRun") -> None:
+        _write_checkpoint(self.path, {
+            "version": _CHECKPOINT_VERSION,
+            "config": self.config,
+            "rng_alpha_state": self.rng_alpha_state,
+            "run": run.state(),
+            "sink_rows": self.sink.rows if self.sink is not None else None,
+        })
+
+    def after_step(self, run: "_GRASPRun") -> None:
+        if run.next_iter % self.every == 0:
+            self.save(run)
+
+
+# ---------------------------------------------------------------------------
+# Estado do loop (incumbente, histórico, cache, parada)
+# ---------------------------------------------------------------------------
+
+class _GRASPRun:
+    """Estado do loop multi-start, atualizado estrutura a estrutura em
+    ordem de iteração. É o mesmo para workers=1 e workers>1: só muda de
+    onde vêm as estruturas (`_LocalStructure` ou `_RemoteStructure`)."""
+
+    def __init__(
+        self, *, seed: int, max_iter: int, max_iter_no_improve: int,
+        date_iters_per_structure: int, prune: bool, cache_size: int,
+        time_limit_s: float | None = None, target_lex_key: LexKey | None = None,
+        history: str = "full", local_search: str = "none",
+    ) -> None:
+        self.seed = seed
+        self.max_iter = max_iter
+        self.max_iter_no_improve = max_iter_no_improve
+        self.date_iters_per_structure = date_iters_per_structure
+        self.prune = prune
+        self.best_schedule: Schedule | None = None
+        self.best_eval: EvaluationCounts | None = None
+        self.best_iter = -1
+        self.best_seed = -1
+        self.best_alpha = -1.0
+        self.best_date_iter = 0
+        self.history_mode = history
+        self.history: list[GRASPIteration] = []
+        self.structures = 0  # estruturas processadas
+        self.duplicates = 0
+        self.pending: list[GRASPProgress] = []  # registros ainda nao entregues
+        # Sem busca local, a chave estrutural de uma estrutura nao depende
+        # das datas e o laco interno pode parar cedo.
+        self.stop_dates_early = local_search == "none"
+        self.search_stats = LocalSearchStats()
+        self.iter_no_improve = 0
+        self.stopped_by = "max_iter"
+        # Também serve de memória de schedules já vistos (is_duplicate):
+        # limitada a `cache_size` fingerprints, como as avaliações.
+        self.cache: EvaluationCache[EvaluationCounts] = EvaluationCache(cache_size)
+        self.target_lex_key = tuple(target_lex_key) if target_lex_key is not None else None
+        self.start = time.perf_counter()
+        self.deadline = self.start + time_limit_s if time_limit_s is not None else None
+        self.improvement_times: list[tuple[int, int, float]] = []
+        self.next_iter = 0  # proxima estrutura a processar
+
+    # Campos salvos no checkpoint (o schedule vai compacto).
+    _STATE_FIELDS = (
+        "best_eval", "best_iter", "best_seed", "best_alpha", "best_date_iter",
+        "history", "structures", "duplicates", "iter_no_improve", "stopped_by", "cache",
+        "improvement_times", "next_iter", "search_stats",
+    )
+
+    @property
+    def finished(self) -> bool:
+        """Terminou por um criterio que um resume nao desfaz (o limite de
+        tempo vale por chamada)."""
+        return self.next_iter >= self.max_iter or self.stopped_by in (
+            "max_iter_no_improve", "target_reached",
+        )
+
+    def state(self) -> dict[str, Any]:
+        state = {name: getattr(self, name) for name in self._STATE_FIELDS}
+        state["best_schedule"] = (
+            ScheduleMatrix.from_schedule(self.best_schedule)
+            if self.best_schedule is not None else None
+        )
+        state["elapsed_s"] = time.perf_counter() - self.start
+        return state
+
+    def restore(self, state: dict[str, Any]) -> None:
+        for name in self._STATE_FIELDS:
+            setattr(self, name, state[name])
+        matrix = state["best_schedule"]
+        self.best_schedule = matrix.to_schedule() if matrix is not None else None
+        # Tempos de melhora continuam contando de onde pararam.
+        self.start = time.perf_counter() - state["elapsed_s"]
+        if self.stopped_by == "time_limit":
+            self.stopped_by = "max_iter"
+
+    def out_of_time(self) -> bool:
+        """Checado uma vez por estrutura, antes de construí-la (nunca por
+        candidato). Só para depois de haver um incumbente."""
+        if self.deadline is None or self.best_eval is None:
+            return False
+        if time.perf_counter() >= self.deadline:
+            self.stopped_by = "time_limit"
+            return True
+        return False
+
+    def _record(
+        self, i: int, j: int, alpha: float, avaliacao: EvaluationCounts,
+        fingerprint: int, is_duplicate: bool, is_new_best: bool,
+    ) -> None:
+        record = GRASPIteration(
+            iter_number=i + 1,
+            seed=self.seed + i,
+            alpha=alpha,
+            total_prv=avaliacao.total_prv,
+            total_cost=avaliacao.total_cost,
+            is_feasible=avaliacao.is_feasible,
+            is_new_best=is_new_best,
+            lex_key=avaliacao.lexicographic_key(),
+            pruned=avaliacao.pruned,
+            fingerprint=fingerprint,
+            is_duplicate=is_duplicate,
+            date_iter=j,
+        )
+        if self.history_mode == "full" or (
+            self.history_mode == "improvements" and is_new_best
+        ):
+            self.history.append(record)
+        if is_duplicate:
+            self.duplicates += 1
+        assert self.best_schedule is not None and self.best_eval is not None
+        self.pending.append(
+            GRASPProgress(
+                iteration=record,
+                best_schedule=self.best_schedule,
+                best_lex_key=self.best_eval.lexicographic_key(),
+                best_iter=self.best_iter + 1,
+                best_date_iter=self.best_date_iter,
+                structures=self.structures,
+                elapsed_s=time.perf_counter() - self.start,
+            )
+        )
+
+    def drain(self) -> list[GRASPProgress]:
+        """Registros produzidos desde a última chamada."""
+        out, self.pending = self.pending, []
+        return out
+
+    def step(self, i: int, alpha: float, structure: _LocalStructure | _RemoteStructure) -> bool:
+        """Processa a estrutura da iteração `i`; True se o loop deve parar."""
+        improved = False
+        skipped = False
+        self.next_iter = i + 1
+        self.structures += 1
+
+        if self.prune and self.best_eval is not None:
+            estrutura = structure.provisional(self.best_eval.lexicographic_key())
+            if estrutura.pruned:
+                self._record(i, 0, alpha, estrutura, 0, False, False)
+                skipped = True
+
+        avaliacao: EvaluationCounts | None = None
+        for j in range(0 if skipped else self.date_iters_per_structure):
+            if j > 0 and self.stop_dates_early:
+                assert avaliacao is not None and self.best_eval is not None
+                hard, soft, _ = avaliacao.lexicographic_key()
+                if avaliacao.pruned or (hard, soft, 0) >= self.best_eval.lexicographic_key():
+                    break
+
+            fingerprint, counts_of, schedule_of = structure.dated(j)
+            is_duplicate = fingerprint in self.cache
+
+            # Um resultado podado continua valido: o cutoff so fica mais apertado.
+            avaliacao = self.cache.get(fingerprint)
+            if avaliacao is None:
+                cutoff = (
+                    self.best_eval.lexicographic_key()
+                    if self.prune and self.best_eval is not None else None
+                )
+                avaliacao = counts_of(cutoff)
+                self.cache.put(fingerprint, avaliacao)
+                stats = structure.search_stats_of(j)
+                if stats is not None:
+                    self.search_stats.add(stats)
+
+            is_new_best = self.best_eval is None or avaliacao.is_better_than(self.best_eval)
+            if is_new_best:
+                self.best_schedule = schedule_of()
+                self.best_eval = avaliacao
+                self.best_iter = i
+                self.best_seed = self.seed + i
+                self.best_alpha = alpha
+                self.best_date_iter = j
+                self.improvement_times.append((i + 1, j, time.perf_counter() - self.start))
+                improved = True
+                logger.info(
+                    "Iter %d/%d (datas %d): novo melhor lex=%s, PRV=%d",
+                    i + 1,
+                    self.max_iter,
+                    j,
+                    avaliacao.lexicographic_key(),
+                    avaliacao.total_prv,
+                )
+
+            self._record(i, j, alpha, avaliacao, fingerprint, is_duplicate, is_new_best)
+            if (
+                is_new_best
+                and self.target_lex_key is not None
+                and avaliacao.lexicographic_key() <= self.target_lex_key
+            ):
+                self.stopped_by = "target_reached"
+                return True
+
+        self.iter_no_improve = 0 if improved else self.iter_no_improve + 1
+        if self.iter_no_improve >= self.max_iter_no_improve:
+            self.stopped_by = "max_iter_no_improve"
+            return True
+        return False
+
+
+def grasp_iter(
     teams_map: TeamMap,
     dates: list[date],
     *,
@@ -56,81 +699,372 @@ def grasp(
     min_team_rest_days: int = 3,
     max_consecutive: int = 2,
     weights: dict[str, float] | None = None,
-) -> GRASPResult:
-    """Loop multi-start do GRASP (Algoritmo 1, sem busca local)."""
-    rng_alpha = random.Random(seed)
+    prune: bool = False,
+    cache_size: int = 1024,
+    date_strategy: str = "greedy",
+    date_iters_per_structure: int = 1,
+    workers: int = 1,
+    time_limit_s: float | None = None,
+    target_lex_key: LexKey | None = None,
+    checkpoint_path: str | None = None,
+    checkpoint_every: int = 10,
+    resume: bool = False,
+    history: str = "full",
+    local_search: str = "none",
+    local_search_mode: str = "first",
+    local_search_neighborhoods: tuple[str, ...] = DEFAULT_NEIGHBORHOODS,
+    factorization: str = "circle",
+    history_sink: HistorySink | None = None,
+) -> Generator[GRASPProgress, None, GRASPResult]:
+    """Loop multi-start do GRASP (Algoritmos 1 e 2), como
+    gerador: produz um `GRASPProgress` por schedule avaliado (registro da
+    iteração e incumbente atual), assim que ele é avaliado, e retorna o
+    GRASPResult no fim (`StopIteration.value`; `grasp` faz isso por você).
+
+    Em dois níveis: cada iteração constrói uma estrutura (confrontos e
+    mandos, que decidem (a)–(g)) e tenta até `date_iters_per_structure`
+    atribuições de datas nela (que decidem o PRV). A primeira usa a ordem
+    de jogos da construção (a mesma de `construct_schedule`); as demais
+    embaralham os jogos de cada rodada com um RNG próprio da estrutura.
+    O laço interno para assim que a chave estrutural não pode mais
+    superar o incumbente. `max_iter`/`max_iter_no_improve` contam
+    estruturas; o histórico tem uma entrada por schedule avaliado.
+
+    Cada iteração é avaliada só por contagens (`evaluate_counts`); o
+    EvaluationResult completo é montado uma única vez, para o incumbente
+    final (`best_evaluation`).
+
+    Com `prune=True`, cada iteração é avaliada com `cutoff` = chave do
+    incumbente: schedules que não podem superá-lo param antes do PRV e
+    entram no histórico com `pruned=True` e valores parciais. O
+    incumbente e a trajetória (seeds/alphas) não mudam.
+
+    Avaliações ficam num cache LRU (`cache_size` entradas, 0 desliga)
+    indexado pelo fingerprint Zobrist do schedule; schedules repetidos
+    são marcados com `is_duplicate` no histórico. A marcação usa o mesmo
+    cache: só enxerga os últimos `cache_size` schedules distintos, então
+    `duplicate_iterations` é aproximado além disso (e 0 com cache_size=0).
+
+    Com `prune=True`, a estrutura também é avaliada antes das datas (num
+    `provisional_schedule`): se não pode superar o incumbente, nenhuma
+    data é atribuída e ela entra no histórico podada, com fingerprint 0.
+
+    As tabelas da instância (matchings, clássicos, janelas de datas) são
+    montadas uma vez num `ConstructionContext` e reaproveitadas por todas
+    as iterações. `date_strategy` é repassado a `assign_dates_to_matches`.
+
+    Com `workers=N > 1`, as estruturas são construídas e avaliadas (sem
+    poda, sem conhecer o incumbente) num ProcessPoolExecutor; os workers
+    devolvem só contagens, fingerprints e schedules em `ScheduleMatrix`.
+    O processo pai aplica os resultados em ordem de iteração, refazendo a
+    poda com `truncate_counts`: o GRASPResult é idêntico ao de workers=1.
+    Os alphas são sorteados de antemão (mesma sequência do loop serial).
+
+    Parada, além de `max_iter`/`max_iter_no_improve`: `time_limit_s`
+    (tempo de relógio, checado antes de cada estrutura; a estrutura em
+    andamento termina) e `target_lex_key` (para assim que o incumbente
+    tem chave <= alvo). `improvement_times` guarda o tempo de cada novo
+    melhor. Com limite de tempo o resultado depende da máquina.
+
+    Com `local_search="vnd"`, cada schedule construído passa pelo VND de
+    `local_search.LocalSearch` (vizinhanças `local_search_neighborhoods`,
+    por padrão swap_homes e swap_days; modo `local_search_mode`) antes de
+    ser comparado ao incumbente. O
+    fingerprint e o cache continuam sendo os do schedule construído (a
+    busca é determinística); o laço interno de datas não para cedo e
+    `prune=True` é recusado, porque a busca pode melhorar o que a poda
+    descartaria. `local_search_stats` soma movimentos e melhoras por
+    vizinhança.
+
+    `factorization` escolhe os matchings da construção (ver
+    `ConstructionContext`): "circle" ou "starter", este com a `seed` da
+    execução. A vizinhança kempe_chain só tem movimentos na liga de 20
+    times com "starter".
+
+    Com `checkpoint_path`, o estado do loop (estado do RNG de alpha,
+    incumbente em `ScheduleMatrix`, histórico, cache, `iter_no_improve`,
+    próxima iteração) é gravado de forma atômica no início, a cada
+    `checkpoint_every` estruturas (depois de produzir seus registros) e
+    no fim. `resume=True` continua de
+    onde o checkpoint parou (se o arquivo existir) e chega ao mesmo
+    GRASPResult da execução sem interrupção. O checkpoint precisa ser da
+    mesma configuração (ValueError se não); `workers`, `time_limit_s` e
+    o próprio checkpoint podem mudar. O limite de tempo vale por chamada:
+    uma execução parada por tempo continua no resume.
+
+    `history` escolhe o que fica em `GRASPResult.history`: "full" (um
+    registro por schedule avaliado), "improvements" (só os novos
+    melhores) ou "none". Com "none"/"improvements" a memória do loop não
+    cresce com o histórico; quem precisa dele inteiro o consome do
+    gerador (ou grava com `history_sink`). `total_iterations` e
+    `duplicate_iterations` são contados à parte e não dependem do modo.
+
+    Com `history_sink`, cada registro é gravado no sink antes de ser
+    produzido; o sink não é fechado aqui. O checkpoint guarda quantas
+    linhas o sink tinha e o resume trunca o arquivo nesse ponto, então
+    uma execução interrompida e retomada grava cada registro uma vez.
+    """
+    if history not in HISTORY_MODES:
+        raise ValueError(f"history deve ser um de {HISTORY_MODES}; recebido {history!r}")
+    if local_search not in LOCAL_SEARCHES:
+        raise ValueError(
+            f"local_search deve ser um de {LOCAL_SEARCHES}; recebido {local_search!r}"
+        )
+    if local_search_mode not in SEARCH_MODES:
+        raise ValueError(
+            f"local_search_mode deve ser um de {SEARCH_MODES}; recebido {local_search_mode!r}"
+        )
+    local_search_neighborhoods = tuple(local_search_neighborhoods)
+    check_neighborhoods(local_search_neighborhoods)
+    if factorization not in FACTORIZATIONS:
+        raise ValueError(
+            f"factorization deve ser um de {FACTORIZATIONS}; recebido {factorization!r}"
+        )
+    if local_search != "none" and prune:
+        # A poda compara o schedule construído com o incumbente, mas a
+        # busca local ainda pode melhorá-lo.
+        raise ValueError("prune=True não é compatível com busca local.")
+    if date_iters_per_structure < 1:
+        raise ValueError(
+            f"date_iters_per_structure deve ser >= 1; recebido {date_iters_per_structure}"
+        )
+    if workers < 1:
+        raise ValueError(f"workers deve ser >= 1; recebido {workers}")
+    if checkpoint_every < 1:
+        raise ValueError(f"checkpoint_every deve ser >= 1; recebido {checkpoint_every}")
+
     pool = alpha_pool if alpha_pool is not None else DEFAULT_ALPHA_POOL
+    # Estruturas e datas tem RNGs derivados da seed de cada iteracao; o
+    # unico RNG compartilhado entre iteracoes e o de alpha.
+    rng_alpha = random.Random(seed)
+    config = {
+        "teams": tuple(teams_map.items()),
+        "dates": tuple(dates),
+        "seed": seed,
+        "max_iter": max_iter,
+        "max_iter_no_improve": max_iter_no_improve,
+        "alpha_pool": tuple(pool),
+        "round_gap": round_gap,
+        "round_span": round_span,
+        "prv_days": prv_days,
+        "min_team_rest_days": min_team_rest_days,
+        "max_consecutive": max_consecutive,
+        "weights": weights,
+        "prune": prune,
+        "cache_size": cache_size,
+        "date_strategy": date_strategy,
+        "date_iters_per_structure": date_iters_per_structure,
+        "target_lex_key": tuple(target_lex_key) if target_lex_key is not None else None,
+        "history": history,
+        "local_search": local_search,
+        "local_search_mode": local_search_mode,
+        "local_search_neighborhoods": local_search_neighborhoods,
+        "factorization": factorization,
+    }
+    saved = None
+    if resume and checkpoint_path is not None and os.path.exists(checkpoint_path):
+        saved = _read_checkpoint(checkpoint_path, config)
+        rng_alpha.setstate(saved["rng_alpha_state"])
+    rng_alpha_state = rng_alpha.getstate()
+    alphas = [rng_alpha.choice(pool) for _ in range(max_iter)]
 
-    best_schedule: Schedule | None = None
-    best_eval: EvaluationResult | None = None
-    best_iter = -1
-    best_seed = -1
-    best_alpha = -1.0
-    history: list[GRASPIteration] = []
-    iter_no_improve = 0
-    stopped_by = "max_iter"
-
-    for i in range(max_iter):
-        seed_iter = seed + i
-        alpha_iter = rng_alpha.choice(pool)
-
-        schedule = construct_schedule(
-            teams_map,
-            dates,
-            alpha=alpha_iter,
-            seed=seed_iter,
-            round_gap=round_gap,
-            round_span=round_span,
-            prv_days=prv_days,
-            min_team_rest_days=min_team_rest_days,
-            max_consecutive=max_consecutive,
-        )
-        avaliacao = evaluate(schedule, weights=weights, prv_days=prv_days)
-
-        is_new_best = best_eval is None or avaliacao.is_better_than(best_eval)
-
-        if is_new_best:
-            best_schedule = schedule
-            best_eval = avaliacao
-            best_iter = i
-            best_seed = seed_iter
-            best_alpha = alpha_iter
-            iter_no_improve = 0
-            logger.info(
-                "Iter %d/%d: novo melhor lex=%s, PRV=%d",
-                i + 1,
-                max_iter,
-                avaliacao.lexicographic_key(),
-                avaliacao.total_prv,
-            )
-        else:
-            iter_no_improve += 1
-
-        history.append(
-            GRASPIteration(
-                iter_number=i + 1,
-                seed=seed_iter,
-                alpha=alpha_iter,
-                total_prv=avaliacao.total_prv,
-                total_cost=avaliacao.total_cost,
-                is_feasible=avaliacao.is_feasible,
-                is_new_best=is_new_best,
-                lex_key=avaliacao.lexicographic_key(),
-            )
+    params = _RunParams(
+        teams_map=teams_map,
+        dates=dates,
+        round_gap=round_gap,
+        round_span=round_span,
+        prv_days=prv_days,
+        min_team_rest_days=min_team_rest_days,
+        max_consecutive=max_consecutive,
+        weights=weights,
+        prune=prune,
+        date_strategy=date_strategy,
+        date_iters_per_structure=date_iters_per_structure,
+        local_search=local_search,
+        local_search_mode=local_search_mode,
+        local_search_neighborhoods=local_search_neighborhoods,
+        factorization=factorization,
+        factorization_seed=seed,
+    )
+    run = _GRASPRun(
+        seed=seed,
+        max_iter=max_iter,
+        max_iter_no_improve=max_iter_no_improve,
+        date_iters_per_structure=date_iters_per_structure,
+        prune=prune,
+        cache_size=cache_size,
+        time_limit_s=time_limit_s,
+        target_lex_key=target_lex_key,
+        history=history,
+        local_search=local_search,
+    )
+    checkpointer = None
+    if checkpoint_path is not None:
+        checkpointer = _Checkpointer(
+            checkpoint_path, checkpoint_every, config, rng_alpha_state, history_sink
         )
+    if saved is not None:
+        run.restore(saved["run"])
+        if history_sink is not None and saved["sink_rows"] is not None:
+            history_sink.truncate(saved["sink_rows"])
+    elif checkpointer is not None:
+        # Marca onde o sink estava, para um resume antes do 1º checkpoint.
+        checkpointer.save(run)
 
-        if iter_no_improve >= max_iter_no_improve:
-            stopped_by = "max_iter_no_improve"
-            break
+    if not run.finished:
+        if workers == 1:
+            source = _serial_structures(run, params, alphas)
+        else:
+            source = _parallel_structures(run, params, alphas, workers)
+        try:
+            while not run.out_of_time():
+                item = next(source, None)
+                if item is None:
+                    break
+                i, structure = item
+                stop = run.step(i, alphas[i], structure)
+                for progress in run.drain():
+                    if history_sink is not None:
+                        history_sink.write(progress.iteration)
+                    yield progress
+                if stop:
+                    break
+                # Depois de entregar os registros: o consumidor já os viu.
+                if checkpointer is not None:
+                    checkpointer.after_step(run)
+        finally:
+            source.close()
+    if checkpointer is not None:
+        checkpointer.save(run)
 
-    assert best_schedule is not None and best_eval is not None
+    n_teams = len(teams_map)
+    best_schedule = run.best_schedule
+    assert best_schedule is not None and run.best_eval is not None
     return GRASPResult(
         best_schedule=best_schedule,
-        best_evaluation=best_eval,
-        best_iter=best_iter + 1,
-        best_seed=best_seed,
-        best_alpha=best_alpha,
-        total_iterations=len(history),
-        stopped_by=stopped_by,
+        best_evaluation=evaluate(
+            best_schedule, weights=weights, prv_days=prv_days, n_teams=n_teams
+        ),
+        best_iter=run.best_iter + 1,
+        best_seed=run.best_seed,
+        best_alpha=run.best_alpha,
+        total_iterations=run.structures,
+        stopped_by=run.stopped_by,
+        history=run.history,
+        cache_hits=run.cache.hits,
+        cache_misses=run.cache.misses,
+        best_date_iter=run.best_date_iter,
+        improvement_times=run.improvement_times,
+        elapsed_s=time.perf_counter() - run.start,
+        duplicate_iterations=run.duplicates,
+        local_search_stats=run.search_stats,
+    )
+
+
+def grasp(
+    teams_map: TeamMap,
+    dates: list[date],
+    *,
+    max_iter: int = 50,
+    max_iter_no_improve: int = 20,
+    alpha_pool: list[float] | None = None,
+    seed: int = 42,
+    round_gap: int = 7,
+    round_span: int = 3,
+    prv_days: int = 5,
+    min_team_rest_days: int = 3,
+    max_consecutive: int = 2,
+    weights: dict[str, float] | None = None,
+    prune: bool = False,
+    cache_size: int = 1024,
+    date_strategy: str = "greedy",
+    date_iters_per_structure: int = 1,
+    workers: int = 1,
+    time_limit_s: float | None = None,
+    target_lex_key: LexKey | None = None,
+    checkpoint_path: str | None = None,
+    checkpoint_every: int = 10,
+    resume: bool = False,
+    history: str = "full",
+    local_search: str = "none",
+    local_search_mode: str = "first",
+    local_search_neighborhoods: tuple[str, ...] = DEFAULT_NEIGHBORHOODS,
+    factorization: str = "circle",
+    history_sink: HistorySink | None = None,
+) -> GRASPResult:
+    """Roda `grasp_iter` até o fim e devolve o GRASPResult (as opções são
+    as de `grasp_iter`, inclusive `history_sink`).
+    """
+    steps = grasp_iter(
+        teams_map,
+        dates,
+        max_iter=max_iter,
+        max_iter_no_improve=max_iter_no_improve,
+        alpha_pool=alpha_pool,
+        seed=seed,
+        round_gap=round_gap,
+        round_span=round_span,
+        prv_days=prv_days,
+        min_team_rest_days=min_team_rest_days,
+        max_consecutive=max_consecutive,
+        weights=weights,
+        prune=prune,
+        cache_size=cache_size,
+        date_strategy=date_strategy,
+        date_iters_per_structure=date_iters_per_structure,
+        workers=workers,
+        time_limit_s=time_limit_s,
+        target_lex_key=target_lex_key,
+        checkpoint_path=checkpoint_path,
+        checkpoint_every=checkpoint_every,
+        resume=resume,
         history=history,
+        local_search=local_search,
+        local_search_mode=local_search_mode,
+        local_search_neighborhoods=local_search_neighborhoods,
+        factorization=factorization,
+        history_sink=history_sink,
     )
+    while True:
+        try:
+            next(steps)
+        except StopIteration as done:
+            return done.value
+
+
+# Fontes de estruturas para o loop: (iteração, estrutura) em ordem. O loop
+# checa o limite de tempo antes de pedir cada uma.
+
+def _serial_structures(
+    run: _GRASPRun, params: _RunParams, alphas: list[float]
+) -> Iterator[tuple[int, _LocalStructure]]:
+    builder = _Builder(params)
+    for i in range(run.next_iter, len(alphas)):
+        yield i, _LocalStructure(builder, run.seed + i, alphas[i])
+
+
+def _parallel_structures(
+    run: _GRASPRun, params: _RunParams, alphas: list[float], workers: int
+) -> Iterator[tuple[int, _RemoteStructure]]:
+    """Distribui as estruturas entre `workers` processos e as entrega em
+    ordem. Mantém até 2·workers tarefas em voo; ao ser fechada, cancela
+    as que ainda não começaram."""
+    seed = run.seed
+    pending: deque[tuple[int, Future[_StructureOutcome]]] = deque()
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_worker_init, initargs=(params,)
+    ) as executor:
+        try:
+            next_i = run.next_iter
+            while True:
+                while next_i < len(alphas) and len(pending) < 2 * workers:
+                    task = (seed + next_i, alphas[next_i])
+                    pending.append((next_i, executor.submit(_worker_structure, task)))
+                    next_i += 1
+                if not pending:
+                    break
+                i, future = pending.popleft()
+                yield i, _RemoteStructure(future.result(), params.weights)
+        finally:
+            for _, future in pending:
+                future.cancel()
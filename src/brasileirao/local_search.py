@@ -0,0 +1,534 @@
+from __future__ import annotations
+
+import time
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from typing import Callable, Iterator, Sequence
+
+from .delta import DeltaEvaluator, Move
+from .domain import Schedule, ScheduleLike, ScheduledMatch, as_schedule, format_day
+
+# Vizinhanças disponíveis, em ordem de custo por varredura.
+NEIGHBORHOODS: tuple[str, ...] = (
+    "swap_homes", "swap_days", "kempe_chain", "swap_rounds", "swap_teams", "replace_teams",
+)
+# Padrão do VND: as vizinhanças baratas (as estruturais custam ~5x mais
+# por schedule; ver docs/specs/local_search.md).
+DEFAULT_NEIGHBORHOODS: tuple[str, ...] = ("swap_homes", "swap_days")
+# Vizinhanças que mudam quem joga em cada slot: os índices da busca são
+# refeitos depois de aplicar um movimento delas.
+STRUCTURAL_NEIGHBORHOODS = frozenset(
+    {"kempe_chain", "swap_rounds", "swap_teams", "replace_teams"}
+)
+SEARCH_MODES = ("first", "best")
+
+
+@dataclass
+class LocalSearchStats:
+    """Contadores da busca local, por vizinhança."""
+
+    moves_tried: dict[str, int] = field(default_factory=dict)
+    improvements: dict[str, int] = field(default_factory=dict)
+    runs: int = 0  # schedules melhorados (chamadas da busca)
+    # Tempo de relógio: fica fora da comparação de igualdade.
+    elapsed_s: float = field(default=0.0, compare=False)
+
+    @property
+    def total_moves(self) -> int:
+        return sum(self.moves_tried.values())
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.total_moves / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def add(self, other: "LocalSearchStats") -> None:
+        """Acumula `other` nestes contadores."""
+        for name, count in other.moves_tried.items():
+            self.moves_tried[name] = self.moves_tried.get(name, 0) + count
+        for name, count in other.improvements.items():
+            self.improvements[name] = self.improvements.get(name, 0) + count
+        self.runs += other.runs
+        self.elapsed_s += other.elapsed_s
+
+
+@dataclass
+class LocalSearchResult:
+    schedule: Schedule
+    lex_key: tuple[int, int, int]
+    stats: LocalSearchStats
+
+
+class LocalSearch:
+    """Busca local sobre um DeltaEvaluator: cada movimento é pontuado
+    pela variação incremental (`DeltaEvaluator.delta`), nunca por
+    `evaluate()`. Um movimento melhora sse baixa a chave lexicográfica.
+
+    As vizinhanças geram movimentos a partir do estado atual (um
+    movimento aplicado no meio de uma varredura vale para os seguintes):
+
+      - swap_homes: inverte o mando dos dois jogos de um par (turno e
+        returno juntos), trocando também estádio e estados. Preserva
+        (a)/(b) e as datas;
+      - swap_days: troca as datas de dois jogos da mesma rodada, se os
+        quatro times continuam com `min_team_rest_days` de descanso para
+        o jogo anterior e o seguinte. Preserva (a)–(g) e a quantidade de
+        jogos por data; só o PRV muda;
+      - swap_rounds: troca as rodadas do turno r e s, e junto as
+        espelhadas r + T e s + T. As datas ficam com as rodadas: os jogos
+        que vão para s recebem, em ordem, as datas que s tinha (a mesma
+        quantidade de jogos por data). Só gera trocas que mantêm o
+        descanso mínimo de todos os times. Preserva (a)/(b);
+      - kempe_chain: a união dos matchings de duas rodadas do turno r e s
+        se decompõe em ciclos que alternam jogos de r e de s; o movimento
+        troca de rodada os jogos de um ciclo (e os espelhos em r + T e
+        s + T), com as datas ficando nos slots. Ciclos que cobrem a
+        rodada inteira são o movimento de swap_rounds e ficam de fora;
+      - swap_teams: dois times i e j trocam de adversário (e de lado) numa
+        rodada do turno r; o reparo segue a cadeia de rodadas em que i
+        enfrenta o adversário que acabou de receber, até fechar o ciclo,
+        e repete tudo nas rodadas espelhadas do returno. Uma cadeia que
+        cobre todo o turno menos o confronto direto (na fatoração do
+        `circle_method` todas são assim) seria replace_teams; nela o
+        confronto direto também troca de mando, no turno e no espelho, e
+        i e j trocam a tabela inteira;
+      - replace_teams: i e j trocam de lugar em todos os jogos, menos nos
+        confrontos entre eles (i passa a jogar os matchings de j).
+
+    kempe_chain, swap_teams e replace_teams mantêm (a) e (b) por construção: cada
+    rodada continua com os mesmos times, e cada time enfrenta os mesmos
+    adversários uma vez em cada mando. Exigem returno espelhado (rodada
+    r + T com os confrontos de r, mandos invertidos); sem isso não geram
+    movimentos. As datas ficam nos slots; swap_teams só gera movimentos
+    em que i e j mantêm o descanso mínimo (em replace_teams eles trocam
+    de sequência de datas, que já o respeitavam).
+    """
+
+    def __init__(
+        self,
+        schedule: ScheduleLike,
+        *,
+        weights: dict[str, float] | None = None,
+        prv_days: int = 5,
+        min_team_rest_days: int = 3,
+        n_teams: int | None = None,
+    ) -> None:
+        self.evaluator = DeltaEvaluator(
+            schedule, weights=weights, prv_days=prv_days, n_teams=n_teams
+        )
+        self.min_team_rest_days = min_team_rest_days
+        self.stats = LocalSearchStats()
+        self._generators: dict[str, Callable[[], Iterator[Move]]] = {
+            "swap_homes": self._swap_homes_moves,
+            "swap_days": self._swap_days_moves,
+            "kempe_chain": self._kempe_chain_moves,
+            "swap_rounds": self._swap_rounds_moves,
+            "swap_teams": self._swap_teams_moves,
+            "replace_teams": self._replace_teams_moves,
+        }
+
+        # Estádio e estado de cada time (o estádio mais usado como mandante).
+        stadiums: dict[str, Counter[str]] = {}
+        self._state_of: dict[str, str] = {}
+        for m in self.evaluator.schedule:
+            stadiums.setdefault(m.home, Counter())[m.stadium] += 1
+            self._state_of.setdefault(m.home, m.home_state)
+            self._state_of.setdefault(m.away, m.away_state)
+        self._stadium_of = {t: c.most_common(1)[0][0] for t, c in stadiums.items()}
+        self._reindex()
+
+    def _reindex(self) -> None:
+        """Índices por par, rodada e time. Só mudam com movimentos
+        estruturais (swap_homes e swap_days mantêm rodada e times)."""
+        matches = self.evaluator.schedule
+        self._pair_slots: dict[frozenset, list[int]] = {}
+        self._round_slots: dict[int, list[int]] = {}
+        self._team_slots: dict[str, list[int]] = {}
+        for slot, m in enumerate(matches):
+            self._pair_slots.setdefault(frozenset((m.home, m.away)), []).append(slot)
+            self._round_slots.setdefault(m.round, []).append(slot)
+            self._team_slots.setdefault(m.home, []).append(slot)
+            self._team_slots.setdefault(m.away, []).append(slot)
+        # Posição de cada (time, slot) na sequência do time por rodada.
+        self._team_pos: dict[tuple[str, int], int] = {}
+        for team, slots in self._team_slots.items():
+            slots.sort(key=lambda s: matches[s].round)
+            for pos, slot in enumerate(slots):
+                self._team_pos[(team, slot)] = pos
+
+        # Turno espelhado: (rodada, time) -> slot no turno e slot -> espelho.
+        turno_last = self.evaluator.turno_last
+        self._turno_slot: dict[tuple[int, str], int] = {}
+        self._mirror: dict[int, int] = {}
+        mirrored = True
+        for slot, m in enumerate(matches):
+            if m.round > turno_last:
+                continue
+            self._turno_slot[(m.round, m.home)] = slot
+            self._turno_slot[(m.round, m.away)] = slot
+            pair = self._pair_slots[frozenset((m.home, m.away))]
+            other = [s for s in pair if s != slot]
+            if len(pair) != 2 or not other:
+                mirrored = False
+                continue
+            mirror = matches[other[0]]
+            if mirror.round != m.round + turno_last or mirror.home != m.away:
+                mirrored = False
+            self._mirror[slot] = other[0]
+        self._mirrored = mirrored and len(self._mirror) * 2 == len(matches)
+
+    @property
+    def schedule(self) -> Schedule:
+        return self.evaluator.schedule
+
+    # ------------------------------------------------------------------
+    # Vizinhanças
+    # ------------------------------------------------------------------
+
+    def _swap_homes_moves(self) -> Iterator[Move]:
+        ev = self.evaluator
+        for slots in self._pair_slots.values():
+            if len(slots) != 2:
+                continue
+            i, j = slots
+            a, b = ev.match(i), ev.match(j)
+            if (a.home, a.away) != (b.away, b.home):
+                continue  # não é um par espelhado (mando repetido)
+            yield [(i, _flip(a, stadium=b.stadium)), (j, _flip(b, stadium=a.stadium))]
+
+    def _swap_days_moves(self) -> Iterator[Move]:
+        ev = self.evaluator
+        for r in sorted(self._round_slots):
+            slots = self._round_slots[r]
+            for x, i in enumerate(slots):
+                for j in slots[x + 1:]:
+                    a, b = ev.match(i), ev.match(j)
+                    if a.day == b.day:
+                        continue
+                    if not (self._rest_ok(i, a, b.ordinal) and self._rest_ok(j, b, a.ordinal)):
+                        continue
+                    yield [(i, replace(a, day=b.day)), (j, replace(b, day=a.day))]
+
+    def _rest_ok(self, slot: int, m: ScheduledMatch, day: int) -> bool:
+        """Os dois times de `m` descansam o mínimo se o jogo for para `day`."""
+        ev = self.evaluator
+        rest = self.min_team_rest_days
+        for team in (m.home, m.away):
+            slots = self._team_slots[team]
+            pos = self._team_pos[(team, slot)]
+            if pos > 0 and day - ev.match(slots[pos - 1]).ordinal < rest:
+                return False
+            if pos + 1 < len(slots) and ev.match(slots[pos + 1]).ordinal - day < rest:
+                return False
+        return True
+
+    def _swap_rounds_moves(self) -> Iterator[Move]:
+        ev = self.evaluator
+        turno = ev.turno_last
+        teams = tuple(self._team_slots)
+        for r in range(1, turno + 1):
+            for s in range(r + 1, turno + 1):
+                move = self._exchange_rounds(r, s) + self._exchange_rounds(r + turno, s + turno)
+                if move and self._move_rest_ok(move, teams):
+                    yield move
+
+    def _exchange_rounds(self, r: int, s: int) -> list[tuple[int, ScheduledMatch]]:
+        """Jogos de r passam para s com as datas de s, e vice-versa (vazio
+        se as rodadas têm quantidades de jogos diferentes)."""
+        ev = self.evaluator
+        slots_r = self._round_slots.get(r, [])
+        slots_s = self._round_slots.get(s, [])
+        if len(slots_r) != len(slots_s):
+            return []
+        move: list[tuple[int, ScheduledMatch]] = []
+        for src, dst, new_round in ((slots_r, slots_s, s), (slots_s, slots_r, r)):
+            # Em ordem de data: o i-ésimo jogo de src recebe a i-ésima data de dst.
+            ordered = sorted(src, key=lambda slot: ev.match(slot).ordinal)
+            days = sorted(ev.match(slot).ordinal for slot in dst)
+            for slot, day in zip(ordered, days):
+                move.append(
+                    (slot, replace(ev.match(slot), round=new_round, day=format_day(day)))
+                )
+        return move
+
+    def kempe_chains(self, r: int, s: int) -> list[tuple[list[int], list[int]]]:
+        """Componentes da união dos matchings das rodadas do turno r e s:
+        (slots de r, slots de s) de cada ciclo, em O(times)."""
+        chains = []
+        seen: set[int] = set()
+        for slot in self._round_slots.get(r, []):
+            if slot in seen:
+                continue
+            in_r: list[int] = []
+            in_s: list[int] = []
+            # Caminha pelo ciclo alternando jogos de r e de s.
+            stack = [(slot, r)]
+            while stack:
+                cur, rnd = stack.pop()
+                if cur in seen:
+                    continue
+                seen.add(cur)
+                (in_r if rnd == r else in_s).append(cur)
+                m = self.evaluator.match(cur)
+                nxt = s if rnd == r else r
+                for team in (m.home, m.away):
+                    other = self._turno_slot.get((nxt, team))
+                    if other is not None and other not in seen:
+                        stack.append((other, nxt))
+            chains.append((in_r, in_s))
+        return chains
+
+    def _kempe_chain_moves(self) -> Iterator[Move]:
+        if not self._mirrored:
+            return
+        ev = self.evaluator
+        for r in range(1, ev.turno_last + 1):
+            n_r = len(self._round_slots.get(r, []))
+            for s in range(r + 1, ev.turno_last + 1):
+                for in_r, in_s in self.kempe_chains(r, s):
+                    # Ciclo com a rodada inteira = swap_rounds; caminhos
+                    # (com BYE) mudam a quantidade de jogos por rodada.
+                    if len(in_r) == n_r or len(in_r) != len(in_s):
+                        continue
+                    move = self._exchange_slots(in_r, in_s) + self._exchange_slots(
+                        [self._mirror[x] for x in in_r], [self._mirror[x] for x in in_s]
+                    )
+                    teams = {t for slot in in_r for t in _teams(ev.match(slot))}
+                    if self._move_rest_ok(move, tuple(teams)):
+                        yield move
+
+    def _exchange_slots(
+        self, slots_a: Sequence[int], slots_b: Sequence[int]
+    ) -> list[tuple[int, ScheduledMatch]]:
+        """Os jogos de `slots_a` vão para os slots de `slots_b` e vice-versa,
+        cada um com rodada e data do slot de destino (em ordem de data)."""
+        ev = self.evaluator
+        move: list[tuple[int, ScheduledMatch]] = []
+        for src, dst in ((slots_a, slots_b), (slots_b, slots_a)):
+            ordered_src = sorted(src, key=lambda slot: ev.match(slot).ordinal)
+            ordered_dst = sorted(dst, key=lambda slot: ev.match(slot).ordinal)
+            for a, b in zip(ordered_src, ordered_dst):
+                target = ev.match(b)
+                move.append((b, replace(ev.match(a), round=target.round, day=target.day)))
+        return move
+
+    def _opponent(self, round_: int, team: str) -> str | None:
+        slot = self._turno_slot.get((round_, team))
+        if slot is None:
+            return None
+        m = self.evaluator.match(slot)
+        return m.away if m.home == team else m.home
+
+    def _relabel(self, m: ScheduledMatch, swap: dict[str, str]) -> ScheduledMatch:
+        """`m` com os times trocados por `swap` (mantendo os lados)."""
+        home = swap.get(m.home, m.home)
+        away = swap.get(m.away, m.away)
+        return replace(
+            m,
+            home=home,
+            away=away,
+            stadium=self._stadium_of.get(home, m.stadium),
+            home_state=self._state_of[home],
+            away_state=self._state_of[away],
+        )
+
+    def _team_chain(self, r: int, ti: str, tj: str) -> list[int] | None:
+        """Rodadas do turno que swap_teams(r, i, j) precisa tocar: em cada
+        uma, i e j trocam de adversário. None se a cadeia passa por um
+        confronto entre i e j."""
+        target = self._opponent(r, ti)
+        chain = [r]
+        opp = self._opponent(r, tj)
+        while opp != target:
+            if opp is None or opp == ti:
+                return None
+            slots = self._pair_slots.get(frozenset((ti, opp)), ())
+            k = next(
+                (self.evaluator.match(s).round for s in slots
+                 if self.evaluator.match(s).round <= self.evaluator.turno_last),
+                None,
+            )
+            if k is None or k in chain:
+                return None
+            chain.append(k)
+            opp = self._opponent(k, tj)
+        return chain
+
+    def _swap_teams_moves(self) -> Iterator[Move]:
+        if not self._mirrored:
+            return
+        ev = self.evaluator
+        teams = sorted(self._team_slots)
+        full = ev.turno_last - 1
+        for r in range(1, ev.turno_last + 1):
+            for x, ti in enumerate(teams):
+                opp_i = self._opponent(r, ti)
+                if opp_i is None:
+                    continue
+                for tj in teams[x + 1:]:
+                    if tj == opp_i or self._opponent(r, tj) is None:
+                        continue
+                    chain = self._team_chain(r, ti, tj)
+                    # Cada cadeia é gerada uma vez, a partir da menor rodada.
+                    if chain is None or min(chain) != r:
+                        continue
+                    move = self._swap_in_rounds(chain, ti, tj)
+                    if len(chain) == full:
+                        # Sem o confronto direto seria replace_teams.
+                        move += self._flip_pair(ti, tj)
+                    if self._move_rest_ok(move, (ti, tj)):
+                        yield move
+
+    def _swap_in_rounds(self, rounds: Sequence[int], ti: str, tj: str) -> Move:
+        swap = {ti: tj, tj: ti}
+        move: list[tuple[int, ScheduledMatch]] = []
+        for k in rounds:
+            for team in (ti, tj):
+                slot = self._turno_slot[(k, team)]
+                for s in (slot, self._mirror[slot]):
+                    move.append((s, self._relabel(self.evaluator.match(s), swap)))
+        return move
+
+    def _flip_pair(self, ti: str, tj: str) -> Move:
+        """Os dois jogos entre `ti` e `tj` com o mando invertido."""
+        ev = self.evaluator
+        x, y = self._pair_slots[frozenset((ti, tj))]
+        a, b = ev.match(x), ev.match(y)
+        return [(x, _flip(a, stadium=b.stadium)), (y, _flip(b, stadium=a.stadium))]
+
+    def _replace_teams_moves(self) -> Iterator[Move]:
+        if not self._mirrored:
+            return
+        ev = self.evaluator
+        teams = sorted(self._team_slots)
+        for x, ti in enumerate(teams):
+            for tj in teams[x + 1:]:
+                swap = {ti: tj, tj: ti}
+                slots = set(self._team_slots[ti]) ^ set(self._team_slots[tj])
+                yield [(s, self._relabel(ev.match(s), swap)) for s in sorted(slots)]
+
+    def _move_rest_ok(self, move: Move, teams: Sequence[str]) -> bool:
+        """Descanso mínimo dos `teams` depois do movimento."""
+        ev = self.evaluator
+        changed = dict(move)
+        rest = self.min_team_rest_days
+        for team in teams:
+            # O time só pode estar nos slots dele ou nos que o movimento muda.
+            slots = set(self._team_slots[team]).union(changed)
+            played = sorted(
+                (m.round, m.ordinal)
+                for m in (changed.get(s, ev.match(s)) for s in slots)
+                if team in (m.home, m.away)
+            )
+            for (_, a), (_, b) in zip(played, played[1:]):
+                if b - a < rest:
+                    return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Descida
+    # ------------------------------------------------------------------
+
+    def descend(self, name: str, mode: str = "first") -> bool:
+        """Uma varredura da vizinhança `name`; True se melhorou.
+
+        "first" aplica cada movimento que melhora assim que o encontra e
+        segue a varredura (numa vizinhança estrutural, para no primeiro);
+        "best" aplica só o melhor movimento dela.
+        """
+        ev = self.evaluator
+        generate = self._generators[name]
+        structural = name in STRUCTURAL_NEIGHBORHOODS
+        current = ev.lexicographic_key()
+        best_move: Move | None = None
+        best_key = current
+        tried = 0
+        improved = 0
+        for move in generate():
+            tried += 1
+            change, _ = ev.delta(move)
+            key = (current[0] + change[0], current[1] + change[1], current[2] + change[2])
+            if key >= best_key:
+                continue
+            if mode == "first":
+                ev.apply(move)
+                current = best_key = key
+                improved += 1
+                if structural:
+                    # Os índices mudaram: a varredura recomeça no VND.
+                    break
+            else:
+                best_move, best_key = list(move), key
+        if best_move is not None:
+            ev.apply(best_move)
+            improved = 1
+        if structural and improved:
+            self._reindex()
+        stats = self.stats
+        stats.moves_tried[name] = stats.moves_tried.get(name, 0) + tried
+        stats.improvements[name] = stats.improvements.get(name, 0) + improved
+        return improved > 0
+
+    def vnd(
+        self, neighborhoods: Sequence[str] = DEFAULT_NEIGHBORHOODS, mode: str = "first"
+    ) -> None:
+        """Variable Neighborhood Descent: volta à primeira vizinhança a
+        cada melhora; termina num ótimo local de todas."""
+        start = time.perf_counter()
+        k = 0
+        while k < len(neighborhoods):
+            k = 0 if self.descend(neighborhoods[k], mode) else k + 1
+        self.stats.runs += 1
+        self.stats.elapsed_s += time.perf_counter() - start
+
+
+def _teams(m: ScheduledMatch) -> tuple[str, str]:
+    return (m.home, m.away)
+
+
+def _flip(m: ScheduledMatch, *, stadium: str) -> ScheduledMatch:
+    return replace(
+        m,
+        home=m.away,
+        away=m.home,
+        stadium=stadium,
+        home_state=m.away_state,
+        away_state=m.home_state,
+    )
+
+
+def check_neighborhoods(neighborhoods: Sequence[str]) -> None:
+    """ValueError se algum nome não está em NEIGHBORHOODS."""
+    unknown = [n for n in neighborhoods if n not in NEIGHBORHOODS]
+    if unknown:
+        raise ValueError(f"Vizinhanças desconhecidas: {unknown}; use {NEIGHBORHOODS}")
+
+
+def vnd(
+    schedule: ScheduleLike,
+    *,
+    neighborhoods: Sequence[str] = DEFAULT_NEIGHBORHOODS,
+    mode: str = "first",
+    weights: dict[str, float] | None = None,
+    prv_days: int = 5,
+    min_team_rest_days: int = 3,
+    n_teams: int | None = None,
+) -> LocalSearchResult:
+    """VND sobre `neighborhoods` (ver NEIGHBORHOODS), com primeira melhora
+    (`mode="first"`) ou melhor melhora (`mode="best"`). Não altera
+    `schedule`; a chave do resultado nunca é pior que a da entrada."""
+    check_neighborhoods(neighborhoods)
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode deve ser um de {SEARCH_MODES}; recebido {mode!r}")
+    search = LocalSearch(
+        as_schedule(schedule),
+        weights=weights,
+        prv_days=prv_days,
+        min_team_rest_days=min_team_rest_days,
+        n_teams=n_teams,
+    )
+    search.vnd(neighborhoods, mode)
+    return LocalSearchResult(
+        schedule=search.schedule,
+        lex_key=search.evaluator.lexicographic_key(),
+        stats=search.stats,
+    )
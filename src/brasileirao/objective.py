@@ -2,17 +2,35 @@ from __future__ import annotations
 
 import logging
 import warnings
-from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Sequence, TypeVar
 
-from .constraints import CONSTRAINT_CHECKS
+import numpy as np
+
+from .constraints import (
+    BACKENDS,
+    BUILTIN_COUNTS,
+    CONSTRAINT_CHECKS,
+    check_input,
+    is_builtin_check,
+    registry_indexes,
+)
 from .domain import (
     ConstraintViolation,
+    EvaluationCounts,
     EvaluationResult,
     PRVOccurrence,
     PRVResult,
     Schedule,
     ScheduledMatch,
+    ScheduleLike,
+)
+from .schedule_index import ScheduleIndex, as_index
+from .vectorized import (
+    matrix_counts,
+    matrix_prv,
+    matrix_violations,
+    stacked_counts,
+    to_matrix,
 )
 
 if TYPE_CHECKING:
@@ -37,26 +55,25 @@ DEFAULT_WEIGHTS: dict[str, float] = {
     "h": 0.0,
 }
 
-_DATE_FMT = "%d/%m/%Y"
 
+def compute_prv(schedule: ScheduleLike | ScheduleIndex, prv_days: int = 5) -> PRVResult:
+    """Conta PRVs: pares consecutivos no mesmo estádio com intervalo < prv_days dias.
 
-def _parse_day(day: str) -> datetime:
-    return datetime.strptime(day, _DATE_FMT)
-
+    Recebendo um ScheduleIndex, reaproveita o agrupamento por estádio e
+    memoriza o resultado (evaluate e a checagem (h) compartilham o cálculo).
+    """
+    index = as_index(schedule, "by_stadium")
+    return index.cached_prv(prv_days, lambda: _compute_prv(index, prv_days))
 
-def compute_prv(schedule: Schedule, prv_days: int = 5) -> PRVResult:
-    """Conta PRVs: pares consecutivos no mesmo estádio com intervalo < prv_days dias."""
-    by_stadium: dict[str, list[ScheduledMatch]] = {}
-    for match in schedule:
-        by_stadium.setdefault(match.stadium, []).append(match)
 
+def _compute_prv(index: ScheduleIndex, prv_days: int) -> PRVResult:
     occurrences: list[PRVOccurrence] = []
     prv_by_stadium: dict[str, int] = {}
 
-    for stadium, matches in by_stadium.items():
-        ordered = sorted(matches, key=lambda m: (_parse_day(m.day), m.round))
+    for stadium, matches in index.by_stadium.items():
+        ordered = sorted(matches, key=lambda m: (m.ordinal, m.round))
         for earlier, later in zip(ordered, ordered[1:]):
-            delta = (_parse_day(later.day) - _parse_day(earlier.day)).days
+            delta = later.ordinal - earlier.ordinal
             if delta < prv_days:
                 occurrences.append(
                     PRVOccurrence(
@@ -76,10 +93,68 @@ def compute_prv(schedule: Schedule, prv_days: int = 5) -> PRVResult:
     )
 
 
+def count_prv(schedule: ScheduleLike | ScheduleIndex, prv_days: int = 5) -> int:
+    """Mesmo total de compute_prv, sem montar PRVOccurrence."""
+    index = as_index(schedule, "by_stadium")
+    total = 0
+    for matches in index.by_stadium.values():
+        days = sorted(m.ordinal for m in matches)
+        total += sum(1 for a, b in zip(days, days[1:]) if b - a < prv_days)
+    return total
+
+
+LexKey = tuple[int, int, int]
+
+_EMPTY_PRV = PRVResult(total_prv=0, occurrences=[], prv_by_stadium={})
+
+
+def _priority_order() -> list[tuple[str, Callable]]:
+    """Registry na ordem da chave lexicográfica: hard, soft estruturais, (h).
+
+    A ordenação é estável: dentro de cada grupo vale a ordem do registry.
+    """
+
+    def group(cid: str) -> int:
+        if cid in HARD_CONSTRAINTS:
+            return 0
+        return 2 if cid == "h" else 1
+
+    return sorted(CONSTRAINT_CHECKS, key=lambda item: group(item[0]))
+
+
+def _shared_index(schedule: ScheduleLike, n_teams: int | None = None) -> ScheduleIndex:
+    """Índice único da avaliação: o que o registry declara + PRV, numa passada."""
+    return ScheduleIndex(schedule, registry_indexes() | {"by_stadium"}, n_teams=n_teams)
+
+
+def _cannot_beat(violations_by_type: dict[str, int], cutoff: LexKey) -> bool:
+    """True se a chave parcial (PRV e checagens pendentes = 0, um limite
+    inferior da chave final) já não é estritamente melhor que `cutoff`."""
+    hard = 0
+    soft = 0
+    for cid, count in violations_by_type.items():
+        if cid in HARD_CONSTRAINTS:
+            hard += count
+        elif cid != "h":
+            soft += count
+    return (hard, soft, 0) >= tuple(cutoff)
+
+
+_T = TypeVar("_T")
+
+
+def _in_registry_order(values: dict[str, _T]) -> dict[str, _T]:
+    return {cid: values[cid] for cid, _ in CONSTRAINT_CHECKS if cid in values}
+
+
 def evaluate(
-    schedule: Schedule,
+    schedule: ScheduleLike,
     weights: dict[str, float] | None = None,
     prv_days: int = 5,
+    *,
+    backend: str = "python",
+    cutoff: LexKey | None = None,
+    n_teams: int | None = None,
 ) -> EvaluationResult:
     """
     Avalia f(x) = w[prv] * total_prv + Σ_c w[c] * |violations_c|
@@ -90,22 +165,81 @@ def evaluate(
 
     weights faltantes herdam de DEFAULT_WEIGHTS. (h) tem peso default 0
     para evitar dupla contagem com w["prv"] * total_prv.
+
+    Aceita tanto List[ScheduledMatch] quanto ScheduleMatrix.
+    `backend="numpy"` calcula as checagens padrão (a)–(h) de forma
+    vetorizada; se o schedule não couber em ScheduleMatrix (ex.: violações
+    de (a)), cai para o backend Python.
+
+    As checagens rodam na ordem da chave lexicográfica (hard, soft
+    estruturais, PRV). Com `cutoff=lex_key`, a avaliação para assim que a
+    chave parcial não pode mais ser estritamente melhor que `cutoff`: o
+    resultado volta com `pruned=True`, só as checagens já executadas,
+    PRV não calculado (0) e chave/custo como limites inferiores.
+
+    `n_teams` é o tamanho da liga: define as rodadas de (d), (e) e (f)
+    (ver `schedule_index.turno_length`). None = 20 times (R19/R38).
     """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend deve ser um de {BACKENDS}; recebido {backend!r}")
     w = {**DEFAULT_WEIGHTS, **(weights or {})}
 
-    prv_result = compute_prv(schedule, prv_days=prv_days)
+    matrix = to_matrix(schedule) if backend == "numpy" else None
+    vectorized: dict[str, list[ConstraintViolation]] = {}
+    prv_result: PRVResult | None = None
+    index: ScheduleIndex | None = None
+    if matrix is not None:
+        prv_result = matrix_prv(matrix, prv_days=prv_days)
+        vectorized = matrix_violations(
+            matrix, prv_days=prv_days, prv_result=prv_result, n_teams=n_teams
+        )
+    else:
+        index = _shared_index(schedule, n_teams)
+        schedule = index.schedule
 
-    hard: list[ConstraintViolation] = []
-    soft: list[ConstraintViolation] = []
-    violations_by_type: dict[str, int] = {}
+    by_type: dict[str, list[ConstraintViolation]] = {}
+    counts: dict[str, int] = {}
+    pruned = False
+    prv_done = False
 
-    for constraint_id, check_fn in CONSTRAINT_CHECKS:
-        if constraint_id == "h":
-            violations = check_fn(schedule, prv_days=prv_days)
+    for constraint_id, check_fn in _priority_order():
+        if not prv_done:
+            if cutoff is not None and _cannot_beat(counts, cutoff):
+                pruned = True
+                break
+            if constraint_id == "h":
+                if prv_result is None:
+                    index = index or _shared_index(schedule, n_teams)
+                    prv_result = compute_prv(index, prv_days=prv_days)
+                prv_done = True
+
+        if constraint_id in vectorized and is_builtin_check(constraint_id, check_fn):
+            violations = vectorized[constraint_id]
         else:
-            violations = check_fn(schedule)
+            index = index or _shared_index(schedule, n_teams)
+            arg = check_input(check_fn, schedule, index)
+            if constraint_id == "h":
+                violations = check_fn(arg, prv_days=prv_days)
+            else:
+                violations = check_fn(arg)
+        by_type[constraint_id] = violations
+        counts[constraint_id] = len(violations)
+
+    if not pruned and not prv_done:
+        # Registry sem (h): PRV ainda entra na chave e no custo.
+        if cutoff is not None and _cannot_beat(counts, cutoff):
+            pruned = True
+        elif prv_result is None:
+            prv_result = compute_prv(index or _shared_index(schedule, n_teams), prv_days=prv_days)
+    if pruned:
+        prv_result = _EMPTY_PRV
+    assert prv_result is not None
 
-        violations_by_type[constraint_id] = len(violations)
+    by_type = _in_registry_order(by_type)
+    violations_by_type = _in_registry_order(counts)
+    hard: list[ConstraintViolation] = []
+    soft: list[ConstraintViolation] = []
+    for constraint_id, violations in by_type.items():
         target = hard if constraint_id in HARD_CONSTRAINTS else soft
         target.extend(violations)
 
@@ -114,10 +248,11 @@ def evaluate(
     )
 
     logger.debug(
-        "evaluate: total_prv=%d violations=%s total_cost=%.2f",
+        "evaluate: total_prv=%d violations=%s total_cost=%.2f pruned=%s",
         prv_result.total_prv,
         violations_by_type,
         total_cost,
+        pruned,
     )
 
     return EvaluationResult(
@@ -127,9 +262,218 @@ def evaluate(
         hard_constraint_violations=hard,
         soft_constraint_violations=soft,
         violations_by_type=violations_by_type,
+        pruned=pruned,
     )
 
 
+def evaluate_counts(
+    schedule: ScheduleLike,
+    weights: dict[str, float] | None = None,
+    prv_days: int = 5,
+    *,
+    backend: str = "python",
+    cutoff: LexKey | None = None,
+    n_teams: int | None = None,
+) -> EvaluationCounts:
+    """
+    Versão só-contagens de `evaluate`: mesmos violations_by_type,
+    total_prv, total_cost e chave lexicográfica, sem construir
+    ConstraintViolation (descrições) nem PRVOccurrence.
+
+    Checagens extras do registry são contadas via len(check_fn(...)).
+    Use `evaluate` quando precisar dos detalhes (ex.: só para o incumbente).
+    `cutoff` e `n_teams` têm a mesma semântica de `evaluate`.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend deve ser um de {BACKENDS}; recebido {backend!r}")
+    w = {**DEFAULT_WEIGHTS, **(weights or {})}
+
+    matrix = to_matrix(schedule) if backend == "numpy" else None
+    vectorized: dict[str, int] = {}
+    total_prv: int | None = None
+    index: ScheduleIndex | None = None
+    if matrix is not None:
+        vectorized = matrix_counts(matrix, prv_days=prv_days, n_teams=n_teams)
+        total_prv = vectorized["h"]
+    else:
+        index = _shared_index(schedule, n_teams)
+        schedule = index.schedule
+
+    counts: dict[str, int] = {}
+    pruned = False
+    prv_done = False
+    for constraint_id, check_fn in _priority_order():
+        if not prv_done:
+            if cutoff is not None and _cannot_beat(counts, cutoff):
+                pruned = True
+                break
+            if constraint_id == "h":
+                if total_prv is None:
+                    total_prv = count_prv(index or _shared_index(schedule, n_teams), prv_days=prv_days)
+                prv_done = True
+        builtin = is_builtin_check(constraint_id, check_fn)
+        if builtin and constraint_id in vectorized:
+            count = vectorized[constraint_id]
+        elif builtin and constraint_id == "h":
+            count = total_prv
+        else:
+            index = index or _shared_index(schedule, n_teams)
+            if builtin:
+                count = BUILTIN_COUNTS[constraint_id](index)
+            elif constraint_id == "h":
+                count = len(check_fn(check_input(check_fn, schedule, index), prv_days=prv_days))
+            else:
+                count = len(check_fn(check_input(check_fn, schedule, index)))
+        counts[constraint_id] = count
+
+    if not pruned and not prv_done:
+        # Registry sem (h): PRV ainda entra na chave e no custo.
+        if cutoff is not None and _cannot_beat(counts, cutoff):
+            pruned = True
+        elif total_prv is None:
+            total_prv = count_prv(index or _shared_index(schedule, n_teams), prv_days=prv_days)
+    if pruned:
+        total_prv = 0
+    assert total_prv is not None
+
+    violations_by_type = _in_registry_order(counts)
+    total_cost = w["prv"] * total_prv + sum(
+        w.get(cid, 0.0) * count for cid, count in violations_by_type.items()
+    )
+    return EvaluationCounts(
+        total_cost=total_cost,
+        total_prv=total_prv,
+        violations_by_type=violations_by_type,
+        hard_constraints=tuple(sorted(HARD_CONSTRAINTS)),
+        pruned=pruned,
+    )
+
+
+def truncate_counts(
+    counts: EvaluationCounts,
+    cutoff: LexKey | None,
+    weights: dict[str, float] | None = None,
+) -> EvaluationCounts:
+    """
+    O que `evaluate_counts(schedule, weights, cutoff=cutoff)` devolveria,
+    a partir das contagens completas (`counts`, sem cutoff, mesmos pesos)
+    do mesmo schedule.
+
+    A poda depende só das contagens já feitas, na ordem de prioridade,
+    então dá para refazê-la sem o schedule: quem avaliou sem conhecer o
+    incumbente (ex.: um worker) reproduz aqui o resultado podado.
+    """
+    if cutoff is None:
+        return counts
+    if counts.pruned:
+        raise ValueError("truncate_counts exige contagens completas (pruned=False).")
+    w = {**DEFAULT_WEIGHTS, **(weights or {})}
+    partial: dict[str, int] = {}
+    pruned = False
+    prv_done = False
+    for constraint_id, _ in _priority_order():
+        if not prv_done:
+            if _cannot_beat(partial, cutoff):
+                pruned = True
+                break
+            if constraint_id == "h":
+                prv_done = True
+        partial[constraint_id] = counts.violations_by_type[constraint_id]
+    if not pruned and not prv_done:
+        pruned = _cannot_beat(partial, cutoff)
+    if not pruned:
+        return counts
+
+    # Mesma conta de evaluate_counts com o PRV podado (0).
+    total_prv = 0
+    violations_by_type = _in_registry_order(partial)
+    total_cost = w["prv"] * total_prv + sum(
+        w.get(cid, 0.0) * count for cid, count in violations_by_type.items()
+    )
+    return EvaluationCounts(
+        total_cost=total_cost,
+        total_prv=total_prv,
+        violations_by_type=violations_by_type,
+        hard_constraints=counts.hard_constraints,
+        pruned=True,
+    )
+
+
+# Campos da chave lexicográfica no array de evaluate_many, em ordem de
+# prioridade: np.argsort(keys, order=KEY_FIELDS) ranqueia a população.
+KEY_FIELDS: tuple[str, ...] = ("hard", "soft", "prv")
+
+
+def evaluate_many(
+    schedules: Sequence[ScheduleLike],
+    weights: dict[str, float] | None = None,
+    prv_days: int = 5,
+    *,
+    n_teams: int | None = None,
+) -> np.ndarray:
+    """
+    Avalia uma população de schedules de uma vez, sem montar K
+    EvaluationResult.
+
+    Retorna um array estruturado (K,) com os campos `hard`, `soft`, `prv`
+    (a chave lexicográfica — ver KEY_FIELDS), `total_cost` e uma contagem
+    por restrição do registry (`a`…`h`), idênticos aos de
+    `evaluate_counts` de cada schedule.
+
+    As checagens padrão rodam vetorizadas sobre a pilha (K, times,
+    rodadas) de `vectorized.stacked_counts`. Schedules que não cabem em
+    ScheduleMatrix e checagens extras do registry são avaliados um a um
+    pelo caminho Python. `n_teams` como em `evaluate`.
+    """
+    w = {**DEFAULT_WEIGHTS, **(weights or {})}
+    ids = [cid for cid, _ in CONSTRAINT_CHECKS]
+    keys = np.zeros(
+        len(schedules),
+        dtype=[(f, np.int32) for f in KEY_FIELDS]
+        + [("total_cost", np.float64)]
+        + [(cid, np.int32) for cid in ids],
+    )
+    if not len(schedules):
+        return keys
+
+    counts, stacked = stacked_counts(schedules, prv_days=prv_days, n_teams=n_teams)
+    keys["prv"] = counts["h"]
+    custom: list[tuple[str, Callable]] = []
+    for cid, check_fn in CONSTRAINT_CHECKS:
+        if is_builtin_check(cid, check_fn):
+            keys[cid] = counts[cid]
+        else:
+            custom.append((cid, check_fn))
+
+    for i in range(len(schedules)):
+        if not stacked[i]:
+            fallback = evaluate_counts(
+                schedules[i], weights=weights, prv_days=prv_days, n_teams=n_teams
+            )
+            keys["prv"][i] = fallback.total_prv
+            for cid, count in fallback.violations_by_type.items():
+                keys[cid][i] = count
+        elif custom:
+            index = _shared_index(schedules[i], n_teams)
+            for cid, check_fn in custom:
+                arg = check_input(check_fn, schedules[i], index)
+                if cid == "h":
+                    keys[cid][i] = len(check_fn(arg, prv_days=prv_days))
+                else:
+                    keys[cid][i] = len(check_fn(arg))
+
+    # Mesma ordem de soma de evaluate(): custos idênticos em ponto flutuante.
+    weighted = np.zeros(len(schedules), dtype=np.float64)
+    for cid in ids:
+        if cid in HARD_CONSTRAINTS:
+            keys["hard"] += keys[cid]
+        elif cid != "h":
+            keys["soft"] += keys[cid]
+        weighted = weighted + w.get(cid, 0.0) * keys[cid]
+    keys["total_cost"] = w["prv"] * keys["prv"] + weighted
+    return keys
+
+
 def add_prv_column(df: "pd.DataFrame", prv_days: int = 5) -> "pd.DataFrame":
     """DEPRECATED: use compute_prv(schedule)."""
     warnings.warn(
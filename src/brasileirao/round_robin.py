@@ -1,3 +1,4 @@
+import random
 from typing import List, Tuple
 
 Pair = Tuple[str, str]
@@ -22,4 +23,69 @@ def circle_method(teams: List[str]) -> List[List[Pair]]:
         # mantém o primeiro fixo e rotaciona o resto
         teams = [teams[0]] + [teams[-1]] + teams[1:-1]
 
-    return rounds
\ No newline at end of file
+    return rounds
+
+# Fatorações de K_n disponíveis para a construção.
+FACTORIZATIONS = ("circle", "starter")
+
+
+def _random_starter(m: int, rng: random.Random) -> List[Tuple[int, int]]:
+    """Starter de Z_m (m ímpar): pares que particionam 1..m-1 e cujas
+    diferenças ±(x - y) cobrem cada elemento não nulo uma vez.
+
+    Busca em profundidade com ordem aleatória. O circle method é o
+    starter {x, -x}; os outros costumam dar fatorações não perfeitas.
+    """
+    pairs: List[Tuple[int, int]] = []
+    free = set(range(1, m))
+    used: set[int] = set()
+
+    def search() -> bool:
+        if not free:
+            return True
+        x = min(free)
+        free.discard(x)
+        options = list(free)
+        rng.shuffle(options)
+        for y in options:
+            d = min((y - x) % m, (x - y) % m)
+            if d in used:
+                continue
+            free.discard(y)
+            used.add(d)
+            pairs.append((x, y))
+            if search():
+                return True
+            pairs.pop()
+            used.discard(d)
+            free.add(y)
+        free.add(x)
+        return False
+
+    search()
+    return pairs
+
+
+def starter_method(teams: List[str], seed: int = 0) -> List[List[Pair]]:
+    """1-fatoração de K_n a partir de um starter aleatório de Z_(n-1).
+
+    Mesmo formato de `circle_method` (BYE com nº ímpar de times). O
+    primeiro time é o ponto fixo ∞; a rodada k tem (∞, k) e os pares do
+    starter transladados de k. Com n - 1 primo o circle method dá a
+    fatoração perfeita GK_n, em que a união de duas rodadas é sempre um
+    único ciclo; um starter aleatório em geral tem ciclos menores.
+    """
+    teams = teams[:]
+    if len(teams) % 2 != 0:
+        teams.append("BYE")
+    n = len(teams)
+    m = n - 1
+    starter = _random_starter(m, random.Random(seed))
+    fixed, ring = teams[0], teams[1:]
+
+    rounds: List[List[Pair]] = []
+    for k in range(m):
+        pairs = [(fixed, ring[k])]
+        pairs += [(ring[(x + k) % m], ring[(y + k) % m]) for x, y in starter]
+        rounds.append([(a, b) for a, b in pairs if a != "BYE" and b != "BYE"])
+    return rounds
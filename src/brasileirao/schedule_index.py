@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Callable, Dict, FrozenSet, Iterable, List, Tuple, TypeVar, Union
+
+from .domain import PRVResult, Schedule, ScheduledMatch, ScheduleLike, as_schedule
+
+TURNO_FIRST = 1
+TURNO_LAST = 19  # liga de 20 times; ver turno_length
+
+
+def turno_length(n_teams: int | None = None) -> int:
+    """Rodadas por turno num duplo round-robin de `n_teams` times.
+
+    Com nº ímpar há um BYE por rodada (circle_method), então o turno tem
+    `n_teams` rodadas; com nº par, `n_teams - 1`. None = liga de 20 times.
+    """
+    if n_teams is None:
+        return TURNO_LAST
+    return n_teams if n_teams % 2 else n_teams - 1
+
+
+# Índices disponíveis. Cada um é preenchido na mesma passada sobre o schedule.
+INDEXES: FrozenSet[str] = frozenset(
+    {
+        "by_round",         # rodada -> partidas (ordem do schedule)
+        "sides_by_round",   # rodada -> {time: "home"|"away"} (última partida vence)
+        "by_team",          # time -> [(rodada, lado)] ordenado
+        "by_stadium",       # estádio -> partidas (ordem do schedule)
+        "pair_count",       # frozenset({A, B}) -> nº de jogos
+        "direction_count",  # (mandante, visitante) -> nº de jogos
+        "turno_balance",    # time -> jogos em casa / fora no turno
+    }
+)
+
+
+class ScheduleIndex:
+    """Agrupamentos do schedule compartilhados pelas checagens.
+
+    Os índices pedidos em `indexes` são montados juntos, numa única passada.
+    Um índice não pedido é montado sob demanda (outra passada, só para ele)
+    no primeiro acesso. Também memoriza `compute_prv` por `prv_days`.
+
+    `n_teams` fixa o tamanho da liga: o turno vai de R1 a `turno_last` e o
+    returno termina em `returno_last` (default: 20 times, R19/R38).
+    """
+
+    def __init__(
+        self,
+        schedule: ScheduleLike,
+        indexes: Iterable[str] = INDEXES,
+        *,
+        n_teams: int | None = None,
+    ) -> None:
+        self.schedule: Schedule = as_schedule(schedule)
+        self.turno_last = turno_length(n_teams)
+        self.returno_last = 2 * self.turno_last
+        self._built: set[str] = set()
+        self._prv: Dict[int, PRVResult] = {}
+        self._build(set(indexes))
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+
+    def _build(self, names: set[str]) -> None:
+        names = names - self._built
+        unknown = names - INDEXES
+        if unknown:
+            raise ValueError(f"Índices desconhecidos: {sorted(unknown)}")
+        if not names:
+            return
+
+        by_round = "by_round" in names
+        sides = "sides_by_round" in names
+        by_team = "by_team" in names
+        by_stadium = "by_stadium" in names
+        pairs = "pair_count" in names
+        directions = "direction_count" in names
+        turno = "turno_balance" in names
+
+        if by_round:
+            self._by_round: Dict[int, List[ScheduledMatch]] = defaultdict(list)
+        if sides:
+            self._sides: Dict[int, Dict[str, str]] = defaultdict(dict)
+        if by_team:
+            self._by_team: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+        if by_stadium:
+            self._by_stadium: Dict[str, List[ScheduledMatch]] = {}
+        if pairs:
+            self._pair_count: Dict[frozenset, int] = defaultdict(int)
+        if directions:
+            self._direction_count: Dict[Tuple[str, str], int] = defaultdict(int)
+        if turno:
+            self._turno_home: Dict[str, int] = defaultdict(int)
+            self._turno_away: Dict[str, int] = defaultdict(int)
+
+        for m in self.schedule:
+            if by_round:
+                self._by_round[m.round].append(m)
+            if sides:
+                side = self._sides[m.round]
+                side[m.home] = "home"
+                side[m.away] = "away"
+            if by_team:
+                self._by_team[m.home].append((m.round, "home"))
+                self._by_team[m.away].append((m.round, "away"))
+            if by_stadium:
+                self._by_stadium.setdefault(m.stadium, []).append(m)
+            if pairs:
+                self._pair_count[frozenset([m.home, m.away])] += 1
+            if directions:
+                self._direction_count[(m.home, m.away)] += 1
+            if turno and TURNO_FIRST <= m.round <= self.turno_last:
+                self._turno_home[m.home] += 1
+                self._turno_away[m.away] += 1
+
+        if by_team:
+            for entries in self._by_team.values():
+                entries.sort()
+        self._built |= names
+
+    def _require(self, name: str) -> None:
+        if name not in self._built:
+            self._build({name})
+
+    # ------------------------------------------------------------------
+    # Acesso
+    # ------------------------------------------------------------------
+
+    @property
+    def by_round(self) -> Dict[int, List[ScheduledMatch]]:
+        self._require("by_round")
+        return self._by_round
+
+    def sides(self, round_: int) -> Dict[str, str]:
+        """Mesma semântica de constraints._sides_in_round."""
+        self._require("sides_by_round")
+        return self._sides.get(round_, {})
+
+    @property
+    def by_team(self) -> Dict[str, List[Tuple[int, str]]]:
+        self._require("by_team")
+        return self._by_team
+
+    @property
+    def by_stadium(self) -> Dict[str, List[ScheduledMatch]]:
+        self._require("by_stadium")
+        return self._by_stadium
+
+    @property
+    def pair_count(self) -> Dict[frozenset, int]:
+        self._require("pair_count")
+        return self._pair_count
+
+    @property
+    def direction_count(self) -> Dict[Tuple[str, str], int]:
+        self._require("direction_count")
+        return self._direction_count
+
+    @property
+    def turno_balance(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """(jogos em casa, jogos fora) por time no turno (R1–R`turno_last`)."""
+        self._require("turno_balance")
+        return self._turno_home, self._turno_away
+
+    def cached_prv(self, prv_days: int, compute: Callable[[], PRVResult]) -> PRVResult:
+        result = self._prv.get(prv_days)
+        if result is None:
+            result = compute()
+            self._prv[prv_days] = result
+        return result
+
+
+_F = TypeVar("_F", bound=Callable)
+
+
+def requires(*names: str) -> Callable[[_F], _F]:
+    """Declara os índices que uma checagem lê.
+
+    Checagens decoradas recebem, em `evaluate`/`check_all`, um ScheduleIndex
+    compartilhado (montado uma vez com a união dos índices declarados) e
+    devem aceitar `ScheduleLike | ScheduleIndex` — ver `as_index`.
+    Checagens sem a declaração continuam recebendo o schedule.
+    """
+    unknown = set(names) - INDEXES
+    if unknown:
+        raise ValueError(f"Índices desconhecidos: {sorted(unknown)}")
+
+    def decorate(check: _F) -> _F:
+        check.requires = frozenset(names)  # type: ignore[attr-defined]
+        return check
+
+    return decorate
+
+
+def required_indexes(check: Callable) -> FrozenSet[str] | None:
+    """Índices declarados via @requires, ou None se a checagem não usa índice."""
+    return getattr(check, "requires", None)
+
+
+def as_index(
+    schedule: Union[ScheduleLike, ScheduleIndex],
+    *names: str,
+    n_teams: int | None = None,
+) -> ScheduleIndex:
+    """Reaproveita um ScheduleIndex recebido ou monta um só com `names`.
+
+    `n_teams` vale para o índice montado aqui; um índice recebido já traz o
+    tamanho da liga, e um `n_teams` diferente do dele é erro.
+    """
+    if isinstance(schedule, ScheduleIndex):
+        if n_teams is not None and turno_length(n_teams) != schedule.turno_last:
+            raise ValueError(
+                f"n_teams={n_teams} não confere com o índice "
+                f"(turno até R{schedule.turno_last})"
+            )
+        return schedule
+    return ScheduleIndex(schedule, names, n_teams=n_teams)
@@ -0,0 +1,398 @@
+"""Backend NumPy para as checagens (a)–(h) sobre ScheduleMatrix.
+
+As funções `_stacked_*` operam sobre arrays (K, n_times, n_rodadas): a
+dimensão K permite avaliar uma população inteira numa chamada. Os wrappers
+`matrix_*` cuidam do caso K=1.
+"""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+from .constraints import (
+    TURNO_FIRST,
+    _violation_b_direction,
+    _violation_b_pair,
+    _violation_c,
+    _violation_d,
+    _violation_e,
+    _violation_f,
+    _violation_g,
+    _violation_h,
+)
+from .domain import (
+    ConstraintViolation,
+    PRVOccurrence,
+    PRVResult,
+    ScheduledMatch,
+    ScheduleLike,
+    ScheduleMatrix,
+    as_schedule,
+    format_day,
+)
+from .schedule_index import turno_length
+
+VECTORIZED_IDS: tuple[str, ...] = ("a", "b", "c", "d", "e", "f", "g", "h")
+
+_SIDE = {1: "home", -1: "away"}
+
+
+def to_matrix(schedule: ScheduleLike) -> ScheduleMatrix | None:
+    """ScheduleMatrix equivalente, ou None se o schedule não couber nela
+    (ex.: violações de (a)). Nesse caso o chamador volta ao backend Python."""
+    if isinstance(schedule, ScheduleMatrix):
+        return schedule
+    try:
+        return ScheduleMatrix.from_schedule(schedule)
+    except ValueError:
+        return None
+
+
+def _ids(values: tuple[str, ...]) -> np.ndarray:
+    _, inverse = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return inverse.astype(np.int32)
+
+
+def _column(home: np.ndarray, r: int) -> np.ndarray:
+    """Coluna da rodada `r` (1-based); zeros se a rodada não existe."""
+    if 1 <= r <= home.shape[-1]:
+        return home[..., r - 1]
+    return np.zeros(home.shape[:-1], dtype=home.dtype)
+
+
+# ---------------------------------------------------------------------------
+# Núcleo vetorizado — retorna máscaras/índices, sem montar texto
+# ---------------------------------------------------------------------------
+
+def _b_counts(opponent: np.ndarray, home: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Contagens (K, n*n) por par não-ordenado (min, max) e por direção."""
+    k_count, n = home.shape[0], home.shape[1]
+    ks, hs, cs = np.nonzero(home == 1)
+    aw = opponent[ks, hs, cs].astype(np.int64)
+    base = ks.astype(np.int64) * n * n
+    direction = base + hs * n + aw
+    pair = base + np.minimum(hs, aw) * n + np.maximum(hs, aw)
+    size = k_count * n * n
+    dir_count = np.bincount(direction, minlength=size).reshape(k_count, n * n)
+    pair_count = np.bincount(pair, minlength=size).reshape(k_count, n * n)
+    return pair_count, dir_count
+
+
+def _c_mask(home: np.ndarray) -> np.ndarray:
+    s1 = _column(home, 1)
+    return (s1 != 0) & (_column(home, 2) == s1)
+
+
+def _d_masks(home: np.ndarray, turno_last: int) -> tuple[np.ndarray, np.ndarray]:
+    s1 = _column(home, 1)
+    s2 = _column(home, 2)
+    return (
+        (s1 != 0) & (_column(home, turno_last - 1) == s1),
+        (s2 != 0) & (_column(home, turno_last) == s2),
+    )
+
+
+def _e_mask(
+    opponent: np.ndarray, home: np.ndarray, state_id: np.ndarray, returno_last: int
+) -> np.ndarray:
+    last = _column(home, returno_last)
+    if returno_last > home.shape[-1]:
+        return np.zeros(last.shape, dtype=bool)
+    opp = np.maximum(opponent[..., returno_last - 1], 0).astype(np.intp)
+    return (last == 1) & (state_id == np.take_along_axis(state_id, opp, axis=-1))
+
+
+def _f_counts(home: np.ndarray, turno_last: int) -> tuple[np.ndarray, np.ndarray]:
+    turno = home[..., TURNO_FIRST - 1 : turno_last]
+    return (turno == 1).sum(axis=-1), (turno == -1).sum(axis=-1)
+
+
+def _g_sequences(home: np.ndarray) -> tuple[np.ndarray, np.ndarray | None]:
+    """Sequência de lados por time só com as rodadas jogadas (BYEs vão para
+    o fim como 0), mais o índice de rodada de cada posição quando há BYE."""
+    empty = home == 0
+    if not empty.any():
+        return home, None
+    idx = np.argsort(empty, axis=-1, kind="stable")
+    return np.take_along_axis(home, idx, axis=-1), idx
+
+
+def _g_hits(seq: np.ndarray, max_consecutive: int) -> np.ndarray:
+    """hit[..., j] = True quando a sequência que termina em j atinge
+    exatamente max_consecutive + 1 jogos — i.e., uma violação por run."""
+    k = max_consecutive
+    n_pos = seq.shape[-1]
+    if n_pos <= k:
+        return np.zeros(seq.shape[:-1] + (0,), dtype=bool)
+    cont = np.zeros(seq.shape, dtype=bool)
+    cont[..., 1:] = (seq[..., 1:] == seq[..., :-1]) & (seq[..., 1:] != 0)
+    cs = np.zeros(seq.shape[:-1] + (n_pos + 1,), dtype=np.int32)
+    np.cumsum(cont, axis=-1, out=cs[..., 1:])
+    window = cs[..., k + 1 : n_pos + 1] - cs[..., 1 : n_pos - k + 1]
+    return (window == k) & ~cont[..., : n_pos - k] & (seq[..., : n_pos - k] != 0)
+
+
+def _prv_pairs(
+    home: np.ndarray,
+    day: np.ndarray,
+    stadium_id: np.ndarray,
+    prv_days: int,
+) -> tuple[tuple[np.ndarray, np.ndarray, np.ndarray], np.ndarray, np.ndarray]:
+    """Jogos em casa ordenados por (k, estádio, data, rodada) e a máscara dos
+    pares consecutivos que formam PRV. Retorna ((ks, hs, cs), ordem, mask)."""
+    ks, hs, cs = np.nonzero(home == 1)
+    days = day[ks, hs, cs]
+    stadiums = stadium_id[ks, hs]
+    order = np.lexsort((cs, days, stadiums, ks))
+    ks_o, st_o, d_o = ks[order], stadiums[order], days[order]
+    same = (ks_o[1:] == ks_o[:-1]) & (st_o[1:] == st_o[:-1])
+    mask = same & (d_o[1:] - d_o[:-1] < prv_days)
+    return (ks, hs, cs), order, mask
+
+
+def _stacked_counts(
+    opponent: np.ndarray,
+    home: np.ndarray,
+    day: np.ndarray,
+    stadium_id: np.ndarray,
+    state_id: np.ndarray,
+    *,
+    prv_days: int = 5,
+    max_consecutive: int = 2,
+    n_teams: int | None = None,
+) -> dict[str, np.ndarray]:
+    """Contagem de violações (a)–(h) por schedule da pilha, shape (K,).
+
+    opponent/home/day têm shape (K, n_times, n_rodadas); stadium_id e
+    state_id, (K, n_times) — ids inteiros comparáveis entre as linhas.
+    `n_teams` é o tamanho da liga (rodadas de (d)/(e)/(f)), não o nº de
+    linhas da pilha."""
+    k_count = home.shape[0]
+    turno_last = turno_length(n_teams)
+
+    pair_count, dir_count = _b_counts(opponent, home)
+    b = (((pair_count != 0) & (pair_count != 2)).sum(axis=1)
+         + (dir_count > 1).sum(axis=1))
+
+    d_pen, d_last = _d_masks(home, turno_last)
+    h_turno, a_turno = _f_counts(home, turno_last)
+
+    seq, _ = _g_sequences(home)
+    g = _g_hits(seq, max_consecutive).sum(axis=(1, 2))
+
+    (ks, _, _), order, mask = _prv_pairs(home, day, stadium_id, prv_days)
+    h = np.bincount(ks[order][1:][mask], minlength=k_count)
+
+    return {
+        # ScheduleMatrix não representa um time duas vezes na mesma rodada.
+        "a": np.zeros(k_count, dtype=np.int64),
+        "b": b,
+        "c": _c_mask(home).sum(axis=1),
+        "d": d_pen.sum(axis=1) + d_last.sum(axis=1),
+        "e": _e_mask(opponent, home, state_id, 2 * turno_last).sum(axis=1),
+        "f": (np.abs(h_turno - a_turno) > 1).sum(axis=1),
+        "g": g,
+        "h": h,
+    }
+
+
+# ---------------------------------------------------------------------------
+# API para uma população de schedules
+# ---------------------------------------------------------------------------
+
+def stacked_counts(
+    schedules: Sequence[ScheduleLike],
+    prv_days: int = 5,
+    max_consecutive: int = 2,
+    n_teams: int | None = None,
+) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Contagens (a)–(h) de K schedules numa única chamada vetorizada.
+
+    Os schedules são empilhados em arrays (K, n_times, n_rodadas) com uma
+    ordem de times comum; rodadas/times ausentes num schedule viram BYE.
+    Retorna (contagens, shape (K,) por restrição; `stacked`, (K,) bool).
+    `stacked[i]` é False quando o schedule i não cabe em ScheduleMatrix
+    (ex.: violações de (a)); suas contagens ficam zeradas e o chamador
+    deve avaliá-lo pelo backend Python.
+    """
+    team_id: dict[str, int] = {}
+    for s in schedules:
+        names = s.teams if isinstance(s, ScheduleMatrix) else (
+            t for m in s for t in (m.home, m.away)
+        )
+        for t in names:
+            team_id.setdefault(t, len(team_id))
+    teams = tuple(team_id)
+
+    matrices: list[ScheduleMatrix | None] = []
+    for s in schedules:
+        if isinstance(s, ScheduleMatrix):
+            matrices.append(s)  # reindexada por permutação de linhas abaixo
+            continue
+        try:
+            matrices.append(ScheduleMatrix.from_schedule(as_schedule(s), teams=teams))
+        except ValueError:
+            matrices.append(None)
+
+    k_count, n = len(schedules), len(teams)
+    n_rounds = max((m.n_rounds for m in matrices if m is not None), default=0)
+    opponent = np.full((k_count, n, n_rounds), -1, dtype=np.int16)
+    home = np.zeros((k_count, n, n_rounds), dtype=np.int8)
+    day = np.zeros((k_count, n, n_rounds), dtype=np.int32)
+    stadium_id = np.zeros((k_count, n), dtype=np.int32)
+    state_id = np.zeros((k_count, n), dtype=np.int32)
+    stacked = np.zeros(k_count, dtype=bool)
+    stadium_vocab: dict[str, int] = {}
+    state_vocab: dict[str, int] = {}
+    for i, m in enumerate(matrices):
+        if m is None:
+            continue
+        stacked[i] = True
+        r = m.n_rounds
+        # rows[j] = linha na pilha do time j da matriz m.
+        rows = np.fromiter((team_id[t] for t in m.teams), dtype=np.intp, count=m.n_teams)
+        opp = m.opponent
+        opponent[i, rows, :r] = np.where(opp >= 0, rows[np.maximum(opp, 0)], -1)
+        home[i, rows, :r] = m.home
+        day[i, rows, :r] = m.day
+        stadium_id[i, rows] = [stadium_vocab.setdefault(x, len(stadium_vocab)) for x in m.stadiums]
+        state_id[i, rows] = [state_vocab.setdefault(x, len(state_vocab)) for x in m.states]
+
+    counts = _stacked_counts(
+        opponent, home, day, stadium_id, state_id,
+        prv_days=prv_days, max_consecutive=max_consecutive, n_teams=n_teams,
+    )
+    return counts, stacked
+
+
+# ---------------------------------------------------------------------------
+# API para um único ScheduleMatrix
+# ---------------------------------------------------------------------------
+
+def matrix_counts(
+    m: ScheduleMatrix,
+    prv_days: int = 5,
+    max_consecutive: int = 2,
+    n_teams: int | None = None,
+) -> dict[str, int]:
+    """Contagens (a)–(h) de um ScheduleMatrix, sem montar violações."""
+    counts = _stacked_counts(
+        m.opponent[None],
+        m.home[None],
+        m.day[None],
+        _ids(m.stadiums)[None],
+        _ids(m.states)[None],
+        prv_days=prv_days,
+        max_consecutive=max_consecutive,
+        n_teams=n_teams,
+    )
+    return {cid: int(v[0]) for cid, v in counts.items()}
+
+
+def _match_at(m: ScheduleMatrix, h: int, c: int) -> ScheduledMatch:
+    a = int(m.opponent[h, c])
+    return ScheduledMatch(
+        round=c + 1,
+        day=format_day(int(m.day[h, c])),
+        home=m.teams[h],
+        away=m.teams[a],
+        stadium=m.stadiums[h],
+        home_state=m.states[h],
+        away_state=m.states[a],
+    )
+
+
+def matrix_prv(m: ScheduleMatrix, prv_days: int = 5) -> PRVResult:
+    """Equivalente vetorizado de `objective.compute_prv`."""
+    (_, hs, cs), order, mask = _prv_pairs(
+        m.home[None], m.day[None], _ids(m.stadiums)[None], prv_days
+    )
+    hs_o, cs_o = hs[order], cs[order]
+    occurrences: list[PRVOccurrence] = []
+    prv_by_stadium: dict[str, int] = {}
+    for j in np.nonzero(mask)[0]:
+        ea = _match_at(m, int(hs_o[j]), int(cs_o[j]))
+        eb = _match_at(m, int(hs_o[j + 1]), int(cs_o[j + 1]))
+        occurrences.append(
+            PRVOccurrence(
+                stadium=ea.stadium,
+                match_a=ea,
+                match_b=eb,
+                days_between=int(m.day[hs_o[j + 1], cs_o[j + 1]] - m.day[hs_o[j], cs_o[j]]),
+            )
+        )
+        prv_by_stadium[ea.stadium] = prv_by_stadium.get(ea.stadium, 0) + 1
+    return PRVResult(
+        total_prv=len(occurrences),
+        occurrences=occurrences,
+        prv_by_stadium=prv_by_stadium,
+    )
+
+
+def matrix_violations(
+    m: ScheduleMatrix,
+    prv_days: int = 5,
+    max_consecutive: int = 2,
+    prv_result: PRVResult | None = None,
+    n_teams: int | None = None,
+) -> dict[str, list[ConstraintViolation]]:
+    """Violações (a)–(h) detalhadas, agrupadas por restrição.
+
+    A detecção é vetorizada; só as células violadas viram objetos."""
+    turno_last = turno_length(n_teams)
+    returno_last = 2 * turno_last
+    teams = m.teams
+    n = m.n_teams
+    home = m.home[None]
+    out: dict[str, list[ConstraintViolation]] = {cid: [] for cid in VECTORIZED_IDS}
+
+    pair_count, dir_count = _b_counts(m.opponent[None], home)
+    for p in np.nonzero((pair_count[0] != 0) & (pair_count[0] != 2))[0]:
+        a, b = divmod(int(p), n)
+        out["b"].append(_violation_b_pair(teams[a], teams[b], int(pair_count[0, p])))
+    for p in np.nonzero(dir_count[0] > 1)[0]:
+        h, a = divmod(int(p), n)
+        out["b"].append(_violation_b_direction(teams[h], teams[a], int(dir_count[0, p])))
+
+    s1 = _column(m.home, 1)
+    s2 = _column(m.home, 2)
+    for t in np.nonzero(_c_mask(home)[0])[0]:
+        side = _SIDE[int(s1[t])]
+        out["c"].append(_violation_c(teams[t], side, side))
+
+    d_pen, d_last = _d_masks(home, turno_last)
+    for t in np.nonzero(d_pen[0])[0]:
+        side = _SIDE[int(s1[t])]
+        out["d"].append(_violation_d(teams[t], turno_last - 1, side, 1, side))
+    for t in np.nonzero(d_last[0])[0]:
+        side = _SIDE[int(s2[t])]
+        out["d"].append(_violation_d(teams[t], turno_last, side, 2, side))
+
+    e_mask = _e_mask(m.opponent[None], home, _ids(m.states)[None], returno_last)
+    for t in np.nonzero(e_mask[0])[0]:
+        a = int(m.opponent[t, returno_last - 1])
+        out["e"].append(
+            _violation_e(teams[t], m.states[t], teams[a], m.states[a], returno_last)
+        )
+
+    h_turno, a_turno = _f_counts(home, turno_last)
+    for t in np.nonzero(np.abs(h_turno[0] - a_turno[0]) > 1)[0]:
+        out["f"].append(_violation_f(teams[t], int(h_turno[0, t]), int(a_turno[0, t])))
+
+    seq, idx = _g_sequences(home)
+    for _, t, j in zip(*np.nonzero(_g_hits(seq, max_consecutive))):
+        row = seq[0, t]
+        start = int(j)
+        end = start + max_consecutive + 1
+        while end < row.shape[0] and row[end] == row[start]:
+            end += 1
+        start_round = int(idx[0, t, start]) + 1 if idx is not None else start + 1
+        out["g"].append(
+            _violation_g(teams[t], end - start, _SIDE[int(row[start])], start_round)
+        )
+
+    if prv_result is None:
+        prv_result = matrix_prv(m, prv_days=prv_days)
+    out["h"] = [_violation_h(occ) for occ in prv_result.occurrences]
+    return out
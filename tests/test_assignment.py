@@ -0,0 +1,31 @@
+"""Testes para a atribuição de custo mínimo (método húngaro)."""
+from __future__ import annotations
+
+import random
+from itertools import permutations
+
+import pytest
+
+from brasileirao.assignment import min_cost_assignment
+
+
+def _brute_force(cost: list[list[int]]) -> int:
+    n, m = len(cost), len(cost[0])
+    return min(sum(cost[i][j] for i, j in enumerate(p)) for p in permutations(range(m), n))
+
+
+def test_matches_brute_force() -> None:
+    rng = random.Random(0)
+    for _ in range(200):
+        n = rng.randint(1, 5)
+        m = rng.randint(n, 6)
+        cost = [[rng.randint(0, 9) for _ in range(m)] for _ in range(n)]
+        cols = min_cost_assignment(cost)
+        assert len(set(cols)) == n
+        assert sum(cost[i][j] for i, j in enumerate(cols)) == _brute_force(cost)
+
+
+def test_empty_and_too_many_rows() -> None:
+    assert min_cost_assignment([]) == []
+    with pytest.raises(ValueError):
+        min_cost_assignment([[1], [2]])
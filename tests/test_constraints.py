@@ -268,3 +268,63 @@ def test_check_all_clean():
 def test_registry_has_all_eight_checks():
     ids = [cid for cid, _ in CONSTRAINT_CHECKS]
     assert ids == ["a", "b", "c", "d", "e", "f", "g", "h"]
+
+
+# ----------------------------------------------------------------------
+# Ligas de outro tamanho (n_teams)
+# ----------------------------------------------------------------------
+
+def test_league_size_moves_d_e_f_rounds():
+    # 16 times: turno R1–R15, espelho em R14/R15, última rodada R30.
+    schedule = [
+        _m(1, "01/06/2024", "A", "B", "S"),
+        _m(14, "01/09/2024", "A", "C", "S"),  # (d) para 16 times
+        _m(15, "08/09/2024", "D", "E", "S"),
+        _m(16, "15/09/2024", "A", "D", "S"),  # returno: fora de (f)
+        _m(30, "01/12/2024", "F", "G", "S", home_state="MG", away_state="MG"),
+    ]
+    by_id: dict[str, list] = {}
+    for v in check_all(schedule, n_teams=16):
+        by_id.setdefault(v.constraint_id, []).append(v)
+    assert [(v.team, v.round) for v in by_id["d"]] == [("A", 14)]
+    assert [v.round for v in by_id["e"]] == [30]
+    assert [v.team for v in by_id["f"]] == ["A"]  # 2 casa, 0 fora
+    # Com o default (20 times) nenhuma dessas rodadas é R18/R19/R38.
+    assert {v.constraint_id for v in check_all(schedule)} & {"d", "e"} == set()
+
+
+def test_odd_league_turno_includes_bye_round():
+    # 5 times: BYE por rodada, turno com 5 rodadas e returno até R10.
+    schedule = [
+        _m(1, "01/06/2024", "A", "B", "S"),
+        _m(2, "08/06/2024", "C", "A", "S"),
+        _m(5, "01/07/2024", "E", "A", "S"),  # R(T) = R5: espelho de R2
+        _m(10, "01/09/2024", "D", "E", "S", home_state="RJ", away_state="RJ"),
+    ]
+    ids = [v.constraint_id for v in check_all(schedule, n_teams=5)]
+    assert ids.count("d") == 1  # A fora em R2 e R5
+    assert ids.count("e") == 1
+
+
+def test_direct_checks_take_league_size():
+    # 8 times: turno R1–R7, espelho em R6/R7, última rodada R14.
+    schedule = [
+        _m(1, "01/06/2024", "A", "B", "S"),
+        _m(2, "08/06/2024", "C", "A", "S"),
+        _m(6, "01/07/2024", "A", "D", "S"),  # R(T-1): A em casa, como em R1
+        _m(7, "08/07/2024", "E", "A", "S"),  # RT: A fora, como em R2
+        _m(9, "15/07/2024", "A", "C", "S"),  # returno com 8 times
+        _m(10, "22/07/2024", "A", "E", "S"),
+        _m(14, "01/09/2024", "F", "G", "S", home_state="SP", away_state="SP"),
+    ]
+    d = check_d_last_two_rounds_mirror(schedule, n_teams=8)
+    assert sorted((v.team, v.round) for v in d) == [("A", 6), ("A", 7)]
+    assert [v.round for v in check_e_last_round_no_same_state(schedule, n_teams=8)] == [14]
+    assert check_f_home_away_balance_per_turno(schedule, n_teams=8) == []  # 2 × 2
+    # Sem n_teams as checagens diretas assumem 20 times (turno até R19).
+    assert check_d_last_two_rounds_mirror(schedule) == []
+    assert check_e_last_round_no_same_state(schedule) == []
+    assert [v.team for v in check_f_home_away_balance_per_turno(schedule)] == ["A"]
+    # Mesmo resultado que check_all com o mesmo tamanho de liga.
+    by_all = [v for v in check_all(schedule, n_teams=8) if v.constraint_id == "d"]
+    assert by_all == d
@@ -1,11 +1,30 @@
 """Testes para atribuição de datas (Parte 2 da construção)."""
 from __future__ import annotations
 
+import random
 from datetime import date, datetime, timedelta
+from itertools import product
+from math import ceil
 
-from brasileirao.construction import construct_schedule
-from brasileirao.domain import Team, TeamMap
-from brasileirao.objective import compute_prv
+import pytest
+
+from brasileirao.construction import (
+    ConstructionContext,
+    DateAssignmentFailedError,
+    _assign_round_min_cost,
+    _check_rest,
+    _close_pairs,
+    _round_prv_count,
+    _stadium_prv_local,
+    assign_dates_to_matches,
+    build_matches_with_homes,
+    construct_schedule,
+    provisional_schedule,
+)
+from brasileirao.domain import Match, Team, TeamMap
+from brasileirao.io import load_teams
+from brasileirao.objective import compute_prv, evaluate_counts
+from brasileirao.schedule_index import turno_length
 
 
 def _make_teams() -> TeamMap:
@@ -123,3 +142,166 @@ def test_prv_calculable() -> None:
     schedule = construct_schedule(_make_teams(), _make_dates(), seed=42)
     result = compute_prv(schedule)
     assert result.total_prv >= 0
+
+
+# ---------------------------------------------------------------------------
+# 7. Ligas de outro tamanho
+# ---------------------------------------------------------------------------
+
+def _league(n: int) -> TeamMap:
+    states = ["SP", "RJ", "MG", "PR", "RS", "BA", "CE", "PE", "SC", "GO", "MT"]
+    return {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i:02d}", state=states[i % 11])
+        for i in range(n)
+    }
+
+
+def test_other_league_sizes() -> None:
+    for n in (16, 21):
+        teams = _league(n)
+        n_rounds = 2 * turno_length(n)
+        schedule = construct_schedule(teams, _make_dates(n_rounds * 7), seed=3)
+        assert len(schedule) == n * (n - 1)
+        assert {sm.round for sm in schedule} == set(range(1, n_rounds + 1))
+        for r in range(1, n_rounds + 1):
+            assert sum(1 for sm in schedule if sm.round == r) == n // 2
+        counts = evaluate_counts(schedule, n_teams=n).violations_by_type
+        assert counts["a"] == counts["b"] == 0
+
+
+def test_too_few_dates_raises() -> None:
+    with pytest.raises(DateAssignmentFailedError):
+        construct_schedule(_make_teams(), _make_dates(100), seed=42)
+
+
+# ---------------------------------------------------------------------------
+# 8. Contexto da instância reaproveitado entre seeds
+# ---------------------------------------------------------------------------
+
+def test_context_reuse_gives_same_schedules() -> None:
+    teams = _make_teams()
+    dates = _make_dates()
+    context = ConstructionContext(teams, dates)
+    for seed in range(4):
+        for alpha in (0.0, 0.5):
+            assert construct_schedule(
+                teams, dates, seed=seed, alpha=alpha, context=context
+            ) == construct_schedule(teams, dates, seed=seed, alpha=alpha)
+
+
+def test_context_for_other_instance_rejected() -> None:
+    teams = _make_teams()
+    dates = _make_dates()
+    context = ConstructionContext(teams, dates)
+    with pytest.raises(ValueError):
+        construct_schedule(teams, dates[1:], seed=1, context=context)
+    with pytest.raises(ValueError):
+        construct_schedule(teams, dates, seed=1, round_gap=6, context=context)
+    with pytest.raises(ValueError):
+        construct_schedule(_league(20), dates, seed=1, context=context)
+
+
+# ---------------------------------------------------------------------------
+# 9. Delta de PRV por estádio
+# ---------------------------------------------------------------------------
+
+def test_stadium_prv_local_matches_full_recount() -> None:
+    rng = random.Random(0)
+    stadium_of = {f"T{i}": f"E{i % 3}" for i in range(6)}
+    day0 = date(2024, 1, 1)
+    for _ in range(300):
+        prev = {
+            s: sorted(day0 + timedelta(days=rng.randrange(40)) for _ in range(rng.randrange(6)))
+            for s in ("E0", "E1", "E2")
+        }
+        atribuicao = [
+            (Match(f"T{i}", "X"), day0 + timedelta(days=rng.randrange(30, 45)))
+            for i in range(6)
+        ]
+        full = _round_prv_count(atribuicao, prev, stadium_of, 5)
+        by_stadium: dict[str, list[date]] = {}
+        for match, d in atribuicao:
+            by_stadium.setdefault(stadium_of[match.home], []).append(d)
+        local = sum(
+            _close_pairs(prev[s], 5) + _stadium_prv_local(prev[s], ds, 5)
+            for s, ds in by_stadium.items()
+        )
+        assert local == full
+
+
+# ---------------------------------------------------------------------------
+# 10. date_strategy="assignment"
+# ---------------------------------------------------------------------------
+
+def test_min_cost_round_is_optimal() -> None:
+    rng = random.Random(1)
+    stadium_of = {f"T{i}": f"E{i % 4}" for i in range(14)}
+    day0 = date(2024, 1, 1)
+    for _ in range(60):
+        window = [day0 + timedelta(days=30 + k) for k in range(rng.randint(2, 4))]
+        prev = {
+            f"E{s}": sorted(day0 + timedelta(days=rng.randrange(20, 30)) for _ in range(rng.randrange(3)))
+            for s in range(4)
+        }
+        last_play = {f"T{i}": day0 + timedelta(days=rng.randrange(25, 30)) for i in range(14)}
+        matches = [Match(f"T{2 * i}", f"T{2 * i + 1}") for i in range(rng.randint(3, 7))]
+        cap = ceil(len(matches) / len(window))
+
+        best = None
+        for ks in product(range(len(window)), repeat=len(matches)):
+            if any(ks.count(k) > cap for k in range(len(window))):
+                continue
+            if not all(_check_rest(m, window[k], last_play, 3) for m, k in zip(matches, ks)):
+                continue
+            atribuicao = [(m, window[k]) for m, k in zip(matches, ks)]
+            prv = _round_prv_count(atribuicao, prev, stadium_of, 5)
+            best = prv if best is None else min(best, prv)
+
+        result = _assign_round_min_cost(matches, window, prev, stadium_of, 5, last_play, 3)
+        if best is None:
+            continue  # sem atribuição balanceada: cai para capacidade livre
+        assert result is not None
+        assert [m for m, _ in result] == matches
+        assert all(_check_rest(m, d, last_play, 3) for m, d in result)
+        assert max(sum(1 for _, d in result if d == w) for w in window) <= cap
+        assert _round_prv_count(result, prev, stadium_of, 5) == best
+
+
+def test_assignment_strategy_on_real_teams() -> None:
+    teams = load_teams("data/raw/teams.csv")
+    dates = _make_dates()
+    matches_by_round = build_matches_with_homes(teams, seed=5)
+    for span in (3, 6):
+        greedy = assign_dates_to_matches(matches_by_round, dates, teams, round_span=span)
+        exact = assign_dates_to_matches(
+            matches_by_round, dates, teams, round_span=span, date_strategy="assignment"
+        )
+        assert [(m.round, m.home, m.away) for m in exact] == [
+            (m.round, m.home, m.away) for m in greedy
+        ]
+        last: dict[str, date] = {}
+        for sm in exact:
+            d = datetime.strptime(sm.day, "%d/%m/%Y").date()
+            for team in (sm.home, sm.away):
+                assert team not in last or (d - last[team]).days >= 3
+                last[team] = d
+        assert compute_prv(exact).total_prv <= compute_prv(greedy).total_prv
+
+
+def test_unknown_date_strategy_rejected() -> None:
+    with pytest.raises(ValueError):
+        construct_schedule(_make_teams(), _make_dates(), date_strategy="hungarian")
+
+
+def test_provisional_schedule_has_structural_counts() -> None:
+    teams = _make_teams()
+    dates = _make_dates()
+    context = ConstructionContext(teams, dates)
+    matches_by_round = build_matches_with_homes(teams, seed=8, context=context)
+    provisional = evaluate_counts(provisional_schedule(matches_by_round, context))
+    dated = evaluate_counts(assign_dates_to_matches(matches_by_round, dates, teams))
+    for cid, count in dated.violations_by_type.items():
+        if cid != "h":
+            assert provisional.violations_by_type[cid] == count
+    with pytest.raises(ValueError):
+        provisional_schedule(matches_by_round, ConstructionContext(teams))
@@ -7,9 +7,23 @@ que refina.
 """
 from __future__ import annotations
 
+import random
 from collections import Counter
 
-from brasileirao.construction import build_matches_with_homes
+import pytest
+
+from brasileirao.construction import (
+    CONSTRUCTION_WEIGHTS,
+    _best_orientation_for_round,
+    _pair_terms,
+    _rcl_pick_convolution,
+    _rcl_pick_enumerate,
+    _rcl_pick_numpy,
+    ConstructionContext,
+    ConstructionFailedError,
+    build_matches_with_homes,
+)
+from brasileirao.round_robin import circle_method
 from brasileirao.domain import Match, Team, TeamMap
 
 
@@ -221,3 +235,167 @@ def test_alpha_one_is_more_random():
         for s in (11, 12, 13, 14, 15)
     }
     assert len(outs) == 5
+
+
+# ---------------------------------------------------------------------------
+# 13. orientação separável de R18/R19 == enumeração das 2^10 máscaras
+# ---------------------------------------------------------------------------
+
+def _enumerate_best_orientation(pairs, team_to_idx, target, in_last, in_streak, max_cons):
+    """Referência: varre todas as máscaras e fica com a primeira de menor custo."""
+    best = None
+    for mask in range(1 << len(pairs)):
+        last = list(in_last)
+        streak = list(in_streak)
+        cost = 0
+        oriented = []
+        for k, (a, b) in enumerate(pairs):
+            h, v = (a, b) if (mask >> k) & 1 else (b, a)
+            oriented.append((h, v))
+            for t, side in ((team_to_idx[h], 1), (team_to_idx[v], 2)):
+                if target[t] != side:
+                    cost += 10
+                if last[t] == side:
+                    streak[t] += 1
+                    if streak[t] > max_cons:
+                        cost += 1000
+                else:
+                    last[t] = side
+                    streak[t] = 1
+        if best is None or cost < best[0]:
+            best = (cost, oriented, last, streak)
+    return best
+
+
+def test_separable_orientation_matches_enumeration():
+    teams = list(_make_teams())
+    team_to_idx = {t: i for i, t in enumerate(teams)}
+    rng = random.Random(0)
+    for pairs in circle_method(teams):
+        for _ in range(20):
+            target = [rng.choice((1, 2)) for _ in teams]
+            last = [rng.choice((0, 1, 2)) for _ in teams]
+            streak = [rng.randint(0, 3) if s else 0 for s in last]
+            oriented, _, new_last, new_streak, cost = _best_orientation_for_round(
+                pairs, team_to_idx, target, last, streak, 2,
+            )
+            ref = _enumerate_best_orientation(pairs, team_to_idx, target, last, streak, 2)
+            assert (cost, oriented, new_last, new_streak) == ref
+
+
+# ---------------------------------------------------------------------------
+# 14. RCL por convolução == RCL enumerada
+# ---------------------------------------------------------------------------
+
+class _FixedChoice:
+    """RNG falso: `choice` devolve sempre o i-ésimo elemento."""
+
+    def __init__(self, i: int) -> None:
+        self.i = i
+        self.seq = None
+
+    def choice(self, seq):
+        self.seq = seq
+        return seq[self.i]
+
+
+def test_convolution_rcl_maps_every_index_like_enumeration():
+    teams = list(_make_teams())
+    team_to_idx = {t: i for i, t in enumerate(teams)}
+    matchings = [
+        [(team_to_idx[a], team_to_idx[b]) for a, b in m]
+        for m in circle_method(teams)
+    ]
+    rng = random.Random(3)
+    for trial in range(6):
+        last = [rng.choice((1, 2)) for _ in teams]
+        streak = [rng.randint(1, 3) for _ in teams]
+        uh = [rng.randint(0, 1) for _ in teams]
+        ua = [rng.randint(0, 1) for _ in teams]
+        remaining = rng.sample(matchings, 3)
+        terms = [_pair_terms(m, last, streak, 2, uh, ua) for m in remaining]
+        args = (terms, [sum(ua)] * len(terms), (0.0, 0.3, 1.0)[trial % 3],
+                CONSTRUCTION_WEIGHTS["f"], CONSTRUCTION_WEIGHTS["g"])
+
+        probe = _FixedChoice(0)
+        _rcl_pick_enumerate(*args, probe)
+        rcl = [c[:2] for c in probe.seq]
+        for i in range(len(rcl)):
+            for pick in (_rcl_pick_convolution, _rcl_pick_numpy):
+                got = _FixedChoice(i)
+                assert pick(*args, got) == rcl[i]
+                assert len(got.seq) == len(rcl)
+
+
+def test_construction_backends_produce_same_schedule():
+    teams = _make_teams()
+    for seed in range(5):
+        for alpha in (0.0, 0.3, 1.0):
+            ref = build_matches_with_homes(teams, alpha=alpha, seed=seed, backend="enumerate")
+            for backend in ("convolution", "numpy"):
+                got = build_matches_with_homes(teams, alpha=alpha, seed=seed, backend=backend)
+                assert _serialize(got) == _serialize(ref)
+
+
+def test_unknown_construction_backend_rejected():
+    with pytest.raises(ValueError):
+        build_matches_with_homes(_make_teams(), backend="gpu")
+
+
+# ---------------------------------------------------------------------------
+# 15. ligas de outro tamanho
+# ---------------------------------------------------------------------------
+
+def _league(n: int) -> TeamMap:
+    states = ["SP", "RJ", "MG", "PR", "RS", "BA", "CE", "PE", "SC", "GO", "MT"]
+    return {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i:02d}", state=states[i % 11])
+        for i in range(n)
+    }
+
+
+@pytest.mark.parametrize("n", [5, 16, 21, 24])
+def test_other_league_sizes_are_double_round_robins(n):
+    m = build_matches_with_homes(_league(n), seed=7)
+    n_rounds = n if n % 2 else n - 1
+    assert sorted(m) == list(range(1, 2 * n_rounds + 1))
+    for r in range(1, 2 * n_rounds + 1):
+        teams_r = [t for mm in m[r] for t in (mm.home, mm.away)]
+        assert len(m[r]) == n // 2  # com n ímpar, um time folga
+        assert len(set(teams_r)) == len(teams_r)
+    directions = Counter((mm.home, mm.away) for r in m for mm in m[r])
+    assert len(directions) == n * (n - 1)
+    assert set(directions.values()) == {1}
+
+
+def test_other_league_sizes_backends_agree():
+    for n in (16, 21):
+        teams = _league(n)
+        ref = build_matches_with_homes(teams, seed=5, backend="enumerate")
+        for backend in ("convolution", "numpy"):
+            assert _serialize(build_matches_with_homes(teams, seed=5, backend=backend)) == _serialize(ref)
+
+
+def test_league_size_limits():
+    with pytest.raises(ConstructionFailedError):
+        build_matches_with_homes(_league(4))
+    with pytest.raises(ValueError):
+        build_matches_with_homes(_league(26), backend="numpy")
+    assert len(build_matches_with_homes(_league(26))) == 50
+
+
+@pytest.mark.parametrize("n", [5, 20, 21])
+def test_starter_factorization_builds_double_round_robin(n):
+    teams = _league(n)
+    context = ConstructionContext(teams, factorization="starter", factorization_seed=3)
+    m = build_matches_with_homes(teams, seed=7, context=context)
+    n_rounds = n if n % 2 else n - 1
+    assert sorted(m) == list(range(1, 2 * n_rounds + 1))
+    for r in range(1, 2 * n_rounds + 1):
+        teams_r = [t for mm in m[r] for t in (mm.home, mm.away)]
+        assert len(set(teams_r)) == len(teams_r) == 2 * (n // 2)
+    directions = Counter((mm.home, mm.away) for r in m for mm in m[r])
+    assert len(directions) == n * (n - 1)
+    assert set(directions.values()) == {1}
+    with pytest.raises(ValueError):
+        ConstructionContext(teams, factorization="polygon")
@@ -0,0 +1,142 @@
+"""Testes para a avaliação incremental (DeltaEvaluator)."""
+from __future__ import annotations
+
+import random
+from dataclasses import replace
+from datetime import date, timedelta
+
+from brasileirao.construction import construct_schedule
+from brasileirao.delta import DeltaEvaluator
+from brasileirao.domain import ScheduledMatch, Team, TeamMap
+from brasileirao.objective import evaluate
+
+
+def _make_teams() -> TeamMap:
+    states = [
+        "SP", "RJ", "SP", "SP", "RJ", "RJ",
+        "MG", "MG", "PR", "PR",
+        "RS", "RS", "BA", "BA", "CE",
+        "CE", "PE", "MT", "SC", "GO",
+    ]
+    teams = {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i:02d}", state=states[i])
+        for i in range(20)
+    }
+    # Estádio compartilhado para exercitar PRV entre mandantes distintos.
+    teams["T01"] = Team(name="T01", stadium="E00", state="RJ")
+    return teams
+
+
+def _make_dates(n: int = 300) -> list[date]:
+    start = date(2023, 8, 20)
+    return [start + timedelta(days=i) for i in range(n)]
+
+
+def _assert_matches_evaluate(ev: DeltaEvaluator) -> None:
+    full = evaluate(ev.schedule, weights=ev.weights, prv_days=ev.prv_days)
+    assert ev.violations_by_type == full.violations_by_type
+    assert ev.lexicographic_key() == full.lexicographic_key()
+    assert ev.total_cost == full.total_cost
+
+
+def _random_move(
+    schedule: list[ScheduledMatch],
+    teams: TeamMap,
+    rng: random.Random,
+) -> list[tuple[int, ScheduledMatch]]:
+    kind = rng.randrange(3)
+    i = rng.randrange(len(schedule))
+    m = schedule[i]
+    if kind == 0:
+        # Inverte mando (muda estádio e estados).
+        new = replace(
+            m,
+            home=m.away,
+            away=m.home,
+            stadium=teams[m.away].stadium,
+            home_state=teams[m.away].state,
+            away_state=teams[m.home].state,
+        )
+        return [(i, new)]
+    j = rng.randrange(len(schedule))
+    while j == i:
+        j = rng.randrange(len(schedule))
+    n = schedule[j]
+    if kind == 1:
+        # Troca as datas de duas partidas quaisquer.
+        return [(i, replace(m, day=n.day)), (j, replace(n, day=m.day))]
+    # Troca as rodadas de duas partidas (pode quebrar (a)/(b)).
+    return [(i, replace(m, round=n.round)), (j, replace(n, round=m.round))]
+
+
+def test_seed_matches_evaluate() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=7)
+    _assert_matches_evaluate(DeltaEvaluator(schedule))
+
+
+def test_random_moves_match_evaluate() -> None:
+    teams = _make_teams()
+    schedule = construct_schedule(teams, _make_dates(), seed=3)
+    ev = DeltaEvaluator(schedule, prv_days=6)
+    rng = random.Random(0)
+    for _ in range(150):
+        ev.apply(_random_move(ev.schedule, teams, rng))
+        _assert_matches_evaluate(ev)
+
+
+def test_delta_does_not_mutate_and_matches_apply() -> None:
+    teams = _make_teams()
+    schedule = construct_schedule(teams, _make_dates(), seed=11)
+    ev = DeltaEvaluator(schedule)
+    rng = random.Random(1)
+    for _ in range(50):
+        move = _random_move(ev.schedule, teams, rng)
+        key_before = ev.lexicographic_key()
+        cost_before = ev.total_cost
+        d_key, d_cost = ev.delta(move)
+        assert ev.lexicographic_key() == key_before
+        assert ev.schedule == schedule
+        inverse = ev.apply(move)
+        assert ev.lexicographic_key() == tuple(
+            b + d for b, d in zip(key_before, d_key)
+        )
+        assert ev.total_cost - cost_before == d_cost
+        ev.undo(inverse)
+        assert ev.schedule == schedule
+        assert ev.lexicographic_key() == key_before
+
+
+def test_duplicates_follow_check_semantics() -> None:
+    # (a) duplicado em R1, (b) direção repetida (D×E três vezes), R38 com mesmo estado.
+    schedule = [
+        ScheduledMatch(1, "01/06/2024", "A", "B", "S", "MG", "MG"),
+        ScheduledMatch(1, "02/06/2024", "A", "C", "S", "MG", "SP"),
+        ScheduledMatch(2, "08/06/2024", "A", "C", "S", "MG", "SP"),
+        ScheduledMatch(18, "08/10/2024", "C", "A", "S2", "SP", "MG"),
+        ScheduledMatch(38, "08/12/2024", "B", "A", "S3", "MG", "MG"),
+        ScheduledMatch(1, "01/06/2024", "D", "E", "S4", "RJ", "RS"),
+        ScheduledMatch(3, "15/06/2024", "D", "E", "S4", "RJ", "RS"),
+        ScheduledMatch(5, "29/06/2024", "D", "E", "S4", "RJ", "RS"),
+    ]
+    ev = DeltaEvaluator(schedule)
+    _assert_matches_evaluate(ev)
+    ev.apply([(1, replace(schedule[1], round=3))])
+    _assert_matches_evaluate(ev)
+    ev.apply([(7, replace(schedule[7], home="E", away="D"))])
+    _assert_matches_evaluate(ev)
+    ev.apply([(6, replace(schedule[6], round=7))])
+    _assert_matches_evaluate(ev)
+
+
+def test_other_league_size_matches_evaluate() -> None:
+    teams = {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i % 9:02d}", state=["SP", "RJ", "MG"][i % 3])
+        for i in range(15)
+    }
+    schedule = construct_schedule(teams, _make_dates(), seed=2)
+    ev = DeltaEvaluator(schedule, n_teams=15)
+    rng = random.Random(2)
+    for _ in range(100):
+        ev.apply(_random_move(ev.schedule, teams, rng))
+        full = evaluate(ev.schedule, n_teams=15)
+        assert ev.violations_by_type == full.violations_by_type
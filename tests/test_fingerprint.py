@@ -0,0 +1,137 @@
+"""Testes para fingerprints Zobrist e o cache LRU de avaliações."""
+from __future__ import annotations
+
+import random
+from dataclasses import replace
+from datetime import date, timedelta
+
+from brasileirao import grasp as grasp_module
+from brasileirao.construction import construct_schedule
+from brasileirao.delta import DeltaEvaluator
+from brasileirao.domain import Team, TeamMap
+from brasileirao.fingerprint import (
+    EvaluationCache,
+    match_key,
+    schedule_fingerprint,
+    update_fingerprint,
+)
+from brasileirao.grasp import grasp
+
+
+def _make_teams() -> TeamMap:
+    states = [
+        "SP", "RJ", "SP", "SP", "RJ", "RJ",
+        "MG", "MG", "PR", "PR",
+        "RS", "RS", "BA", "BA", "CE",
+        "CE", "PE", "MT", "SC", "GO",
+    ]
+    return {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i:02d}", state=states[i])
+        for i in range(20)
+    }
+
+
+def _make_dates(n: int = 300) -> list[date]:
+    start = date(2023, 8, 20)
+    return [start + timedelta(days=i) for i in range(n)]
+
+
+def test_fingerprint_is_order_independent() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=1)
+    shuffled = list(schedule)
+    random.Random(0).shuffle(shuffled)
+    assert schedule_fingerprint(shuffled) == schedule_fingerprint(schedule)
+    assert 0 <= schedule_fingerprint(schedule) < 2**64
+
+
+def test_fingerprint_distinguishes_changes() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=1)
+    m = schedule[0]
+    flipped = [replace(m, home=m.away, away=m.home)] + schedule[1:]
+    moved = [replace(m, day=schedule[-1].day)] + schedule[1:]
+    fps = {schedule_fingerprint(s) for s in (schedule, flipped, moved)}
+    assert len(fps) == 3
+
+
+def test_incremental_update_matches_recompute() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=2)
+    fp = schedule_fingerprint(schedule)
+    old = schedule[5]
+    new = replace(old, home=old.away, away=old.home)
+    changed = list(schedule)
+    changed[5] = new
+    assert update_fingerprint(fp, [old], [new]) == schedule_fingerprint(changed)
+    assert update_fingerprint(fp, [old], [old]) == fp
+
+
+def test_delta_evaluator_tracks_fingerprint() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=3)
+    ev = DeltaEvaluator(schedule)
+    assert ev.fingerprint == schedule_fingerprint(schedule)
+    m = schedule[7]
+    inverse = ev.apply([(7, replace(m, home=m.away, away=m.home))])
+    assert ev.fingerprint == schedule_fingerprint(ev.schedule)
+    ev.undo(inverse)
+    assert ev.fingerprint == schedule_fingerprint(schedule)
+
+
+def test_match_key_is_stable() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=4)
+    m = schedule[0]
+    assert match_key(m) == match_key(replace(m))
+
+
+def test_cache_lru_eviction_and_counters() -> None:
+    cache: EvaluationCache[str] = EvaluationCache(maxsize=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"      # 1 passa a ser o mais recente
+    cache.put(3, "c")               # expulsa 2
+    assert 2 not in cache
+    assert cache.get(2) is None
+    assert cache.get(3) == "c"
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert len(cache) == 2
+
+
+def test_cache_disabled() -> None:
+    cache: EvaluationCache[str] = EvaluationCache(maxsize=0)
+    cache.put(1, "a")
+    assert cache.get(1) is None
+    assert cache.misses == 1
+
+
+def test_grasp_reports_duplicates(monkeypatch) -> None:
+    teams, dates = _make_teams(), _make_dates()
+    fixed = construct_schedule(teams, dates, seed=7)
+    monkeypatch.setattr(grasp_module, "assign_dates_to_matches", lambda *a, **k: list(fixed))
+    result = grasp(teams, dates, seed=42, max_iter=4, max_iter_no_improve=100)
+    assert [h.is_duplicate for h in result.history] == [False, True, True, True]
+    assert result.duplicate_iterations == 3
+    assert (result.cache_hits, result.cache_misses) == (3, 1)
+    assert len({h.fingerprint for h in result.history}) == 1
+
+
+def test_duplicate_detection_bounded_by_cache(monkeypatch) -> None:
+    teams, dates = _make_teams(), _make_dates()
+    fixed = [construct_schedule(teams, dates, seed=s) for s in (7, 8)]
+    calls = iter(range(100))
+    monkeypatch.setattr(
+        grasp_module, "assign_dates_to_matches",
+        lambda *a, **k: list(fixed[next(calls) % 2]),
+    )
+    kwargs = {"seed": 42, "max_iter": 4, "max_iter_no_improve": 100}
+    # Alterna dois schedules: um cache de 1 já esqueceu o anterior.
+    small = grasp(teams, dates, cache_size=1, **kwargs)
+    assert small.duplicate_iterations == 0
+    calls = iter(range(100))
+    large = grasp(teams, dates, cache_size=2, **kwargs)
+    assert [h.is_duplicate for h in large.history] == [False, False, True, True]
+
+
+def test_grasp_cache_does_not_change_result() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    cached = grasp(teams, dates, seed=42, max_iter=5)
+    uncached = grasp(teams, dates, seed=42, max_iter=5, cache_size=0)
+    assert cached.history == uncached.history
+    assert cached.cache_hits + cached.cache_misses == cached.total_iterations
@@ -1,10 +1,15 @@
 """Testes para o loop multi-start do GRASP."""
 from __future__ import annotations
 
+import csv
+import json
 from datetime import date, timedelta
 
+import pytest
+
+from brasileirao import grasp as grasp_module
 from brasileirao.domain import Team, TeamMap
-from brasileirao.grasp import grasp
+from brasileirao.grasp import HistorySink, grasp, grasp_iter
 
 
 def _make_teams() -> TeamMap:
@@ -73,3 +78,342 @@ def test_seed_derivation() -> None:
 def test_history_length() -> None:
     result = grasp(_make_teams(), _make_dates(), seed=42, max_iter=10)
     assert len(result.history) == result.total_iterations
+
+
+def test_best_evaluation_has_full_details() -> None:
+    result = grasp(_make_teams(), _make_dates(), seed=42, max_iter=3)
+    best = result.best_evaluation
+    assert best.lexicographic_key() == result.history[result.best_iter - 1].lex_key
+    assert len(best.prv_result.occurrences) == best.total_prv
+
+
+def test_prune_keeps_trajectory() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    plain = grasp(teams, dates, seed=42, max_iter=6, max_iter_no_improve=100)
+    pruned = grasp(teams, dates, seed=42, max_iter=6, max_iter_no_improve=100, prune=True)
+    assert pruned.best_iter == plain.best_iter
+    assert pruned.best_evaluation == plain.best_evaluation
+    assert [h.is_new_best for h in pruned.history] == [h.is_new_best for h in plain.history]
+    for p, h in zip(pruned.history, plain.history):
+        assert p.lex_key == h.lex_key or (p.pruned and p.lex_key <= h.lex_key)
+
+
+def test_date_iterations_per_structure() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    single = grasp(teams, dates, seed=42, max_iter=4, max_iter_no_improve=100)
+    multi = grasp(
+        teams, dates, seed=42, max_iter=4, max_iter_no_improve=100,
+        date_iters_per_structure=3,
+    )
+    again = grasp(
+        teams, dates, seed=42, max_iter=4, max_iter_no_improve=100,
+        date_iters_per_structure=3,
+    )
+    assert [h.lex_key for h in multi.history] == [h.lex_key for h in again.history]
+    assert multi.total_iterations == 4
+    # A primeira atribuição de cada estrutura é a de construct_schedule.
+    firsts = [h for h in multi.history if h.date_iter == 0]
+    assert [h.fingerprint for h in firsts] == [h.fingerprint for h in single.history]
+    assert multi.best_evaluation.lexicographic_key() <= single.best_evaluation.lexicographic_key()
+    best = next(
+        h for h in multi.history
+        if h.iter_number == multi.best_iter and h.date_iter == multi.best_date_iter
+    )
+    assert best.lex_key == multi.best_evaluation.lexicographic_key()
+    # Mesma estrutura, mesma parte estrutural da chave.
+    for h in multi.history:
+        assert h.lex_key[:2] == firsts[h.iter_number - 1].lex_key[:2]
+
+
+def test_prune_skips_dates_of_hopeless_structures() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    plain = grasp(
+        teams, dates, seed=42, max_iter=6, max_iter_no_improve=100,
+        date_iters_per_structure=2,
+    )
+    pruned = grasp(
+        teams, dates, seed=42, max_iter=6, max_iter_no_improve=100,
+        date_iters_per_structure=2, prune=True,
+    )
+    assert pruned.best_evaluation == plain.best_evaluation
+    assert (pruned.best_iter, pruned.best_date_iter) == (plain.best_iter, plain.best_date_iter)
+    skipped = [h for h in pruned.history if h.pruned and h.fingerprint == 0]
+    assert skipped
+    assert all(h.lex_key[:2] >= pruned.best_evaluation.lexicographic_key()[:2] for h in skipped)
+
+
+def test_invalid_date_iterations_rejected() -> None:
+    with pytest.raises(ValueError):
+        grasp(_make_teams(), _make_dates(), max_iter=1, date_iters_per_structure=0)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"prune": True, "date_iters_per_structure": 2},
+        {"max_iter_no_improve": 2, "cache_size": 1},
+        {"local_search": "vnd", "date_iters_per_structure": 2, "max_iter": 3},
+    ],
+)
+def test_parallel_equals_serial(options) -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {"seed": 42, "max_iter": 6, "max_iter_no_improve": 100, **options}
+    serial = grasp(teams, dates, **kwargs)
+    parallel = grasp(teams, dates, workers=2, **kwargs)
+    assert parallel == serial
+    assert parallel.history == serial.history
+    assert (parallel.best_iter, parallel.stopped_by) == (serial.best_iter, serial.stopped_by)
+
+
+def test_invalid_workers_rejected() -> None:
+    with pytest.raises(ValueError):
+        grasp(_make_teams(), _make_dates(), max_iter=1, workers=0)
+
+
+def test_stops_by_time_limit() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    for workers in (1, 2):
+        result = grasp(
+            teams, dates, seed=42, max_iter=50, max_iter_no_improve=100,
+            time_limit_s=0.0, workers=workers,
+        )
+        # O limite só é checado depois de haver incumbente.
+        assert result.stopped_by == "time_limit"
+        assert result.total_iterations == 1
+
+
+def test_stops_by_target() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    plain = grasp(teams, dates, seed=42, max_iter=8, max_iter_no_improve=100)
+    target = plain.best_evaluation.lexicographic_key()
+    for workers in (1, 2):
+        result = grasp(
+            teams, dates, seed=42, max_iter=8, max_iter_no_improve=100,
+            target_lex_key=target, workers=workers,
+        )
+        assert result.stopped_by == "target_reached"
+        assert result.best_iter == result.total_iterations == plain.best_iter
+        assert result.best_evaluation == plain.best_evaluation
+
+
+def test_improvement_times_recorded() -> None:
+    result = grasp(_make_teams(), _make_dates(), seed=42, max_iter=6)
+    bests = [(h.iter_number, h.date_iter) for h in result.history if h.is_new_best]
+    assert [(i, j) for i, j, _ in result.improvement_times] == bests
+    elapsed = [t for _, _, t in result.improvement_times]
+    assert elapsed == sorted(elapsed)
+    assert 0.0 <= elapsed[-1] <= result.elapsed_s
+
+
+class _Interrupted(Exception):
+    pass
+
+
+def test_checkpoint_resume_gives_same_result(tmp_path, monkeypatch) -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {
+        "seed": 42, "max_iter": 7, "max_iter_no_improve": 100,
+        "prune": True, "date_iters_per_structure": 2,
+    }
+    uninterrupted = grasp(teams, dates, **kwargs)
+
+    # "Mata" o processo no meio da 6ª estrutura; o último checkpoint é o da 4ª.
+    path = tmp_path / "grasp.ckpt"
+    original_step = grasp_module._GRASPRun.step
+
+    def dying_step(self, i, alpha, structure):
+        if i == 5:
+            raise _Interrupted
+        return original_step(self, i, alpha, structure)
+
+    monkeypatch.setattr(grasp_module._GRASPRun, "step", dying_step)
+    with pytest.raises(_Interrupted):
+        grasp(teams, dates, checkpoint_path=str(path), checkpoint_every=2, **kwargs)
+    monkeypatch.undo()
+    assert path.exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+    resumed = grasp(teams, dates, checkpoint_path=str(path), resume=True, **kwargs)
+    assert resumed == uninterrupted
+    # Checkpoint final: um novo resume só devolve o resultado.
+    assert grasp(teams, dates, checkpoint_path=str(path), resume=True, **kwargs) == resumed
+
+
+def test_checkpoint_of_other_configuration_rejected(tmp_path) -> None:
+    teams, dates = _make_teams(), _make_dates()
+    path = str(tmp_path / "grasp.ckpt")
+    grasp(teams, dates, seed=42, max_iter=2, checkpoint_path=path)
+    with pytest.raises(ValueError):
+        grasp(teams, dates, seed=43, max_iter=2, checkpoint_path=path, resume=True)
+
+
+def test_resume_after_time_limit(tmp_path) -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {"seed": 42, "max_iter": 5, "max_iter_no_improve": 100}
+    uninterrupted = grasp(teams, dates, **kwargs)
+    path = str(tmp_path / "grasp.ckpt")
+    first = grasp(teams, dates, checkpoint_path=path, time_limit_s=0.0, **kwargs)
+    assert first.stopped_by == "time_limit"
+    resumed = grasp(teams, dates, checkpoint_path=path, resume=True, workers=2, **kwargs)
+    assert resumed == uninterrupted
+
+
+def test_grasp_iter_streams_history() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {"seed": 42, "max_iter": 5, "date_iters_per_structure": 2}
+    result = grasp(teams, dates, **kwargs)
+    steps = grasp_iter(teams, dates, **kwargs)
+    records = []
+    while True:
+        try:
+            progress = next(steps)
+        except StopIteration as done:
+            streamed = done.value
+            break
+        records.append(progress.iteration)
+        if progress.iteration.is_new_best:
+            assert progress.best_lex_key == progress.iteration.lex_key
+        assert progress.best_lex_key <= progress.iteration.lex_key
+    assert records == result.history
+    assert streamed == result
+    assert progress.best_schedule == result.best_schedule
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_grasp_iter_can_stop_early(workers) -> None:
+    steps = grasp_iter(
+        _make_teams(), _make_dates(), seed=42, max_iter=20, workers=workers
+    )
+    first = next(steps)
+    steps.close()  # fecha o pool (workers=2) sem esperar as 20 estruturas
+    assert first.iteration.iter_number == 1
+    assert first.structures == 1
+
+
+def test_history_modes() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {"seed": 42, "max_iter": 6, "date_iters_per_structure": 2}
+    full = grasp(teams, dates, **kwargs)
+    improvements = grasp(teams, dates, history="improvements", **kwargs)
+    none = grasp(teams, dates, history="none", **kwargs)
+    assert improvements.history == [h for h in full.history if h.is_new_best]
+    assert none.history == []
+    for other in (improvements, none):
+        assert other.best_evaluation == full.best_evaluation
+        assert other.total_iterations == full.total_iterations
+        assert other.duplicate_iterations == full.duplicate_iterations
+    with pytest.raises(ValueError):
+        grasp(teams, dates, max_iter=1, history="some")
+
+
+def _read_sink(path: str) -> list[tuple[int, int, tuple[int, int, int]]]:
+    with open(path, encoding="utf-8") as fh:
+        if path.endswith(".csv"):
+            return [
+                (int(r["iter_number"]), int(r["date_iter"]),
+                 (int(r["hard"]), int(r["soft"]), int(r["prv"])))
+                for r in csv.DictReader(fh)
+            ]
+        return [
+            (r["iter_number"], r["date_iter"], tuple(r["lex_key"]))
+            for r in map(json.loads, fh)
+        ]
+
+
+def test_history_sinks_append(tmp_path) -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {"seed": 42, "max_iter": 3, "history": "none"}
+    full = [
+        (h.iter_number, h.date_iter, h.lex_key)
+        for h in grasp(teams, dates, seed=42, max_iter=3).history
+    ]
+    for name in ("history.csv", "history.jsonl"):
+        path = str(tmp_path / name)
+        for runs in (1, 2):  # segunda execução continua o mesmo arquivo
+            with HistorySink(path) as sink:
+                grasp(teams, dates, history_sink=sink, **kwargs)
+            assert sink.rows == len(full) * runs
+        assert _read_sink(path) == full * 2
+    with pytest.raises(ValueError):
+        HistorySink(str(tmp_path / "h.txt"), fmt="xml")
+
+
+@pytest.mark.parametrize("dies_at", [1, 4])
+@pytest.mark.parametrize("name", ["history.csv", "history.jsonl"])
+def test_history_sink_resume_writes_each_row_once(tmp_path, monkeypatch, dies_at, name) -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {
+        "seed": 42, "max_iter": 6, "max_iter_no_improve": 100,
+        "date_iters_per_structure": 2, "history": "none",
+    }
+    full = [
+        (h.iter_number, h.date_iter, h.lex_key)
+        for h in grasp(teams, dates, **{**kwargs, "history": "full"}).history
+    ]
+    path = str(tmp_path / name)
+    ckpt = str(tmp_path / "grasp.ckpt")
+
+    # Morre com registros gravados depois do último checkpoint (o da 3ª
+    # estrutura, ou o inicial quando morre antes de qualquer outro).
+    original_step = grasp_module._GRASPRun.step
+
+    def dying_step(self, i, alpha, structure):
+        if i == dies_at:
+            raise _Interrupted
+        return original_step(self, i, alpha, structure)
+
+    monkeypatch.setattr(grasp_module._GRASPRun, "step", dying_step)
+    with HistorySink(path) as sink, pytest.raises(_Interrupted):
+        grasp(teams, dates, checkpoint_path=ckpt, checkpoint_every=3,
+              history_sink=sink, **kwargs)
+    monkeypatch.undo()
+    assert _read_sink(path) == [row for row in full if row[0] <= dies_at]
+
+    with HistorySink(path) as sink:
+        grasp(teams, dates, checkpoint_path=ckpt, resume=True, history_sink=sink, **kwargs)
+    assert _read_sink(path) == full
+    assert sink.rows == len(full)
+
+
+def test_local_search_never_worse_than_construction() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {"seed": 42, "max_iter": 4, "max_iter_no_improve": 100}
+    plain = grasp(teams, dates, **kwargs)
+    searched = grasp(teams, dates, local_search="vnd", local_search_mode="best", **kwargs)
+    # Mesmas construções (mesmos fingerprints); cada uma só pode melhorar.
+    assert [h.fingerprint for h in searched.history] == [h.fingerprint for h in plain.history]
+    for p, s in zip(plain.history, searched.history):
+        assert s.lex_key <= p.lex_key
+    assert searched.best_evaluation.lexicographic_key() <= plain.best_evaluation.lexicographic_key()
+    stats = searched.local_search_stats
+    assert stats.runs == 4
+    assert stats.total_moves > 0
+    assert plain.local_search_stats.runs == 0
+
+
+def test_local_search_rejects_prune() -> None:
+    with pytest.raises(ValueError):
+        grasp(_make_teams(), _make_dates(), max_iter=1, local_search="vnd", prune=True)
+    with pytest.raises(ValueError):
+        grasp(_make_teams(), _make_dates(), max_iter=1, local_search="2opt")
+    with pytest.raises(ValueError):
+        grasp(
+            _make_teams(), _make_dates(), max_iter=1, local_search="vnd",
+            local_search_neighborhoods=["swap_weeks"],
+        )
+
+
+def test_starter_factorization_feeds_kempe_chain() -> None:
+    teams, dates = _make_teams(), _make_dates()
+    kwargs = {
+        "seed": 42, "max_iter": 2, "local_search": "vnd",
+        "local_search_neighborhoods": ("swap_homes", "kempe_chain"),
+    }
+    circle = grasp(teams, dates, **kwargs)
+    starter = grasp(teams, dates, factorization="starter", **kwargs)
+    # GK_20 não tem cadeias parciais; a fatoração do starter tem.
+    assert circle.local_search_stats.moves_tried["kempe_chain"] == 0
+    assert starter.local_search_stats.moves_tried["kempe_chain"] > 0
+    with pytest.raises(ValueError):
+        grasp(teams, dates, max_iter=1, factorization="polygon")
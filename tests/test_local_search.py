@@ -0,0 +1,334 @@
+"""Testes para a busca local (VND com swap_homes e swap_days)."""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+from brasileirao.construction import ConstructionContext, construct_schedule
+from brasileirao.domain import ScheduledMatch, Team, TeamMap
+from brasileirao.local_search import NEIGHBORHOODS, LocalSearch, _teams, vnd
+from brasileirao.objective import evaluate
+
+
+def _make_teams() -> TeamMap:
+    states = [
+        "SP", "RJ", "SP", "SP", "RJ", "RJ",
+        "MG", "MG", "PR", "PR",
+        "RS", "RS", "BA", "BA", "CE",
+        "CE", "PE", "MT", "SC", "GO",
+    ]
+    teams = {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i:02d}", state=states[i])
+        for i in range(20)
+    }
+    # Estádio compartilhado: swap_days e swap_homes mexem no PRV dele.
+    teams["T01"] = Team(name="T01", stadium="E00", state="RJ")
+    return teams
+
+
+def _make_dates(n: int = 300) -> list[date]:
+    start = date(2023, 8, 20)
+    return [start + timedelta(days=i) for i in range(n)]
+
+
+def _min_rest(schedule) -> int:
+    days: dict[str, list[tuple[int, int]]] = {}
+    for m in schedule:
+        days.setdefault(m.home, []).append((m.round, m.ordinal))
+        days.setdefault(m.away, []).append((m.round, m.ordinal))
+    gaps = []
+    for entries in days.values():
+        entries.sort()
+        gaps += [b[1] - a[1] for a, b in zip(entries, entries[1:])]
+    return min(gaps)
+
+
+@pytest.mark.parametrize("mode", ["first", "best"])
+def test_vnd_improves_and_keeps_structure(mode) -> None:
+    teams = _make_teams()
+    for seed in range(3):
+        schedule = construct_schedule(teams, _make_dates(), seed=seed)
+        before = evaluate(schedule)
+        result = vnd(schedule, mode=mode)
+        after = evaluate(result.schedule)
+        assert after.lexicographic_key() == result.lex_key
+        assert result.lex_key <= before.lexicographic_key()
+        # Mesmos confrontos por rodada, mesmas datas por rodada, descanso mantido.
+        def rounds(s):
+            return Counter((m.round, frozenset((m.home, m.away))) for m in s)
+
+        def days(s):
+            return Counter((m.round, m.day) for m in s)
+
+        assert rounds(result.schedule) == rounds(schedule)
+        assert days(result.schedule) == days(schedule)
+        assert _min_rest(result.schedule) >= 3
+        assert after.violations_by_type["a"] == after.violations_by_type["b"] == 0
+        for m in result.schedule:
+            assert m.stadium == teams[m.home].stadium
+            assert (m.home_state, m.away_state) == (teams[m.home].state, teams[m.away].state)
+
+
+def test_vnd_reaches_local_optimum_and_counts_moves() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=2)
+    result = vnd(schedule)
+    stats = result.stats
+    assert stats.runs == 1
+    assert set(stats.moves_tried) == {"swap_homes", "swap_days"}
+    assert sum(stats.improvements.values()) > 0
+    assert all(stats.improvements[n] <= stats.moves_tried[n] for n in stats.moves_tried)
+    assert stats.moves_per_second > 0
+
+    # Ótimo local: nenhuma vizinhança melhora o resultado.
+    search = LocalSearch(result.schedule)
+    assert not search.descend("swap_homes")
+    assert not search.descend("swap_days")
+    assert search.evaluator.lexicographic_key() == result.lex_key
+
+
+def test_swap_days_only_changes_prv() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=4)
+    before = evaluate(schedule).violations_by_type
+    result = vnd(schedule, neighborhoods=["swap_days"], min_team_rest_days=2)
+    after = evaluate(result.schedule).violations_by_type
+    assert {c: n for c, n in after.items() if c != "h"} == {
+        c: n for c, n in before.items() if c != "h"
+    }
+    assert after["h"] <= before["h"]
+    assert _min_rest(result.schedule) >= 2
+
+
+def test_invalid_options_rejected() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=0)
+    with pytest.raises(ValueError):
+        vnd(schedule, neighborhoods=["swap_weeks"])
+    with pytest.raises(ValueError):
+        vnd(schedule, mode="random")
+
+
+def _affine_schedule() -> list[ScheduledMatch]:
+    """8 times com a fatoração afim de K8 (rodada v: pares {x, x^v}):
+    a união de duas rodadas é feita de ciclos de 4, então swap_teams tem
+    cadeias de 2 rodadas (na fatoração do circle_method elas cobrem o turno)."""
+    states = ["SP", "RJ", "SP", "MG", "RJ", "PR", "SP", "BA"]
+    start = date(2024, 1, 7)
+    schedule = []
+    for v in range(1, 8):
+        for x in range(8):
+            y = x ^ v
+            if x > y:
+                continue
+            home, away = (x, y) if (x + v) % 2 else (y, x)
+            for r, h, a in ((v, home, away), (v + 7, away, home)):
+                day = start + timedelta(days=7 * (r - 1) + (x % 2))
+                schedule.append(ScheduledMatch(
+                    r, day.strftime("%d/%m/%Y"), f"T{h}", f"T{a}",
+                    f"E{h % 6}", states[h], states[a],
+                ))
+    return schedule
+
+
+def _assert_valid_double_round_robin(schedule, n_rounds: int) -> None:
+    by_round = Counter()
+    directions = Counter()
+    for m in schedule:
+        by_round[(m.round, m.home)] += 1
+        by_round[(m.round, m.away)] += 1
+        directions[(m.home, m.away)] += 1
+    assert set(by_round.values()) == {1}
+    assert set(directions.values()) == {1}
+    turno = n_rounds // 2
+    turno_pairs = {(m.round, m.home, m.away) for m in schedule if m.round <= turno}
+    mirror = {(m.round - turno, m.away, m.home) for m in schedule if m.round > turno}
+    assert turno_pairs == mirror
+
+
+@pytest.mark.parametrize("name", ["kempe_chain", "swap_rounds", "swap_teams", "replace_teams"])
+def test_structural_moves_keep_a_b_and_mirror(name) -> None:
+    schedule = _affine_schedule()
+    search = LocalSearch(schedule, n_teams=8, min_team_rest_days=1)
+    ev = search.evaluator
+    moves = list(search._generators[name]())
+    assert moves
+    for move in moves:
+        key = ev.lexicographic_key()
+        change, _ = ev.delta(move)
+        inverse = ev.apply(move)
+        after = evaluate(ev.schedule, n_teams=8)
+        assert after.lexicographic_key() == tuple(k + c for k, c in zip(key, change))
+        assert after.violations_by_type["a"] == after.violations_by_type["b"] == 0
+        _assert_valid_double_round_robin(ev.schedule, 14)
+        ev.undo(inverse)
+    assert ev.schedule == schedule
+
+
+def test_swap_teams_chains() -> None:
+    # Fatoração afim: cadeias de 2 rodadas do turno (4 slots com espelhos
+    # por rodada, 8 por movimento); cada uma gerada uma vez.
+    search = LocalSearch(_affine_schedule(), n_teams=8, min_team_rest_days=1)
+    moves = list(search._swap_teams_moves())
+    assert {len(m) for m in moves} == {8}
+    # Cada cadeia é gerada uma vez (i<->j e k<->l podem tocar o mesmo
+    # ciclo de 4 com mandos diferentes).
+    assert len({frozenset(m) for m in moves}) == len(moves)
+
+
+
+def test_swap_teams_full_chains_on_circle_method() -> None:
+    # Circle method com 20 times: toda cadeia cobre o turno menos o
+    # confronto direto. O movimento é o de replace_teams com o confronto
+    # direto (turno e espelho) de mando invertido.
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=1)
+    search = LocalSearch(schedule)
+    ev = search.evaluator
+    moves = list(search._swap_teams_moves())
+    replaced = list(search._replace_teams_moves())
+    assert len(moves) == len(replaced) == 190
+    replaced_by_slots = {frozenset(dict(m)): dict(m) for m in replaced}
+    for move in moves:
+        changed = dict(move)
+        direct = {x for x, m in changed.items() if set(_teams(m)) == set(_teams(ev.match(x)))}
+        assert len(direct) == 2
+        assert all(ev.match(x).home == changed[x].away for x in direct)
+        rest = {x: m for x, m in changed.items() if x not in direct}
+        assert replaced_by_slots[frozenset(rest)] == rest
+    improving = 0
+    for move in moves[::9]:
+        key = ev.lexicographic_key()
+        change, _ = ev.delta(move)
+        improving += change < (0, 0, 0)
+        inverse = ev.apply(move)
+        assert evaluate(ev.schedule).lexicographic_key() == tuple(
+            k + c for k, c in zip(key, change)
+        )
+        _assert_valid_double_round_robin(ev.schedule, 38)
+        assert _min_rest(ev.schedule) >= 3
+        ev.undo(inverse)
+    assert ev.schedule == schedule
+
+def test_swap_teams_respects_rest() -> None:
+    # Dias alternados dentro da rodada: com descanso mínimo de 7 dias,
+    # só sobram as cadeias que não encurtam o intervalo de ninguém.
+    loose = LocalSearch(_affine_schedule(), n_teams=8, min_team_rest_days=1)
+    strict = LocalSearch(_affine_schedule(), n_teams=8, min_team_rest_days=7)
+    n_loose = len(list(loose._swap_teams_moves()))
+    n_strict = len(list(strict._swap_teams_moves()))
+    assert n_strict < n_loose
+
+
+def _starter_schedule(seed: int) -> list[ScheduledMatch]:
+    """20 times com a fatoração de `starter_method` (não perfeita)."""
+    teams, dates = _make_teams(), _make_dates()
+    context = ConstructionContext(teams, dates, factorization="starter")
+    return construct_schedule(teams, dates, seed=seed, context=context)
+
+
+def test_vnd_with_all_neighborhoods() -> None:
+    schedule = _starter_schedule(2)
+    cheap = vnd(schedule)
+    full = vnd(schedule, neighborhoods=NEIGHBORHOODS)
+    assert full.lex_key == evaluate(full.schedule).lexicographic_key()
+    assert full.lex_key <= evaluate(schedule).lexicographic_key()
+    assert set(full.stats.moves_tried) == set(NEIGHBORHOODS)
+    assert all(full.stats.moves_tried[name] > 0 for name in NEIGHBORHOODS)
+    assert _min_rest(full.schedule) >= 3
+    _assert_valid_double_round_robin(full.schedule, 38)
+    assert cheap.stats.moves_tried.keys() == {"swap_homes", "swap_days"}
+
+
+def test_swap_rounds_carries_dates_and_mirror() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=1)
+    search = LocalSearch(schedule)
+    ev = search.evaluator
+    moves = list(search._swap_rounds_moves())
+    assert len(moves) == 171  # C(19, 2) pares de rodadas do turno
+    days_by_round = Counter((m.round, m.day) for m in schedule)
+    for move in moves[::17]:
+        key = ev.lexicographic_key()
+        change, _ = ev.delta(move)
+        inverse = ev.apply(move)
+        after = ev.schedule
+        assert evaluate(after).lexicographic_key() == tuple(
+            k + c for k, c in zip(key, change)
+        )
+        # Cada rodada continua com as suas datas; os confrontos mudam de rodada.
+        assert Counter((m.round, m.day) for m in after) == days_by_round
+        _assert_valid_double_round_robin(after, 38)
+        assert _min_rest(after) >= 3
+        ev.undo(inverse)
+    assert ev.schedule == schedule
+
+
+def _league(n: int) -> TeamMap:
+    # Três estádios compartilhados, como em _make_teams.
+    states = ["SP", "RJ", "MG", "PR"]
+    return {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i % (n - 3):02d}", state=states[i % 4])
+        for i in range(n)
+    }
+
+
+def test_kempe_chain_decomposition() -> None:
+    search = LocalSearch(construct_schedule(_league(16), _make_dates(), seed=0), n_teams=16)
+    turno = search.evaluator.turno_last
+    partial = 0
+    for r in range(1, turno + 1):
+        for s in range(r + 1, turno + 1):
+            chains = search.kempe_chains(r, s)
+            # Cada ciclo alterna jogos de r e s e os ciclos cobrem as duas rodadas.
+            assert all(len(in_r) == len(in_s) >= 2 for in_r, in_s in chains)
+            assert sorted(x for in_r, _ in chains for x in in_r) == sorted(search._round_slots[r])
+            assert sorted(x for _, in_s in chains for x in in_s) == sorted(search._round_slots[s])
+            partial += len(chains) > 1
+    assert partial > 0
+
+    # Na fatoração do circle_method com 20 times (19 primo) toda união de
+    # duas rodadas é um ciclo hamiltoniano: não há cadeia parcial.
+    built = LocalSearch(construct_schedule(_make_teams(), _make_dates(), seed=0))
+    assert all(len(built.kempe_chains(1, s)) == 1 for s in range(2, 20))
+    assert list(built._kempe_chain_moves()) == []
+
+
+def test_kempe_chain_moves_keep_rounds_dates_and_mirror() -> None:
+    schedule = construct_schedule(_league(16), _make_dates(), seed=3)
+    search = LocalSearch(schedule, n_teams=16)
+    ev = search.evaluator
+    moves = list(search._kempe_chain_moves())
+    assert moves
+    days_by_round = Counter((m.round, m.day) for m in schedule)
+    for move in moves[::7]:
+        key = ev.lexicographic_key()
+        change, _ = ev.delta(move)
+        inverse = ev.apply(move)
+        after = ev.schedule
+        assert evaluate(after, n_teams=16).lexicographic_key() == tuple(
+            k + c for k, c in zip(key, change)
+        )
+        assert Counter((m.round, m.day) for m in after) == days_by_round
+        _assert_valid_double_round_robin(after, 30)
+        assert _min_rest(after) >= 3
+        ev.undo(inverse)
+    assert ev.schedule == schedule
+
+
+def test_kempe_chain_moves_on_20_team_starter_factorization() -> None:
+    schedule = _starter_schedule(0)
+    search = LocalSearch(schedule)
+    ev = search.evaluator
+    moves = list(search._kempe_chain_moves())
+    assert moves
+    key = ev.lexicographic_key()
+    changes = [ev.delta(move)[0] for move in moves]
+    # Pelo menos um movimento que melhora ou mantém a chave.
+    assert any(change <= (0, 0, 0) for change in changes)
+    best = moves[changes.index(min(changes))]
+    inverse = ev.apply(best)
+    assert evaluate(ev.schedule).lexicographic_key() == tuple(
+        k + c for k, c in zip(key, min(changes))
+    )
+    _assert_valid_double_round_robin(ev.schedule, 38)
+    assert _min_rest(ev.schedule) >= 3
+    ev.undo(inverse)
+    assert ev.schedule == schedule
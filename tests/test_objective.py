@@ -14,7 +14,10 @@ from brasileirao.objective import (
     HARD_CONSTRAINTS,
     add_prv_column,
     compute_prv,
+    count_prv,
     evaluate,
+    evaluate_counts,
+    truncate_counts,
 )
 
 
@@ -282,6 +285,131 @@ def test_deprecated_add_prv_column_still_works():
     assert int(out["PRV"].sum()) == 1
 
 
+# ----------------------------------------------------------------------
+# evaluate_counts
+# ----------------------------------------------------------------------
+
+def _mixed_violations_schedule() -> list[ScheduledMatch]:
+    return [
+        _m(1, "01/06/2024", "A", "B", "S"),
+        _m(1, "01/06/2024", "A", "C", "S"),     # (a)
+        _m(2, "04/06/2024", "A", "D", "S"),     # (c), PRV
+        _m(5, "01/07/2024", "X", "Y", "S2"),
+        _m(6, "08/07/2024", "X", "Z", "S2"),
+        _m(7, "15/07/2024", "X", "W", "S2"),    # (g)
+        _m(38, "20/07/2024", "Y", "Z", "S3"),   # (e)
+    ]
+
+
+@pytest.mark.parametrize(
+    "schedule_fn", [_two_team_double_robin, _mixed_violations_schedule]
+)
+def test_evaluate_counts_matches_evaluate(schedule_fn):
+    schedule = schedule_fn()
+    full = evaluate(schedule)
+    counts = evaluate_counts(schedule)
+    assert counts.violations_by_type == full.violations_by_type
+    assert counts.total_prv == full.total_prv
+    assert counts.total_cost == full.total_cost
+    assert counts.is_feasible == full.is_feasible
+    assert counts.lexicographic_key() == full.lexicographic_key()
+
+
+def test_evaluate_counts_custom_weights():
+    schedule = _mixed_violations_schedule()
+    weights = {"a": 7.0, "g": 3.0, "prv": 2.0}
+    assert evaluate_counts(schedule, weights=weights).total_cost == pytest.approx(
+        evaluate(schedule, weights=weights).total_cost
+    )
+
+
+def test_count_prv_matches_compute_prv():
+    schedule = [
+        _m(1, "01/06/2024", "A", "B", "S"),
+        _m(2, "04/06/2024", "C", "A", "S"),
+        _m(3, "07/06/2024", "B", "C", "S"),
+        _m(4, "07/06/2024", "D", "C", "S2"),
+    ]
+    assert count_prv(schedule) == compute_prv(schedule).total_prv == 2
+
+
+def test_counts_comparable_with_full_result():
+    clean = evaluate_counts(_two_team_double_robin())
+    dirty = evaluate(_mixed_violations_schedule())
+    assert clean.is_better_than(dirty)
+    assert not dirty.is_better_than(clean)
+
+
+# ----------------------------------------------------------------------
+# cutoff (poda pela chave do incumbente)
+# ----------------------------------------------------------------------
+
+def test_cutoff_prunes_after_hard():
+    schedule = _mixed_violations_schedule()
+    result = evaluate(schedule, cutoff=(0, 5, 10))
+    assert result.pruned is True
+    # Corta já após (a): nenhuma soft nem PRV é calculada.
+    assert set(result.violations_by_type) <= {"a", "b"}
+    assert result.total_prv == 0
+    assert result.lexicographic_key()[0] >= 1
+    assert not result.is_better_than(evaluate(_two_team_double_robin()))
+
+
+def test_cutoff_prunes_after_soft():
+    schedule = _mixed_violations_schedule()
+    full = evaluate(schedule)
+    hard, soft, _ = full.lexicographic_key()
+    result = evaluate_counts(schedule, cutoff=(hard, soft - 1, 1000))
+    assert result.pruned is True
+    assert "h" not in result.violations_by_type
+    assert result.lexicographic_key() == (hard, soft, 0)
+
+
+def test_cutoff_not_reached_gives_full_result():
+    schedule = _mixed_violations_schedule()
+    full = evaluate(schedule)
+    loose = (full.lexicographic_key()[0] + 1, 0, 0)
+    result = evaluate(schedule, cutoff=loose)
+    assert result.pruned is False
+    assert result == full
+    counts = evaluate_counts(schedule, cutoff=loose)
+    assert counts.pruned is False
+    assert counts.violations_by_type == full.violations_by_type
+
+
+def test_cutoff_never_prunes_better_schedule():
+    # Mesmos hard/soft do cutoff: a decisão depende do PRV, que é calculado.
+    schedule = _mixed_violations_schedule()
+    hard, soft, prv = evaluate(schedule).lexicographic_key()
+    result = evaluate_counts(schedule, cutoff=(hard, soft, prv + 1))
+    assert result.pruned is False
+    assert result.lexicographic_key() == (hard, soft, prv)
+
+
+def test_cutoff_same_result_on_numpy_backend():
+    schedule = _mixed_violations_schedule()
+    for cutoff in [(0, 0, 0), (0, 5, 10), (1, 100, 0), (100, 0, 0)]:
+        py = evaluate_counts(schedule, cutoff=cutoff)
+        vec = evaluate_counts(schedule, cutoff=cutoff, backend="numpy")
+        assert py == vec
+        assert evaluate(schedule, cutoff=cutoff).violations_by_type == py.violations_by_type
+
+
+def test_truncate_counts_matches_cutoff_evaluation():
+    schedule = _mixed_violations_schedule()
+    weights = {"prv": 2.0, "c": 3.0}
+    full = evaluate_counts(schedule, weights=weights)
+    hard, soft, prv = full.lexicographic_key()
+    cutoffs = [None, (0, 0, 0), (0, 5, 10), (hard, soft, prv), (hard, soft, prv + 1),
+               (hard, soft - 1, 1000), (hard + 1, 0, 0), (100, 0, 0)]
+    for cutoff in cutoffs:
+        assert truncate_counts(full, cutoff, weights) == evaluate_counts(
+            schedule, weights=weights, cutoff=cutoff
+        )
+    with pytest.raises(ValueError):
+        truncate_counts(evaluate_counts(schedule, cutoff=(0, 0, 0)), (0, 0, 0))
+
+
 # ----------------------------------------------------------------------
 # lexicographic_key / is_better_than
 # ----------------------------------------------------------------------
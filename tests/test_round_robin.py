@@ -1,7 +1,49 @@
-from brasileirao.round_robin import circle_method
+from itertools import combinations
+
+import pytest
+
+from brasileirao.round_robin import circle_method, starter_method
 
 def test_circle_method_20_teams_has_19_rounds():
     teams = [f"T{i}" for i in range(20)]
     rounds = circle_method(teams)
     assert len(rounds) == 19
     assert all(len(r) == 10 for r in rounds)
+
+
+def _single_cycle(round_a, round_b) -> bool:
+    adj = {}
+    for a, b in round_a + round_b:
+        adj.setdefault(a, []).append(b)
+        adj.setdefault(b, []).append(a)
+    start = next(iter(adj))
+    seen, stack = {start}, [start]
+    while stack:
+        for w in adj[stack.pop()]:
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    return len(seen) == len(adj)
+
+
+@pytest.mark.parametrize("n", [6, 8, 19, 20, 22])
+def test_starter_method_is_a_one_factorization(n):
+    teams = [f"T{i}" for i in range(n)]
+    rounds = starter_method(teams, seed=5)
+    assert len(rounds) == (n if n % 2 else n - 1)
+    pairs = [frozenset(p) for r in rounds for p in r]
+    assert len(pairs) == len(set(pairs)) == n * (n - 1) // 2
+    for r in rounds:
+        playing = [t for p in r for t in p]
+        assert len(playing) == len(set(playing)) == 2 * (n // 2)
+    assert starter_method(teams, seed=5) == rounds
+
+
+def test_starter_method_is_not_perfect_for_20_teams():
+    # GK_20 (circle method) é perfeita: toda união de duas rodadas é um
+    # ciclo hamiltoniano. O starter aleatório tem ciclos menores.
+    teams = [f"T{i}" for i in range(20)]
+    circle = circle_method(teams)
+    assert all(_single_cycle(a, b) for a, b in combinations(circle, 2))
+    starter = starter_method(teams, seed=0)
+    assert not all(_single_cycle(a, b) for a, b in combinations(starter, 2))
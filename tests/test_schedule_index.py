@@ -0,0 +1,112 @@
+"""Testes para o índice compartilhado (ScheduleIndex) e o registry com @requires."""
+from __future__ import annotations
+
+import pytest
+
+from brasileirao import constraints
+from brasileirao.constraints import check_all
+from brasileirao.domain import ConstraintViolation, ScheduledMatch
+from brasileirao.objective import evaluate, evaluate_counts, evaluate_many
+from brasileirao.schedule_index import INDEXES, ScheduleIndex, as_index, requires
+
+
+def _m(round_: int, day: str, home: str, away: str, stadium: str) -> ScheduledMatch:
+    return ScheduledMatch(round_, day, home, away, stadium, "X", "Y")
+
+
+def _schedule() -> list[ScheduledMatch]:
+    return [
+        _m(1, "01/06/2024", "A", "B", "S"),
+        _m(1, "01/06/2024", "A", "C", "S"),
+        _m(2, "04/06/2024", "A", "D", "S"),
+        _m(5, "01/07/2024", "X", "Y", "S2"),
+        _m(6, "08/07/2024", "X", "Z", "S2"),
+        _m(7, "15/07/2024", "X", "W", "S2"),
+    ]
+
+
+class _CountingSchedule(list):
+    """Lista que conta quantas vezes foi percorrida."""
+
+    passes = 0
+
+    def __iter__(self):
+        type(self).passes += 1
+        return super().__iter__()
+
+
+def test_all_indexes_built_in_one_pass() -> None:
+    _CountingSchedule.passes = 0
+    index = ScheduleIndex(_CountingSchedule(_schedule()))
+    assert _CountingSchedule.passes == 1
+    assert [m.away for m in index.by_round[1]] == ["B", "C"]
+    assert index.sides(1) == {"A": "home", "B": "away", "C": "away"}
+    assert index.by_team["X"] == [(5, "home"), (6, "home"), (7, "home")]
+    assert len(index.by_stadium["S"]) == 3
+    assert index.pair_count[frozenset({"A", "B"})] == 1
+    assert index.turno_balance[0]["A"] == 3
+    assert _CountingSchedule.passes == 1
+
+
+def test_missing_index_built_on_demand() -> None:
+    index = ScheduleIndex(_schedule(), ["by_round"])
+    assert index.direction_count[("A", "B")] == 1
+
+
+def test_unknown_index_rejected() -> None:
+    with pytest.raises(ValueError):
+        ScheduleIndex(_schedule(), ["by_weekday"])
+    with pytest.raises(ValueError):
+        requires("by_weekday")
+
+
+def test_evaluate_traverses_schedule_once() -> None:
+    _CountingSchedule.passes = 0
+    evaluate(_CountingSchedule(_schedule()))
+    assert _CountingSchedule.passes == 1
+
+
+def test_custom_check_receives_shared_index(monkeypatch) -> None:
+    seen: list[object] = []
+
+    @requires("by_team")
+    def check_i(schedule) -> list[ConstraintViolation]:
+        seen.append(schedule)
+        return [
+            ConstraintViolation(constraint_id="i", description=f"{team} joga 3+", team=team)
+            for team, entries in schedule.by_team.items()
+            if len(entries) >= 3
+        ]
+
+    def check_j(schedule) -> list[ConstraintViolation]:
+        seen.append(schedule)
+        return []
+
+    registry = constraints.CONSTRAINT_CHECKS + [("i", check_i), ("j", check_j)]
+    monkeypatch.setattr(constraints, "CONSTRAINT_CHECKS", registry)
+    monkeypatch.setattr("brasileirao.objective.CONSTRAINT_CHECKS", registry)
+
+    schedule = _schedule()
+    result = evaluate(schedule)
+    assert result.violations_by_type["i"] == 2  # A e X
+    assert isinstance(seen[0], ScheduleIndex)
+    assert seen[1] is schedule  # checagem sem @requires recebe o schedule
+
+    assert evaluate_counts(schedule).violations_by_type == result.violations_by_type
+    assert evaluate_many([schedule])["i"][0] == 2
+    assert {v.constraint_id for v in check_all(schedule)} >= {"a", "i"}
+
+
+def test_builtin_checks_declare_indexes() -> None:
+    for _, check in constraints.CONSTRAINT_CHECKS:
+        assert check.requires <= INDEXES
+    assert constraints.registry_indexes() <= INDEXES
+
+
+def test_as_index_rejects_mismatched_league_size() -> None:
+    index = ScheduleIndex(_schedule(), n_teams=8)
+    assert as_index(index, n_teams=8) is index
+    assert as_index(index) is index
+    with pytest.raises(ValueError, match="n_teams"):
+        as_index(index, n_teams=20)
+    assert as_index(_schedule(), "by_round", n_teams=8).returno_last == 14
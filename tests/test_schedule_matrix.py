@@ -0,0 +1,113 @@
+"""Testes para a representação em arrays (ScheduleMatrix)."""
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from brasileirao.constraints import check_all
+from brasileirao.construction import construct_schedule
+from brasileirao.domain import (
+    ScheduledMatch,
+    ScheduleMatrix,
+    Team,
+    TeamMap,
+    day_ordinal,
+    format_day,
+)
+from brasileirao.io import load_teams
+from brasileirao.objective import compute_prv, evaluate
+from brasileirao.real_baseline import load_real_schedule_2023
+
+
+def _make_teams() -> TeamMap:
+    states = [
+        "SP", "RJ", "SP", "SP", "RJ", "RJ",
+        "MG", "MG", "PR", "PR",
+        "RS", "RS", "BA", "BA", "CE",
+        "CE", "PE", "MT", "SC", "GO",
+    ]
+    return {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i:02d}", state=states[i])
+        for i in range(20)
+    }
+
+
+def _make_dates(n: int = 300) -> list[date]:
+    start = date(2023, 8, 20)
+    return [start + timedelta(days=i) for i in range(n)]
+
+
+def test_round_trip_constructed() -> None:
+    teams = _make_teams()
+    schedule = construct_schedule(teams, _make_dates(), seed=42)
+    m = ScheduleMatrix.from_schedule(schedule, teams=list(teams))
+    assert m.opponent.shape == (20, 38)
+    assert m.home.dtype == np.int8
+    assert m.day.dtype == np.int32
+    assert m.to_schedule() == schedule
+
+
+def test_round_trip_real_2023() -> None:
+    teams = load_teams("data/raw/teams.csv")
+    schedule = load_real_schedule_2023(
+        "data/raw/tabela_real_brasileirao_2023.csv", teams
+    )
+    assert ScheduleMatrix.from_schedule(schedule).to_schedule() == schedule
+
+
+def test_matrix_is_consistent() -> None:
+    teams = _make_teams()
+    m = ScheduleMatrix.from_schedule(
+        construct_schedule(teams, _make_dates(), seed=1)
+    )
+    rows = np.arange(m.n_teams)[:, None]
+    cols = np.arange(m.n_rounds)[None, :]
+    # Adversário do adversário é o próprio time, com mando oposto.
+    assert (m.opponent[m.opponent, cols] == rows).all()
+    assert (m.home[m.opponent, cols] == -m.home).all()
+
+
+def test_rejects_team_twice_in_round() -> None:
+    schedule = [
+        ScheduledMatch(1, "01/06/2024", "A", "B", "S", "X", "X"),
+        ScheduledMatch(1, "01/06/2024", "A", "C", "S", "X", "X"),
+    ]
+    with pytest.raises(ValueError):
+        ScheduleMatrix.from_schedule(schedule)
+
+
+def test_rejects_inconsistent_stadium() -> None:
+    schedule = [
+        ScheduledMatch(1, "01/06/2024", "A", "B", "S1", "X", "X"),
+        ScheduledMatch(2, "08/06/2024", "A", "C", "S2", "X", "X"),
+    ]
+    with pytest.raises(ValueError):
+        ScheduleMatrix.from_schedule(schedule)
+
+
+def test_checks_accept_matrix() -> None:
+    teams = _make_teams()
+    schedule = construct_schedule(teams, _make_dates(), seed=5)
+    m = ScheduleMatrix.from_schedule(schedule)
+    assert evaluate(m).lexicographic_key() == evaluate(schedule).lexicographic_key()
+    assert compute_prv(m).total_prv == compute_prv(schedule).total_prv
+    assert check_all(m) == check_all(schedule)
+
+
+def test_day_ordinal_interning() -> None:
+    d = date(2024, 6, 1)
+    assert day_ordinal("01/06/2024") == d.toordinal()
+    assert format_day(d.toordinal()) == "01/06/2024"
+    m = ScheduledMatch(1, "01/06/2024", "A", "B", "S", "X", "X")
+    assert m.ordinal == d.toordinal()
+    # `ordinal` é derivado de `day`: replace não deixa valor obsoleto.
+    assert replace(m, day="03/06/2024").ordinal == d.toordinal() + 2
+
+
+def test_constructed_days_are_canonical() -> None:
+    schedule = construct_schedule(_make_teams(), _make_dates(), seed=3)
+    for m in schedule:
+        assert format_day(m.ordinal) == m.day
@@ -0,0 +1,187 @@
+"""Testes de equivalência do backend NumPy com o backend Python."""
+from __future__ import annotations
+
+import random
+from collections import Counter
+from dataclasses import replace
+from datetime import date, timedelta
+
+import numpy as np
+
+from brasileirao.constraints import check_all
+from brasileirao.construction import construct_schedule
+from brasileirao.domain import ScheduledMatch, ScheduleMatrix, Team, TeamMap
+from brasileirao.io import load_teams
+from brasileirao.objective import KEY_FIELDS, evaluate, evaluate_counts, evaluate_many
+from brasileirao.real_baseline import load_real_schedule_2023
+from brasileirao.vectorized import matrix_counts
+
+
+def _make_teams() -> TeamMap:
+    states = [
+        "SP", "RJ", "SP", "SP", "RJ", "RJ",
+        "MG", "MG", "PR", "PR",
+        "RS", "RS", "BA", "BA", "CE",
+        "CE", "PE", "MT", "SC", "GO",
+    ]
+    return {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i % 17:02d}", state=states[i])
+        for i in range(20)
+    }
+
+
+def _make_dates(n: int = 300) -> list[date]:
+    start = date(2023, 8, 20)
+    return [start + timedelta(days=i) for i in range(n)]
+
+
+def _perturb(schedule: list[ScheduledMatch], teams: TeamMap, seed: int) -> list[ScheduledMatch]:
+    """Inverte mandos e embaralha datas/rodadas sem quebrar a representação."""
+    rng = random.Random(seed)
+    out = list(schedule)
+    for _ in range(40):
+        i = rng.randrange(len(out))
+        m = out[i]
+        if rng.random() < 0.5:
+            out[i] = replace(
+                m,
+                home=m.away,
+                away=m.home,
+                stadium=teams[m.away].stadium,
+                home_state=m.away_state,
+                away_state=m.home_state,
+            )
+        else:
+            j = rng.randrange(len(out))
+            out[i] = replace(m, day=out[j].day)
+    return out
+
+
+def _key(v) -> tuple:
+    return (v.constraint_id, v.round, v.team, v.stadium)
+
+
+def _assert_same(schedule) -> None:
+    py = evaluate(schedule)
+    np_ = evaluate(schedule, backend="numpy")
+    assert np_.violations_by_type == py.violations_by_type
+    assert np_.lexicographic_key() == py.lexicographic_key()
+    assert np_.total_cost == py.total_cost
+    assert np_.prv_result.prv_by_stadium == py.prv_result.prv_by_stadium
+    counts = evaluate_counts(schedule, backend="numpy")
+    assert counts.violations_by_type == py.violations_by_type
+    assert counts.total_cost == py.total_cost
+    assert Counter(map(_key, check_all(schedule, backend="numpy"))) == Counter(
+        map(_key, check_all(schedule))
+    )
+
+
+def test_constructed_schedules_match_python() -> None:
+    teams = _make_teams()
+    dates = _make_dates()
+    for seed in range(5):
+        schedule = construct_schedule(teams, dates, seed=seed)
+        _assert_same(schedule)
+        _assert_same(_perturb(schedule, teams, seed))
+
+
+def test_real_2023_matches_python() -> None:
+    teams = load_teams("data/raw/teams.csv")
+    schedule = load_real_schedule_2023(
+        "data/raw/tabela_real_brasileirao_2023.csv", teams
+    )
+    _assert_same(schedule)
+
+
+def test_g_with_bye_rounds() -> None:
+    # A folga em R2 não quebra a sequência: A joga em casa R1, R3, R4.
+    schedule = [
+        ScheduledMatch(1, "01/06/2024", "A", "B", "SA", "X", "Y"),
+        ScheduledMatch(3, "15/06/2024", "A", "C", "SA", "X", "Y"),
+        ScheduledMatch(4, "22/06/2024", "A", "D", "SA", "X", "Y"),
+        ScheduledMatch(2, "08/06/2024", "B", "C", "SB", "Y", "Y"),
+    ]
+    counts = matrix_counts(ScheduleMatrix.from_schedule(schedule))
+    assert counts == evaluate(schedule).violations_by_type
+    assert counts["g"] == 1
+    _assert_same(schedule)
+
+
+def test_unrepresentable_schedule_falls_back() -> None:
+    schedule = [
+        ScheduledMatch(1, "01/06/2024", "A", "B", "S", "X", "X"),
+        ScheduledMatch(1, "01/06/2024", "A", "C", "S", "X", "X"),
+    ]
+    result = evaluate(schedule, backend="numpy")
+    assert result.violations_by_type["a"] == 1
+    _assert_same(schedule)
+
+
+def _assert_many_matches(schedules) -> None:
+    keys = evaluate_many(schedules)
+    assert keys.shape == (len(schedules),)
+    for row, schedule in zip(keys, schedules):
+        counts = evaluate_counts(schedule)
+        assert tuple(int(row[f]) for f in KEY_FIELDS) == counts.lexicographic_key()
+        assert row["total_cost"] == counts.total_cost
+        for cid, count in counts.violations_by_type.items():
+            assert row[cid] == count
+
+
+def test_evaluate_many_matches_single_evaluations() -> None:
+    teams = _make_teams()
+    dates = _make_dates()
+    schedules = []
+    for seed in range(4):
+        schedule = construct_schedule(teams, dates, seed=seed)
+        schedules += [schedule, _perturb(schedule, teams, seed)]
+    # Matrizes com ordens de times diferentes são reindexadas na pilha.
+    schedules.append(ScheduleMatrix.from_schedule(schedules[0]))
+    schedules.append(
+        ScheduleMatrix.from_schedule(schedules[2], teams=sorted(teams, reverse=True))
+    )
+    _assert_many_matches(schedules)
+
+    keys = evaluate_many(schedules)
+    ranking = np.argsort(keys, order=KEY_FIELDS, kind="stable")
+    ranked = [evaluate_counts(schedules[i]).lexicographic_key() for i in ranking]
+    assert ranked == sorted(ranked)
+
+
+def test_evaluate_many_mixed_population() -> None:
+    # Conjuntos de times, nº de rodadas e representabilidade diferentes.
+    small = [
+        ScheduledMatch(1, "01/06/2024", "A", "B", "SA", "X", "Y"),
+        ScheduledMatch(3, "15/06/2024", "A", "C", "SA", "X", "Y"),
+        ScheduledMatch(4, "22/06/2024", "A", "D", "SA", "X", "Y"),
+        ScheduledMatch(2, "08/06/2024", "B", "C", "SB", "Y", "Y"),
+    ]
+    broken = [
+        ScheduledMatch(1, "01/06/2024", "A", "B", "S", "X", "X"),
+        ScheduledMatch(1, "01/06/2024", "A", "C", "S", "X", "X"),
+    ]
+    full = construct_schedule(_make_teams(), _make_dates(), seed=9)
+    _assert_many_matches([small, broken, full])
+
+
+def test_evaluate_many_empty() -> None:
+    keys = evaluate_many([])
+    assert keys.shape == (0,)
+    assert set(KEY_FIELDS) <= set(keys.dtype.names)
+
+
+def test_other_league_size_matches_python() -> None:
+    teams = {
+        f"T{i:02d}": Team(name=f"T{i:02d}", stadium=f"E{i:02d}", state=["SP", "RJ", "MG"][i % 3])
+        for i in range(16)
+    }
+    for seed in range(3):
+        schedule = _perturb(construct_schedule(teams, _make_dates(), seed=seed), teams, seed)
+        py = evaluate(schedule, n_teams=16)
+        np_ = evaluate(schedule, backend="numpy", n_teams=16)
+        assert np_.violations_by_type == py.violations_by_type
+        assert Counter(map(_key, check_all(schedule, backend="numpy", n_teams=16))) == Counter(
+            map(_key, check_all(schedule, n_teams=16))
+        )
+        row = evaluate_many([schedule], n_teams=16)[0]
+        assert tuple(int(row[f]) for f in KEY_FIELDS) == py.lexicographic_key()